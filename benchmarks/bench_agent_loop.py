@@ -0,0 +1,151 @@
+"""
+Overhead of the agent loop, separated from model latency.
+
+Replays a cassette with zero latency through OpenAIAgent and the real tools,
+reporting wall time per session with the tools running for real, and with
+their results served from memory (the agent loop's own overhead). By
+default a synthetic session is generated: every turn reads a file and greps
+the repository before the model answers. Pass a cassette recorded with
+VIBECODER_RECORD to replay real traffic instead.
+
+    python benchmarks/bench_agent_loop.py [cassette.jsonl] [--stream]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from vibecoder.agents.agent import OpenAIAgent
+from vibecoder.agents.replay import ReplayClient
+from vibecoder.messages import ToolResult
+from vibecoder.tools import get_all_tools
+
+SESSIONS = 20
+TURNS = 8
+
+
+def _usage():
+    return {"prompt_tokens": 1000, "completion_tokens": 50, "total_tokens": 1050}
+
+
+def _completion(message, stream):
+    if stream:
+        delta = {key: value for key, value in message.items() if key != "tool_calls"}
+        chunks = [{"choices": [{"index": 0, "delta": delta}], "usage": None}]
+        for i, call in enumerate(message.get("tool_calls") or []):
+            chunks.append(
+                {
+                    "choices": [
+                        {"index": 0, "delta": {"tool_calls": [{**call, "index": i}]}}
+                    ],
+                    "usage": None,
+                }
+            )
+        chunks.append({"choices": [], "usage": _usage()})
+        return {"chunks": [{"t": 0.0, "data": chunk} for chunk in chunks]}
+    return {
+        "response": {
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": _usage(),
+        }
+    }
+
+
+def synthetic_cassette(path, stream):
+    records = []
+    for turn in range(TURNS):
+        calls = [
+            ("read_file", {"path": "vibecoder/agents/agent.py"}),
+            ("grep", {"pattern": "def ", "paths": ["vibecoder"]}),
+        ]
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{turn}_{i}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(args)},
+                }
+                for i, (name, args) in enumerate(calls)
+            ],
+        }
+        records.append(message)
+    records.append({"role": "assistant", "content": "All done."})
+    with open(path, "w") as f:
+        for seq, message in enumerate(records):
+            record = {
+                "seq": seq,
+                "endpoint": "chat.completions",
+                "request": {"stream": stream},
+                "latency_s": 0.0,
+                **_completion(message, stream),
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+class CannedTool:
+    """
+    Delegates to a tool once per distinct call, then serves the saved result.
+
+    With canned results, a session's wall time is the agent loop's own
+    overhead: request building, message serialization and scheduling.
+    """
+
+    def __init__(self, tool, canned):
+        self._tool = tool
+        self._canned = canned
+
+    def __getattr__(self, name):
+        return getattr(self._tool, name)
+
+    async def run(self, tool_use):
+        key = (self.name, json.dumps(tool_use.arguments, sort_keys=True))
+        if key not in self._canned:
+            self._canned[key] = await self._tool.run(tool_use)
+        result = self._canned[key]
+        return ToolResult(
+            content=result.content,
+            tool_name=result.tool_name,
+            tool_call_id=tool_use.tool_call_id,
+        )
+
+
+async def run_sessions(cassette, stream, tools):
+    replay = ReplayClient(cassette, latency=0)
+    messages = 0
+    start = time.perf_counter()
+    for _ in range(SESSIONS):
+        replay.rewind()
+        agent = OpenAIAgent(
+            replay, system_prompt="benchmark", tools=tools, stream=stream
+        )
+        async for _ in agent.ask("Look around the repository."):
+            messages += 1
+    return time.perf_counter() - start, messages // SESSIONS
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    stream = "--stream" in sys.argv
+    real = {tool.name: tool for tool in get_all_tools()}
+    canned = {}
+    cached = {name: CannedTool(tool, canned) for name, tool in real.items()}
+    with tempfile.TemporaryDirectory() as tmp:
+        cassette = args[0] if args else os.path.join(tmp, "synthetic.jsonl")
+        if not args:
+            synthetic_cassette(cassette, stream)
+        total, messages = asyncio.run(run_sessions(cassette, stream, real))
+        asyncio.run(run_sessions(cassette, stream, cached))
+        loop, _ = asyncio.run(run_sessions(cassette, stream, cached))
+
+    print(f"{SESSIONS} sessions, {messages} messages each")
+    print(f"with tools        {total / SESSIONS * 1e3:9.2f} ms/session")
+    print(f"agent loop only   {loop / SESSIONS * 1e3:9.2f} ms/session")
+
+
+if __name__ == "__main__":
+    main()
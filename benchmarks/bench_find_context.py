@@ -0,0 +1,95 @@
+"""
+Context matching of apply_patch on large files with many hunks.
+
+Builds a file of generated Python and a patch with a hunk every so many lines,
+then times parsing the patch (which locates every hunk) with the indexed
+matcher, and locating the same contexts with a line-by-line scan of the file
+at each offset, as the matcher did before it was indexed. Half the hunks have
+their whitespace changed, so they only match at a fuzzier level.
+
+    python benchmarks/bench_find_context.py [lines] [hunks]
+"""
+
+import sys
+
+from bench_grep import time_it
+
+from vibecoder.tools import apply_patch_lib
+
+
+def scan_find_context_core(lines, context, start):
+    if not context:
+        return start, 0
+    for i in range(start, len(lines)):
+        if lines[i : i + len(context)] == context:
+            return i, 0
+    for i in range(start, len(lines)):
+        if [s.rstrip() for s in lines[i : i + len(context)]] == [
+            s.rstrip() for s in context
+        ]:
+            return i, 1
+    for i in range(start, len(lines)):
+        if [s.strip() for s in lines[i : i + len(context)]] == [
+            s.strip() for s in context
+        ]:
+            return i, 100
+    return -1, 0
+
+
+def build(lines, hunks):
+    text = []
+    for n in range(lines // 4):
+        text += [f"def f{n}(x):", "    y = x + 1", "    return y", ""]
+    patch = ["*** Begin Patch", "*** Update File: big.py"]
+    contexts = []
+    step = len(text) // (hunks + 1)
+    for h in range(1, hunks + 1):
+        at = h * step - h * step % 4
+        context = text[at : at + 3]
+        if h % 2:
+            context = [s.strip() for s in context]
+        contexts.append(context)
+        patch += ["@@", " " + context[0], "-" + context[1], "+    y = x + 2"]
+        patch += [" " + context[2]]
+    patch.append("*** End Patch")
+    return text, "\n".join(patch) + "\n", contexts
+
+
+def scan_all(lines, contexts):
+    found, start = [], 0
+    for context in contexts:
+        i, fuzz = scan_find_context_core(lines, context, start)
+        found.append((i, fuzz))
+        start = i + len(context)
+    return found
+
+
+def index_all(lines, contexts):
+    index = apply_patch_lib.ContextIndex(lines)
+    found, start = [], 0
+    for context in contexts:
+        i, fuzz = index.find(context, start)
+        found.append((i, fuzz))
+        start = i + len(context)
+    return found
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    hunks = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    text, patch, contexts = build(lines, hunks)
+    orig = {"big.py": "\n".join(text)}
+    print(f"{len(text)} lines, {hunks} hunks")
+    print(f"{'':<28}{'ms':>10}")
+
+    scan_s, scanned = time_it(lambda: scan_all(text, contexts))
+    index_s, indexed = time_it(lambda: index_all(text, contexts))
+    assert scanned == indexed
+    parse_s, _ = time_it(lambda: apply_patch_lib.text_to_patch(patch, orig))
+    print(f"{'scan each offset':<28}{scan_s * 1e3:>10.1f}")
+    print(f"{'hash index':<28}{index_s * 1e3:>10.1f}")
+    print(f"{'parse patch (indexed)':<28}{parse_s * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
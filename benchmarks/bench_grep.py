@@ -0,0 +1,87 @@
+"""
+Search speed of the grep tool's in-process engine against `grep -r`.
+
+Builds a synthetic source tree in a temporary directory and times a rare
+literal, a common word and a regex with `grep -r`, the engine scanning every
+file, and the engine narrowed by the trigram index (built up front; the build
+time is reported separately).
+
+    python benchmarks/bench_grep.py [files] [lines-per-file]
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from vibecoder.tools import grep_engine, trigram_index
+
+WORDS = "alpha beta gamma delta epsilon return import class def self value".split()
+
+
+def build_tree(root, files, lines):
+    rng = random.Random(0)
+    for i in range(files):
+        directory = os.path.join(root, f"pkg{i % 40}", f"mod{i % 7}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{i}.py"), "w") as f:
+            for n in range(lines):
+                words = " ".join(rng.choice(WORDS) for _ in range(8))
+                f.write(f"    {words}  # line {n}\n")
+            if i % 97 == 0:
+                f.write("NEEDLE_MARKER = True\n")
+
+
+def time_it(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_engine(root, pattern, index=None):
+    regex = grep_engine.compile_pattern(pattern)
+    file_filter = index.file_filter(regex, set()) if index else None
+    matches = grep_engine.search([root], regex, file_filter=file_filter)
+    return sum(len(m.lines) for m in matches)
+
+
+def run_grep(root, pattern):
+    result = subprocess.run(
+        ["grep", "-r", "-E", pattern, root], capture_output=True, text=True
+    )
+    return result.stdout.count("\n")
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    patterns = ["NEEDLE_MARKER", "epsilon", r"def [a-z]+ \w+ self"]
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, files, lines)
+        start = time.perf_counter()
+        index = trigram_index.TrigramIndex(root)
+        index.update(dict(trigram_index.walk_workspace(root)))
+        build_s = time.perf_counter() - start
+        print(f"{files} files x {lines} lines, index built in {build_s:.2f}s")
+        print(
+            f"{'pattern':<24}{'matches':>9}{'grep -r ms':>12}"
+            f"{'engine ms':>11}{'indexed ms':>12}"
+        )
+        for pattern in patterns:
+            grep_s, grep_n = time_it(lambda: run_grep(root, pattern))
+            engine_s, engine_n = time_it(lambda: run_engine(root, pattern))
+            indexed_s, indexed_n = time_it(lambda: run_engine(root, pattern, index))
+            assert grep_n == engine_n == indexed_n, (pattern, grep_n, engine_n)
+            print(
+                f"{pattern:<24}{engine_n:>9}{grep_s * 1e3:>12.1f}"
+                f"{engine_s * 1e3:>11.1f}{indexed_s * 1e3:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
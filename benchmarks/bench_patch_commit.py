@@ -0,0 +1,92 @@
+"""
+Cost of applying large multi-file patches in place and transactionally.
+
+Builds a tree of source files in a temporary directory and a patch that
+updates every one of them and adds as many new files, then times applying it
+with the plain file helpers (one write at a time, no rollback) and through a
+FileTransaction at each durability level. The tree is restored between runs.
+
+    python benchmarks/bench_patch_commit.py [files] [lines-per-file]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from vibecoder.tools import apply_patch_lib, file_transaction
+
+
+def build(root, files, lines):
+    originals = {}
+    for i in range(files):
+        path = os.path.join(root, f"pkg{i % 10}", f"mod{i}.py")
+        originals[path] = "".join(f"value_{n} = {n}\n" for n in range(lines))
+    patch = ["*** Begin Patch"]
+    for path in originals:
+        patch += [
+            f"*** Update File: {path}",
+            "@@",
+            " value_9 = 9",
+            "-value_10 = 10",
+            "+value_10 = 'ten'",
+            " value_11 = 11",
+        ]
+        patch += [f"*** Add File: {path[:-3]}_new.py", "+added = True"]
+    patch.append("*** End Patch")
+    return originals, "\n".join(patch) + "\n"
+
+
+def restore(root, originals):
+    for path, text in originals.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        if os.path.exists(path[:-3] + "_new.py"):
+            os.unlink(path[:-3] + "_new.py")
+
+
+def time_apply(root, originals, patch, durability, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        restore(root, originals)
+        start = time.perf_counter()
+        if durability is None:
+            apply_patch_lib.process_patch(
+                patch,
+                apply_patch_lib.open_file,
+                apply_patch_lib.write_file,
+                apply_patch_lib.remove_file,
+            )
+        else:
+            with file_transaction.FileTransaction(durability) as transaction:
+                apply_patch_lib.process_patch(
+                    patch,
+                    apply_patch_lib.open_file,
+                    transaction.write,
+                    transaction.remove,
+                )
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    with tempfile.TemporaryDirectory() as root:
+        os.chdir(root)
+        originals, patch = build(root, files, lines)
+        print(f"{files} files x {lines} lines updated, {files} added")
+        print(f"{'':<24}{'ms':>10}")
+        for label, durability in [
+            ("in place", None),
+            ("transaction, none", "none"),
+            ("transaction, data", "data"),
+            ("transaction, full", "full"),
+        ]:
+            seconds = time_apply(root, originals, patch, durability)
+            print(f"{label:<24}{seconds * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
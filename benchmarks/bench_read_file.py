@@ -0,0 +1,56 @@
+"""
+Line-range reads of a large file, whole and through the line index.
+
+Writes a log-like file to a temporary directory and times reading a 50-line
+range deep into it by loading every line, building the sparse line index, and
+reading the range from an index that is already built.
+
+    python benchmarks/bench_read_file.py [lines]
+"""
+
+import os
+import sys
+import tempfile
+
+from bench_grep import time_it
+
+from vibecoder.tools import line_index
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "big.log")
+        with open(path, "w") as f:
+            for i in range(lines):
+                f.write(f"2024-01-01 00:00:00 INFO worker-{i % 16} request {i} ok\n")
+        start = lines // 2
+        end = start + 50
+        print(f"{lines} lines, {os.path.getsize(path) / 2**20:.0f} MiB")
+        print(f"{'':<24}{'ms':>10}")
+
+        def whole():
+            with open(path) as f:
+                return "".join(f.readlines()[start:end])
+
+        def build():
+            line_index._cache.clear()
+            return line_index.index_for(path).text(start, end)
+
+        def cached():
+            return line_index.index_for(path).text(start, end)
+
+        results = []
+        for label, fn in [
+            ("readlines", whole),
+            ("build index + read", build),
+            ("read, index built", cached),
+        ]:
+            seconds, result = time_it(fn)
+            results.append(result)
+            print(f"{label:<24}{seconds * 1e3:>10.2f}")
+        assert len(set(results)) == 1
+
+
+if __name__ == "__main__":
+    main()
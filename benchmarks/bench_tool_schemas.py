@@ -0,0 +1,37 @@
+"""
+Per-request cost of building the tool payload sent with every model call.
+
+Compares rebuilding every tool signature (which re-reads each prompt file)
+against the cached ToolSchemaRegistry, for both providers.
+
+    python benchmarks/bench_tool_schemas.py
+"""
+
+import timeit
+
+from vibecoder.tools import get_all_tools
+from vibecoder.tools.schema_registry import ToolSchemaRegistry, anthropic_tool
+
+ITERATIONS = 2000
+
+
+def main():
+    tools = {tool.name: tool for tool in get_all_tools()}
+    registry = ToolSchemaRegistry(tools)
+
+    cases = {
+        "openai, rebuilt": lambda: [tool.signature for tool in tools.values()],
+        "openai, registry": registry.openai,
+        "anthropic, rebuilt": lambda: [
+            anthropic_tool(tool.signature) for tool in tools.values()
+        ],
+        "anthropic, registry": registry.anthropic,
+    }
+    print(f"{len(tools)} tools, {ITERATIONS} requests per case")
+    for label, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=ITERATIONS, repeat=3))
+        print(f"{label:<22} {seconds / ITERATIONS * 1e6:9.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+File enumeration and search with and without the tracked-files-only mode.
+
+Builds a git repository in a temporary directory with tracked sources and a
+large untracked directory (think an unignored node_modules or build output),
+then times listing the files and searching them by walking the disk and by
+reading the git index.
+
+    python benchmarks/bench_tracked.py [tracked-files] [untracked-files]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+from bench_grep import build_tree, time_it
+
+from vibecoder.tools import git_files, grep_engine
+
+
+def main():
+    tracked = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    untracked = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(os.path.join(root, "src"), tracked, 50)
+        subprocess.run(["git", "-C", root, "init", "-q"], check=True)
+        subprocess.run(["git", "-C", root, "add", "."], check=True)
+        build_tree(os.path.join(root, "node_modules"), untracked, 5)
+        print(f"{tracked} tracked files, {untracked} untracked")
+        print(f"{'':<24}{'results':>9}{'walk ms':>10}{'index ms':>10}")
+
+        walk = grep_engine.SearchOptions()
+        index = grep_engine.SearchOptions(tracked_only=True)
+        git_files.tracked_files(root)  # Reading the index is cached.
+        for label, run in [
+            ("list files", lambda o: len(list(grep_engine.walk_files(root, o)))),
+            (
+                "search NEEDLE_MARKER",
+                lambda o: len(
+                    list(
+                        grep_engine.search(
+                            [root], grep_engine.compile_pattern("NEEDLE_MARKER"), o
+                        )
+                    )
+                ),
+            ),
+        ]:
+            walk_s, walk_n = time_it(lambda: run(walk))
+            index_s, index_n = time_it(lambda: run(index))
+            print(f"{label:<24}{index_n:>9}{walk_s * 1e3:>10.1f}{index_s * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
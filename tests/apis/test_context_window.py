@@ -0,0 +1,137 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from vibecoder.agents.agent import OpenAIAgent
+from vibecoder.agents.context_window import (
+    MAX_REPORTS,
+    ContextWindow,
+    estimate_tokens,
+)
+from vibecoder.messages import AgentResponse, ToolResult, ToolUse
+
+
+def build_history(turns, to_dict, result_size=4000):
+    messages = []
+    for turn in range(turns):
+        messages.append({"role": "user", "content": f"question {turn}"})
+        for call in range(2):
+            call_id = f"call_{turn}_{call}"
+            messages.append(
+                to_dict(
+                    ToolUse(
+                        tool_name="read_file",
+                        tool_call_id=call_id,
+                        arguments={"path": f"file_{turn}_{call}.py"},
+                    )
+                )
+            )
+            messages.append(
+                to_dict(
+                    ToolResult(
+                        content="x" * result_size,
+                        tool_name="read_file",
+                        tool_call_id=call_id,
+                    )
+                )
+            )
+        messages.append(to_dict(AgentResponse(content=f"answer {turn}")))
+    return messages
+
+
+def total(messages):
+    return sum(estimate_tokens(m) for m in messages)
+
+
+def test_under_budget_is_untouched():
+    messages = build_history(2, lambda m: m.to_openai_dict())
+    window = ContextWindow(max_tokens=100_000)
+    assert window.prepare(messages) == messages
+    assert window.last_report.saved_tokens == 0
+
+
+def test_stubs_old_tool_results_first():
+    messages = [{"role": "system", "content": "sys"}] + build_history(
+        3, lambda m: m.to_openai_dict()
+    )
+    window = ContextWindow(max_tokens=4000, keep_recent_results=2)
+    sent = window.prepare(messages)
+
+    assert sent[0] == {"role": "system", "content": "sys"}
+    assert total(sent) <= 4000
+    stubbed = [m for m in sent if m.get("role") == "tool" and "elided" in m["content"]]
+    assert stubbed
+    assert "read_file" in stubbed[0]["content"]
+    assert "file_0_0.py" in stubbed[0]["content"]
+    # The most recent results are kept intact.
+    assert sent[-2]["content"] == "x" * 4000
+    report = window.last_report
+    assert report.saved_tokens == report.original_tokens - total(sent)
+    assert report.saved_tokens > 0
+    # The original history is not modified.
+    assert messages[3]["content"] == "x" * 4000
+
+
+def test_compaction_is_sticky():
+    messages = build_history(3, lambda m: m.to_openai_dict())
+    window = ContextWindow(max_tokens=4000, keep_recent_results=2)
+    first = window.prepare(messages)
+    messages.append({"role": "user", "content": "more"})
+    second = window.prepare(messages)
+    assert second[: len(first)] == first
+
+
+def test_reports_are_bounded_but_the_total_is_not():
+    messages = build_history(3, lambda m: m.to_openai_dict())
+    window = ContextWindow(max_tokens=4000, keep_recent_results=2)
+    for _ in range(MAX_REPORTS + 10):
+        window.prepare(messages)
+    assert len(window.reports) == MAX_REPORTS
+    assert window.total_saved_tokens == (MAX_REPORTS + 10) * (
+        window.last_report.saved_tokens
+    )
+
+
+def test_drops_whole_turns_and_keeps_pairs_valid():
+    messages = build_history(4, lambda m: m.to_anthropic_dict(), result_size=400)
+    window = ContextWindow(max_tokens=300, keep_recent_results=0)
+    sent = window.prepare(messages)
+
+    assert window.last_report.dropped_messages > 0
+    assert sent[0]["role"] == "user"
+    assert "earlier messages were dropped" in sent[0]["content"]
+    assert sent[0]["content"].endswith("question 3")
+    tool_use_ids = {
+        block["id"]
+        for m in sent
+        if isinstance(m["content"], list)
+        for block in m["content"]
+        if block["type"] == "tool_use"
+    }
+    tool_result_ids = {
+        block["tool_use_id"]
+        for m in sent
+        if isinstance(m["content"], list)
+        for block in m["content"]
+        if block["type"] == "tool_result"
+    }
+    assert tool_use_ids == tool_result_ids == {"call_3_0", "call_3_1"}
+
+
+def test_agent_sends_compacted_history():
+    response = MagicMock()
+    response.choices[0].message.content = "ok"
+    response.choices[0].message.tool_calls = None
+    client = AsyncMock()
+    client.chat.completions.create = AsyncMock(return_value=response)
+
+    agent = OpenAIAgent(client, system_prompt="sys", max_context_tokens=3000)
+    agent.messages += build_history(3, lambda m: m.to_openai_dict())
+
+    asyncio.run(_drain(agent.ask("next")))
+    sent = client.chat.completions.create.call_args.kwargs["messages"]
+    assert total(sent) < total(agent.messages)
+    assert agent.context_window.last_report.saved_tokens > 0
+
+
+async def _drain(generator):
+    return [item async for item in generator]
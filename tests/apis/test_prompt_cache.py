@@ -0,0 +1,120 @@
+import asyncio
+import json
+from types import SimpleNamespace as NS
+from unittest.mock import AsyncMock, MagicMock
+
+from vibecoder.agents.agent import AnthropicAgent, OpenAIAgent
+from vibecoder.agents.prompt_cache import anthropic_messages
+from vibecoder.messages import AgentResponse
+from vibecoder.tools.base import Tool
+
+
+class NamedTool(Tool):
+    def __init__(self, name):
+        self.name = name
+
+    @property
+    def prompt_description(self):
+        return f"{self.name} tool"
+
+    @property
+    def signature(self):
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.prompt_description,
+                "parameters": {"type": "object", "properties": {}},
+            },
+        }
+
+    async def run(self, tool_use):
+        pass
+
+
+def tools():
+    return {name: NamedTool(name) for name in ["zeta", "alpha"]}
+
+
+async def drain(generator):
+    return [item async for item in generator]
+
+
+def test_anthropic_breakpoints_and_cache_usage():
+    response = MagicMock()
+    response.content = [NS(type="text", text="hi")]
+    response.usage = NS(
+        input_tokens=10,
+        output_tokens=2,
+        cache_read_input_tokens=900,
+        cache_creation_input_tokens=50,
+    )
+    client = AsyncMock()
+    client.messages.create = AsyncMock(return_value=response)
+    agent = AnthropicAgent(
+        client, system_prompt="sys", tools=tools(), prompt_caching=True
+    )
+
+    outputs = asyncio.run(drain(agent.ask("hello")))
+
+    kwargs = client.messages.create.call_args.kwargs
+    assert kwargs["system"] == [
+        {"type": "text", "text": "sys", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert [tool["name"] for tool in kwargs["tools"]] == ["alpha", "zeta"]
+    assert "cache_control" not in kwargs["tools"][0]
+    assert kwargs["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert kwargs["messages"][-1]["content"][-1]["cache_control"] == {
+        "type": "ephemeral"
+    }
+    # The agent's own history is left without breakpoints.
+    assert agent.messages[0] == {"role": "user", "content": "hello"}
+
+    response_msg = outputs[0]
+    assert isinstance(response_msg, AgentResponse)
+    assert response_msg.cache_read_tokens == 900
+    assert response_msg.cache_write_tokens == 50
+
+
+def test_anthropic_history_breakpoint_moves_to_last_block():
+    messages = [
+        {"role": "user", "content": "a"},
+        {"role": "assistant", "content": [{"type": "text", "text": "b"}]},
+    ]
+    marked = anthropic_messages(messages)
+    assert marked[0] is messages[0]
+    assert marked[1]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in messages[1]["content"][0]
+
+
+def test_openai_prefix_is_byte_stable():
+    def response(text):
+        r = MagicMock()
+        r.choices[0].message.content = text
+        r.choices[0].message.tool_calls = None
+        r.usage = NS(
+            prompt_tokens=2000,
+            completion_tokens=5,
+            prompt_tokens_details=NS(cached_tokens=1536),
+        )
+        return r
+
+    client = AsyncMock()
+    client.chat.completions.create = AsyncMock(
+        side_effect=[response("one"), response("two")]
+    )
+    agent = OpenAIAgent(client, system_prompt="sys", tools=tools(), prompt_caching=True)
+
+    first_outputs = asyncio.run(drain(agent.ask("first")))
+    first = json.loads(
+        json.dumps(client.chat.completions.create.call_args.kwargs, default=str)
+    )
+    asyncio.run(drain(agent.ask("second")))
+    second = client.chat.completions.create.call_args.kwargs
+
+    assert first["prompt_cache_key"] == second["prompt_cache_key"]
+    assert [t["function"]["name"] for t in second["tools"]] == ["alpha", "zeta"]
+    assert json.dumps(second["tools"]) == json.dumps(first["tools"])
+    prefix = json.dumps(first["messages"])[:-1]
+    assert json.dumps(second["messages"]).startswith(prefix)
+    assert first_outputs[0].cache_read_tokens == 1536
@@ -0,0 +1,204 @@
+import json
+from types import SimpleNamespace as NS
+
+import pytest
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from vibecoder.agents.agent import OpenAIAgent
+from vibecoder.agents.replay import (
+    RecordingClient,
+    ReplayClient,
+    ReplayedAPIError,
+    ReplayError,
+)
+from vibecoder.agents.transport import ResilientTransport, RetryPolicy
+from vibecoder.messages import AgentResponseDelta, ToolResult
+from vibecoder.tools.base import Tool
+
+
+class EchoTool(Tool):
+    name = "echo"
+
+    @property
+    def prompt_description(self):
+        return ""
+
+    @property
+    def signature(self):
+        return {"type": "function", "function": {"name": self.name}}
+
+    async def run(self, tool_use):
+        return ToolResult(
+            content=f"echo {tool_use.arguments['text']}",
+            tool_name=self.name,
+            tool_call_id=tool_use.tool_call_id,
+        )
+
+
+def completion(content=None, tool_call=None):
+    message = {"role": "assistant", "content": content}
+    if tool_call:
+        message["tool_calls"] = [
+            {
+                "id": "call_1",
+                "type": "function",
+                "function": {"name": "echo", "arguments": json.dumps(tool_call)},
+            }
+        ]
+    return ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-test",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if tool_call else "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 10,
+                "completion_tokens": 3,
+                "total_tokens": 13,
+                "prompt_tokens_details": {"cached_tokens": 4},
+            },
+        }
+    )
+
+
+def chunk(content=None, usage=None):
+    choices = [] if usage else [{"index": 0, "delta": {"content": content}}]
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-test",
+            "choices": choices,
+            "usage": usage,
+        }
+    )
+
+
+class ScriptedClient:
+    """Provider client that returns (or raises) scripted responses in order."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.chat = NS(completions=NS(create=self.create))
+
+    async def create(self, **kwargs):
+        item = self.script.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        if kwargs.get("stream"):
+            return self._stream(item)
+        return item
+
+    async def _stream(self, chunks):
+        for item in chunks:
+            yield item
+
+
+def make_agent(client, **kwargs):
+    return OpenAIAgent(
+        client,
+        model="gpt-test",
+        system_prompt="You are a test agent",
+        tools={"echo": EchoTool()},
+        **kwargs,
+    )
+
+
+def summarize(messages):
+    return [(type(m).__name__, m.content, m.input_tokens) for m in messages]
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_multi_turn_session(tmp_path):
+    cassette = tmp_path / "session.jsonl"
+    script = [completion(tool_call={"text": "hi"}), completion(content="done")]
+    recorder = RecordingClient(ScriptedClient(script), str(cassette))
+    recorded = [m async for m in make_agent(recorder).ask("say hi")]
+
+    lines = [json.loads(line) for line in cassette.read_text().splitlines()]
+    assert [line["seq"] for line in lines] == [0, 1]
+    assert lines[0]["request"]["messages"][-1] == {
+        "role": "user",
+        "content": "say hi",
+    }
+
+    replayer = ReplayClient(str(cassette), latency=0, strict=True)
+    replayed = [m async for m in make_agent(replayer).ask("say hi")]
+
+    assert summarize(replayed) == summarize(recorded)
+    assert replayed[-1].cache_read_tokens == 4
+    assert replayer.remaining == 0
+
+
+@pytest.mark.asyncio
+async def test_replay_streamed_session_with_recorded_latency(tmp_path):
+    cassette = tmp_path / "stream.jsonl"
+    usage = {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}
+    script = [[chunk("Hel"), chunk("lo"), chunk(usage=usage)]]
+    recorder = RecordingClient(ScriptedClient(script), str(cassette))
+    [m async for m in make_agent(recorder, stream=True).ask("hi")]
+
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+
+    replayer = ReplayClient(str(cassette), sleep=sleep)
+    replayed = [m async for m in make_agent(replayer, stream=True).ask("hi")]
+
+    deltas = [m.content for m in replayed if isinstance(m, AgentResponseDelta)]
+    assert "".join(deltas) == "Hello"
+    assert replayed[-1].input_tokens == 5
+    # One wait for the initial latency, then one per chunk at most.
+    assert 1 <= len(slept) <= 4
+
+
+@pytest.mark.asyncio
+async def test_replay_reproduces_recorded_errors(tmp_path):
+    cassette = tmp_path / "errors.jsonl"
+    error = Exception("rate limited")
+    error.status_code = 429
+    error.response = NS(headers={"retry-after": "0"})
+    recorder = RecordingClient(
+        ScriptedClient([error, completion(content="ok")]), str(cassette)
+    )
+    transport = ResilientTransport(RetryPolicy(base_delay=0))
+    [m async for m in make_agent(recorder, transport=transport).ask("hi")]
+
+    replayer = ReplayClient(str(cassette), latency=0)
+    with pytest.raises(ReplayedAPIError) as info:
+        await replayer.chat.completions.create(messages=[])
+    assert info.value.status_code == 429
+    assert info.value.response.headers == {"retry-after": "0"}
+
+    replayer.rewind()
+    transport = ResilientTransport(RetryPolicy(base_delay=0))
+    messages = [m async for m in make_agent(replayer, transport=transport).ask("hi")]
+    assert messages[0].content == "ok"
+    assert transport.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_strict_replay_rejects_different_requests(tmp_path):
+    cassette = tmp_path / "session.jsonl"
+    recorder = RecordingClient(
+        ScriptedClient([completion(content="done")]), str(cassette)
+    )
+    [m async for m in make_agent(recorder).ask("one thing")]
+
+    replayer = ReplayClient(str(cassette), latency=0, strict=True)
+    with pytest.raises(ReplayError, match="do not match"):
+        [m async for m in make_agent(replayer).ask("another thing")]
+
+    replayer.rewind()
+    [m async for m in make_agent(replayer).ask("one thing")]
+    with pytest.raises(ReplayError, match="exhausted"):
+        [m async for m in make_agent(replayer).ask("one thing")]
@@ -0,0 +1,143 @@
+import pytest
+
+from vibecoder.agents import repo_map, swe
+from vibecoder.agents.repo_map import ModuleMap, build_repo_map
+from vibecoder.tools import symbol_index
+
+MODELS = """\
+class Shape:
+    def __init__(self, name):
+        self.name = name
+
+    def area(self) -> float:
+        raise NotImplementedError
+
+    def _cache(self):
+        pass
+
+
+def _helper():
+    pass
+
+
+def total_area(shapes):
+    return sum(s.area() for s in shapes)
+"""
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    # app/ is a namespace package: it has no __init__.py.
+    (tmp_path / "app" / "geometry").mkdir(parents=True)
+    (tmp_path / "app" / "geometry" / "__init__.py").write_text("")
+    (tmp_path / "app" / "geometry" / "models.py").write_text(MODELS)
+    (tmp_path / "app" / "geometry" / "circle.py").write_text(
+        "from .models import Shape\n\n\nclass Circle(Shape):\n    pass\n"
+    )
+    (tmp_path / "app" / "cli.py").write_text(
+        "import json\n"
+        "from app.geometry import circle\n"
+        "from app.geometry.models import total_area\n\n\n"
+        "def main(argv=None):\n    pass\n"
+    )
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_models.py").write_text(
+        "from geometry.models import Shape\n\n\ndef test_shape():\n    pass\n"
+    )
+    (tmp_path / "README.md").write_text("# Shapes\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(symbol_index, "_indexes", {})
+    monkeypatch.setattr(repo_map, "_outlines", {})
+    return tmp_path
+
+
+def test_imports_resolve_to_workspace_files(project):
+    index = symbol_index.index_for(str(project))
+    modules = ModuleMap(index.files)
+    # Importing a module from a package imports the package too.
+    assert modules.imported_by("app/cli.py", index) == {
+        "app/geometry/__init__.py",
+        "app/geometry/circle.py",
+        "app/geometry/models.py",
+    }
+    assert modules.imported_by("app/geometry/circle.py", index) == {
+        "app/geometry/models.py"
+    }
+    # Imports through a src-style root match by suffix; others are external.
+    assert modules.imported_by("tests/test_models.py", index) == {
+        "app/geometry/models.py"
+    }
+    assert modules.resolve("json") is None
+
+
+def test_map_ranks_by_import_count(project):
+    assert build_repo_map(str(project)) == "\n".join(
+        [
+            "app/geometry/models.py",
+            "  class Shape",
+            "    def __init__(self, name)",
+            "    def area(self) -> float",
+            "  def total_area(shapes)",
+            "app/geometry/__init__.py",
+            "app/geometry/circle.py",
+            "  class Circle(Shape)",
+            "app/cli.py",
+            "  def main(argv=None)",
+            "tests/test_models.py",
+            "  def test_shape()",
+            "README.md",
+        ]
+    )
+
+
+def test_map_fits_the_budget(project):
+    small = build_repo_map(str(project), max_tokens=20)
+    assert small.splitlines() == [
+        # Outlines that do not fit are left out before the paths.
+        "app/geometry/models.py",
+        "app/geometry/__init__.py",
+        "app/geometry/circle.py",
+        "[... 3 more files not shown]",
+    ]
+    assert build_repo_map(str(project), max_tokens=1) == (
+        "[... 6 more files not shown]"
+    )
+
+
+def test_map_is_rebuilt_incrementally(project, monkeypatch):
+    build_repo_map(str(project))
+    parsed = []
+    real_parse = symbol_index.parse_source
+    monkeypatch.setattr(
+        symbol_index,
+        "parse_source",
+        lambda source: parsed.append(source) or real_parse(source),
+    )
+    outlined = []
+    real_definitions = symbol_index.SymbolIndex.definitions
+    monkeypatch.setattr(
+        symbol_index.SymbolIndex,
+        "definitions",
+        lambda self, rel: outlined.append(rel) or real_definitions(self, rel),
+    )
+
+    (project / "app" / "cli.py").write_text(
+        "def main(argv, verbose=False):\n    pass\n"
+    )
+    result = build_repo_map(str(project))
+    assert len(parsed) == 1
+    assert outlined == ["app/cli.py"]
+    assert "  def main(argv, verbose=False)" in result
+    # cli.py no longer imports circle.py, which drops below it.
+    assert result.index("app/cli.py") < result.index("app/geometry/circle.py")
+
+
+def test_swe_prompt_includes_the_map(project, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    agent = swe.build_swe_agent()
+    system_prompt = agent.messages[0]["content"]
+    assert "app/geometry/models.py\n  class Shape\n" in system_prompt
+
+    monkeypatch.setenv("VIBECODER_REPO_MAP_TOKENS", "0")
+    agent = swe.build_swe_agent()
+    assert "class Shape" not in agent.messages[0]["content"]
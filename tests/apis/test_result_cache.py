@@ -0,0 +1,120 @@
+import asyncio
+import os
+
+import pytest
+
+from vibecoder.agents import result_cache
+from vibecoder.agents.result_cache import ToolResultCache
+from vibecoder.messages import ToolUse
+from vibecoder.tools.grep import GrepTool
+from vibecoder.tools.read_file import ReadFileTool
+from vibecoder.tools.write_file import WriteFileTool
+
+
+def call(tool, **arguments):
+    return ToolUse(tool_name=tool.name, tool_call_id="call", arguments=arguments)
+
+
+def run(cache, tool, **arguments):
+    return asyncio.run(cache.run(tool, call(tool, **arguments))).content
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.txt").write_text("alpha\n")
+    return tmp_path
+
+
+def test_repeated_read_is_a_hit(workspace):
+    cache = ToolResultCache()
+    read = ReadFileTool()
+    assert run(cache, read, path="a.txt") == "alpha\n"
+    assert run(cache, read, path="a.txt") == "alpha\n"
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_write_invalidates_immediately(workspace):
+    cache = ToolResultCache()
+    read, write = ReadFileTool(), WriteFileTool()
+    run(cache, read, path="a.txt")
+    run(cache, write, path="a.txt", content="beta\n")
+    assert cache.invalidations == 1
+    assert run(cache, read, path="a.txt") == "beta\n"
+    assert cache.hits == 0
+
+
+def test_external_change_is_detected(workspace):
+    cache = ToolResultCache()
+    grep = GrepTool()
+    assert "alpha" in run(cache, grep, pattern="alpha", paths=["."])
+    path = workspace / "b.txt"
+    path.write_text("alpha again\n")
+    assert "alpha again" in run(cache, grep, pattern="alpha", paths=["."])
+    assert cache.hits == 0
+
+
+def test_lru_eviction_respects_memory_limit(workspace):
+    for name in "xyz":
+        (workspace / f"{name}.txt").write_text(name * 40)
+    cache = ToolResultCache(max_bytes=100)
+    read = ReadFileTool()
+    for name in "xyz":
+        run(cache, read, path=f"{name}.txt")
+    assert cache.size_bytes <= 100
+    assert cache.evictions == 1
+    run(cache, read, path="z.txt")
+    assert cache.hits == 1
+    run(cache, read, path="x.txt")
+    assert cache.misses == 4
+
+
+def test_uncacheable_tools_always_run(workspace):
+    cache = ToolResultCache()
+    write = WriteFileTool()
+    run(cache, write, path="c.txt", content="c")
+    run(cache, write, path="c.txt", content="c")
+    assert cache.stats()["entries"] == 0
+    assert os.path.exists(workspace / "c.txt")
+
+
+def test_ignored_directories_are_fingerprinted(workspace, monkeypatch):
+    (workspace / ".gitignore").write_text("vendor/\n")
+    (workspace / "vendor").mkdir()
+    (workspace / "vendor" / "lib.txt").write_text("alpha vendored\n")
+    fingerprinted = []
+    real = result_cache.fingerprint
+    monkeypatch.setattr(
+        result_cache,
+        "fingerprint",
+        lambda paths: fingerprinted.append(paths) or real(paths),
+    )
+    cache = ToolResultCache()
+    grep, read = GrepTool(), ReadFileTool()
+
+    # The snapshot reports changes to tracked files, so only the ignored
+    # directory is stat'ed on each call.
+    run(cache, grep, pattern="alpha", paths=["."])
+    assert fingerprinted[-1] == [str(workspace / "vendor")]
+    run(cache, read, path="a.txt")
+    assert fingerprinted[-1] == []
+
+    assert "vendored" in run(cache, grep, pattern="alpha", paths=["vendor"])
+    (workspace / "vendor" / "lib.txt").write_text("alpha, changed in place\n")
+    assert "changed in place" in run(cache, grep, pattern="alpha", paths=["vendor"])
+    (workspace / "a.txt").write_text("alpha, edited\n")
+    assert run(cache, read, path="a.txt") == "alpha, edited\n"
+    assert cache.hits == 0
+
+
+def test_symlinked_file_is_fingerprinted(workspace):
+    (workspace / "real.txt").write_text("one\n")
+    (workspace / "link.txt").symlink_to("real.txt")
+    cache = ToolResultCache()
+    read = ReadFileTool()
+    assert run(cache, read, path="link.txt") == "one\n"
+
+    (workspace / "real.txt").write_text("two, longer\n")
+    assert run(cache, read, path="link.txt") == "two, longer\n"
+    assert cache.hits == 0
@@ -0,0 +1,140 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from vibecoder.agents.agent import OpenAIAgent
+from vibecoder.agents.scheduler import ToolScheduler, paths_overlap
+from vibecoder.messages import ToolResult, ToolUse
+from vibecoder.tools.base import Tool
+
+
+class RecordingTool(Tool):
+    """Tool that records start/finish order and sleeps for `delay` seconds."""
+
+    def __init__(self, name, read_only, log, delay=0.05):
+        self.name = name
+        self.read_only = read_only
+        self.log = log
+        self.delay = delay
+
+    @property
+    def prompt_description(self):
+        return ""
+
+    @property
+    def signature(self):
+        return {"type": "function", "function": {"name": self.name}}
+
+    def touched_paths(self, args):
+        return [args["path"]]
+
+    async def run(self, tool_use):
+        self.log.append(("start", tool_use.tool_call_id))
+        await asyncio.sleep(self.delay)
+        self.log.append(("end", tool_use.tool_call_id))
+        return ToolResult(
+            content=tool_use.tool_call_id,
+            tool_name=self.name,
+            tool_call_id=tool_use.tool_call_id,
+        )
+
+
+def make_tools(log):
+    return {
+        "read": RecordingTool("read", True, log),
+        "write": RecordingTool("write", False, log),
+    }
+
+
+async def run_calls(tools, calls):
+    async def execute(tool_use):
+        return await tools[tool_use.tool_name].run(tool_use)
+
+    scheduler = ToolScheduler(tools, execute)
+    for call_id, name, path in calls:
+        scheduler.submit(
+            ToolUse(tool_name=name, tool_call_id=call_id, arguments={"path": path})
+        )
+    return [result async for _, result in scheduler.results()]
+
+
+def test_paths_overlap():
+    assert paths_overlap(["/a/b"], ["/a/b"])
+    assert paths_overlap(["/a"], ["/a/b/c.py"])
+    assert not paths_overlap(["/a/b"], ["/a/bc"])
+    assert not paths_overlap([], ["/a"])
+    assert paths_overlap(None, [])
+
+
+@pytest.mark.asyncio
+async def test_reads_run_concurrently():
+    log = []
+    results = await run_calls(
+        make_tools(log), [("1", "read", "a.py"), ("2", "read", "a.py")]
+    )
+    assert [r.content for r in results] == ["1", "2"]
+    # Both reads start before either finishes.
+    assert log[:2] == [("start", "1"), ("start", "2")]
+
+
+@pytest.mark.asyncio
+async def test_write_waits_for_overlapping_calls():
+    log = []
+    results = await run_calls(
+        make_tools(log),
+        [("1", "read", "a.py"), ("2", "write", "a.py"), ("3", "read", "a.py")],
+    )
+    assert [r.content for r in results] == ["1", "2", "3"]
+    assert log == [
+        ("start", "1"),
+        ("end", "1"),
+        ("start", "2"),
+        ("end", "2"),
+        ("start", "3"),
+        ("end", "3"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_writes_to_disjoint_paths_run_concurrently():
+    log = []
+    await run_calls(make_tools(log), [("1", "write", "a.py"), ("2", "write", "b.py")])
+    assert log[:2] == [("start", "1"), ("start", "2")]
+
+
+@pytest.mark.asyncio
+async def test_openai_agent_keeps_call_order():
+    log = []
+    tools = make_tools(log)
+    tools["read"].delay = 0.1
+    tools["write"].delay = 0.01
+
+    def tool_call(call_id, name, path):
+        call = MagicMock()
+        call.id = call_id
+        call.function.name = name
+        call.function.arguments = f'{{"path": "{path}"}}'
+        return call
+
+    first = MagicMock()
+    first.choices[0].message.content = None
+    first.choices[0].message.tool_calls = [
+        tool_call("slow", "read", "a.py"),
+        tool_call("fast", "write", "b.py"),
+    ]
+    second = MagicMock()
+    second.choices[0].message.content = "done"
+    second.choices[0].message.tool_calls = None
+
+    client = AsyncMock()
+    client.chat.completions.create = AsyncMock(side_effect=[first, second])
+    agent = OpenAIAgent(client, system_prompt="test", tools=tools)
+
+    outputs = [out async for out in agent.ask("go")]
+    results = [out.content for out in outputs if isinstance(out, ToolResult)]
+    assert results == ["slow", "fast"]
+    # The fast write finished first, but history is still in call order.
+    assert log.index(("end", "fast")) < log.index(("end", "slow"))
+    call_ids = [m["tool_call_id"] for m in agent.messages if m.get("role") == "tool"]
+    assert call_ids == ["slow", "fast"]
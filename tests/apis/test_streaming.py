@@ -0,0 +1,173 @@
+import asyncio
+import json
+from types import SimpleNamespace as NS
+from unittest.mock import AsyncMock
+
+import pytest
+
+from vibecoder.agents.agent import AnthropicAgent, OpenAIAgent
+from vibecoder.messages import AgentResponse, AgentResponseDelta, ToolResult, ToolUse
+from vibecoder.tools.base import Tool
+
+
+class EventTool(Tool):
+    """Read-only tool that signals when it starts running."""
+
+    name = "lookup"
+    read_only = True
+
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    @property
+    def prompt_description(self):
+        return ""
+
+    @property
+    def signature(self):
+        return {"type": "function", "function": {"name": self.name}}
+
+    def touched_paths(self, args):
+        return []
+
+    async def run(self, tool_use):
+        self.started.set()
+        return ToolResult(
+            content=f"looked up {tool_use.arguments['key']}",
+            tool_name=self.name,
+            tool_call_id=tool_use.tool_call_id,
+        )
+
+
+async def as_stream(items):
+    for item in items:
+        if callable(item):
+            await item()
+        else:
+            yield item
+
+
+def openai_chunk(content=None, tool_calls=None, usage=None):
+    choices = [] if usage else [NS(delta=NS(content=content, tool_calls=tool_calls))]
+    return NS(choices=choices, usage=usage)
+
+
+def openai_call(index, id=None, name=None, arguments=None):
+    return NS(index=index, id=id, function=NS(name=name, arguments=arguments))
+
+
+def openai_text_stream(text):
+    return as_stream(
+        [
+            openai_chunk(content=text),
+            openai_chunk(usage=NS(prompt_tokens=5, completion_tokens=1)),
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_openai_streaming_dispatches_tools_early():
+    tool = EventTool()
+
+    async def wait_for_first_call():
+        # The first call must already be running while the response streams.
+        await asyncio.wait_for(tool.started.wait(), timeout=1)
+
+    first = as_stream(
+        [
+            openai_chunk(content="Let me "),
+            openai_chunk(content="look."),
+            openai_chunk(tool_calls=[openai_call(0, "c1", "lookup", '{"key"')]),
+            openai_chunk(tool_calls=[openai_call(0, arguments=': "a"}')]),
+            openai_chunk(tool_calls=[openai_call(1, "c2", "lookup", '{"key": "b"}')]),
+            wait_for_first_call,
+            openai_chunk(usage=NS(prompt_tokens=10, completion_tokens=4)),
+        ]
+    )
+    client = AsyncMock()
+    client.chat.completions.create = AsyncMock(
+        side_effect=[first, openai_text_stream("done")]
+    )
+    agent = OpenAIAgent(client, tools={"lookup": tool}, stream=True)
+
+    outputs = [out async for out in agent.ask("go")]
+
+    deltas = [o.content for o in outputs if isinstance(o, AgentResponseDelta)]
+    assert deltas[:2] == ["Let me ", "look."]
+    responses = [o.content for o in outputs if isinstance(o, AgentResponse)]
+    assert responses == ["Let me look.", "done"]
+    tool_uses = [o.arguments for o in outputs if isinstance(o, ToolUse)]
+    assert tool_uses == [{"key": "a"}, {"key": "b"}]
+    results = [o.content for o in outputs if isinstance(o, ToolResult)]
+    assert results == ["looked up a", "looked up b"]
+    # Usage is reported once per request.
+    assert sum(o.input_tokens for o in outputs) == 15
+    assert sum(o.output_tokens for o in outputs) == 5
+
+    kwargs = client.chat.completions.create.call_args.kwargs
+    assert kwargs["stream"] is True
+    history = agent.messages[1:]
+    assert history[1] == {"role": "assistant", "content": "Let me look."}
+    assert json.loads(history[2]["tool_calls"][0]["function"]["arguments"]) == {
+        "key": "a"
+    }
+
+
+@pytest.mark.asyncio
+async def test_anthropic_streaming_dispatches_tools_early():
+    tool = EventTool()
+
+    async def wait_for_call():
+        await asyncio.wait_for(tool.started.wait(), timeout=1)
+
+    def event(type, **kwargs):
+        return NS(type=type, **kwargs)
+
+    first = as_stream(
+        [
+            event("message_start", message=NS(usage=NS(input_tokens=7))),
+            event("content_block_start", index=0, content_block=NS(type="text")),
+            event(
+                "content_block_delta", index=0, delta=NS(type="text_delta", text="Hi")
+            ),
+            event("content_block_stop", index=0),
+            event(
+                "content_block_start",
+                index=1,
+                content_block=NS(type="tool_use", id="t1", name="lookup"),
+            ),
+            event(
+                "content_block_delta",
+                index=1,
+                delta=NS(type="input_json_delta", partial_json='{"key": "x"}'),
+            ),
+            event("content_block_stop", index=1),
+            wait_for_call,
+            event("message_delta", usage=NS(output_tokens=3)),
+            event("message_stop"),
+        ]
+    )
+    second = as_stream(
+        [
+            event("message_start", message=NS(usage=NS(input_tokens=9))),
+            event("content_block_start", index=0, content_block=NS(type="text")),
+            event(
+                "content_block_delta", index=0, delta=NS(type="text_delta", text="ok")
+            ),
+            event("content_block_stop", index=0),
+            event("message_delta", usage=NS(output_tokens=1)),
+        ]
+    )
+    client = AsyncMock()
+    client.messages.create = AsyncMock(side_effect=[first, second])
+    agent = AnthropicAgent(client, tools={"lookup": tool}, stream=True)
+
+    outputs = [out async for out in agent.ask("go")]
+
+    responses = [o.content for o in outputs if isinstance(o, AgentResponse)]
+    assert responses == ["Hi", "ok"]
+    results = [o.content for o in outputs if isinstance(o, ToolResult)]
+    assert results == ["looked up x"]
+    assert sum(o.input_tokens for o in outputs) == 16
+    assert sum(o.output_tokens for o in outputs) == 4
+    assert agent.messages[2]["content"][0]["input"] == {"key": "x"}
@@ -0,0 +1,172 @@
+import asyncio
+import json
+from types import SimpleNamespace as NS
+from unittest.mock import AsyncMock
+
+import pytest
+
+from vibecoder.agents.agent import AnthropicAgent, OpenAIAgent
+from vibecoder.agents.telemetry import (
+    ModelPrice,
+    RollingTimings,
+    Telemetry,
+    price_for,
+)
+from vibecoder.messages import ToolResult
+from vibecoder.tools.base import Tool
+
+
+class SleepTool(Tool):
+    name = "nap"
+    read_only = True
+
+    @property
+    def prompt_description(self):
+        return ""
+
+    @property
+    def signature(self):
+        return {"type": "function", "function": {"name": self.name}}
+
+    def touched_paths(self, args):
+        return []
+
+    async def run(self, tool_use):
+        await asyncio.sleep(0.01)
+        return ToolResult(
+            content="rested", tool_name=self.name, tool_call_id=tool_use.tool_call_id
+        )
+
+
+def openai_response(content=None, calls=(), prompt_tokens=100, cached=0):
+    tool_calls = [
+        NS(id=f"c{i}", function=NS(name="nap", arguments=json.dumps({"n": i})))
+        for i in range(len(calls))
+    ]
+    return NS(
+        choices=[NS(message=NS(content=content, tool_calls=tool_calls or None))],
+        usage=NS(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=10,
+            prompt_tokens_details=NS(cached_tokens=cached),
+        ),
+    )
+
+
+def test_rolling_percentiles_use_recent_window():
+    timings = RollingTimings(window=10)
+    for ms in range(1, 101):
+        timings.add(ms / 1000)
+
+    summary = timings.summary()
+    assert summary["count"] == 100
+    assert summary["p50_s"] == pytest.approx(0.095)
+    assert summary["max_s"] == pytest.approx(0.1)
+    assert summary["mean_s"] == pytest.approx(0.0505)
+
+
+def test_price_lookup_prefers_longest_prefix():
+    prices = {"gpt-5": ModelPrice(1, 1), "gpt-5-mini": ModelPrice(2, 2)}
+    assert price_for("gpt-5-mini-2025-08-07", prices).input == 2
+    assert price_for("gpt-5", prices).input == 1
+    assert price_for("llama", prices) is None
+
+
+def test_request_cost_accounts_for_cached_tokens():
+    prices = {"m": ModelPrice(input=1.0, output=2.0, cache_read=0.1, cache_write=1.25)}
+    telemetry = Telemetry(prices=prices)
+
+    openai = telemetry.record_request(
+        "openai", "m", 1.0, input_tokens=1000, output_tokens=100, cache_read_tokens=800
+    )
+    anthropic = telemetry.record_request(
+        "anthropic",
+        "m",
+        1.0,
+        input_tokens=200,
+        output_tokens=100,
+        cache_read_tokens=800,
+        cache_write_tokens=100,
+    )
+    unknown = telemetry.record_request("openai", "other", 1.0, input_tokens=5)
+
+    # OpenAI's prompt tokens include the cached ones; Anthropic's do not.
+    assert openai.cost_usd == pytest.approx((200 * 1 + 100 * 2 + 800 * 0.1) / 1e6)
+    assert anthropic.cost_usd == pytest.approx(
+        (200 * 1 + 100 * 2 + 800 * 0.1 + 100 * 1.25) / 1e6
+    )
+    assert unknown.cost_usd is None
+    assert telemetry.totals["requests"] == 3
+    assert telemetry.totals["unpriced_requests"] == 1
+    assert telemetry.totals["input_tokens"] == 1205
+
+
+@pytest.mark.asyncio
+async def test_openai_usage_is_counted_once_per_request():
+    client = AsyncMock()
+    client.chat.completions.create = AsyncMock(
+        side_effect=[
+            openai_response("Napping twice", calls=[0, 1], prompt_tokens=100),
+            openai_response("Done", prompt_tokens=150, cached=100),
+        ]
+    )
+    agent = OpenAIAgent(client, model="gpt-5-mini", tools={"nap": SleepTool()})
+
+    outputs = [out async for out in agent.ask("rest")]
+
+    assert sum(o.input_tokens for o in outputs) == 250
+    assert sum(o.output_tokens for o in outputs) == 20
+    assert sum(o.cache_read_tokens for o in outputs) == 100
+
+    snapshot = agent.telemetry.snapshot()
+    assert snapshot["totals"]["requests"] == 2
+    assert snapshot["totals"]["input_tokens"] == 250
+    assert snapshot["totals"]["cost_usd"] > 0
+    assert snapshot["timings"]["tool.nap"]["count"] == 2
+    assert snapshot["timings"]["tool.nap"]["p50_s"] >= 0.01
+    assert snapshot["timings"]["model"]["count"] == 2
+    assert snapshot["timings"]["serialize"]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_anthropic_usage_is_counted_once_per_request():
+    usage = NS(
+        input_tokens=20,
+        output_tokens=5,
+        cache_read_input_tokens=300,
+        cache_creation_input_tokens=0,
+    )
+    first = NS(
+        content=[
+            NS(type="text", text="Two naps"),
+            NS(type="tool_use", id="a", name="nap", input={}),
+            NS(type="tool_use", id="b", name="nap", input={}),
+        ],
+        usage=usage,
+    )
+    second = NS(content=[NS(type="text", text="Done")], usage=usage)
+    client = AsyncMock()
+    client.messages.create = AsyncMock(side_effect=[first, second])
+    agent = AnthropicAgent(client, tools={"nap": SleepTool()})
+
+    outputs = [out async for out in agent.ask("rest")]
+
+    assert sum(o.input_tokens for o in outputs) == 40
+    assert sum(o.cache_read_tokens for o in outputs) == 600
+    assert agent.telemetry.totals["cache_read_tokens"] == 600
+    assert agent.telemetry.requests[-1].provider == "anthropic"
+
+
+def test_report_lists_spans():
+    telemetry = Telemetry()
+    telemetry.add_timing("tool.grep", 0.002)
+    telemetry.record_request("openai", "gpt-5-mini", 0.5, input_tokens=10)
+
+    report = "\n".join(telemetry.report())
+
+    assert "Requests: 1" in report
+    assert "tool.grep" in report
+    assert "model" in report
+
+    telemetry.reset()
+    assert telemetry.snapshot()["totals"]["requests"] == 0
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import AsyncOpenAI, RateLimitError
+
+from vibecoder.agents.agent import OpenAIAgent
+from vibecoder.agents.transport import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientTransport,
+    RetryPolicy,
+    retry_after,
+)
+from vibecoder.messages import AgentResponse
+
+
+def completion(text):
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-test",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12},
+    }
+
+
+class FakeProvider:
+    """
+    Local chat completions endpoint that plays back a script of responses.
+
+    Each entry is (status, headers, delay, body); the last entry repeats once
+    the script runs out.
+    """
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = 0
+        self.lock = threading.Lock()
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("content-length", 0)))
+                with provider.lock:
+                    index = min(provider.requests, len(provider.script) - 1)
+                    provider.requests += 1
+                status, headers, delay, body = provider.script[index]
+                time.sleep(delay)
+                payload = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("content-type", "application/json")
+                    self.send_header("content-length", str(len(payload)))
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_agent(provider, transport):
+    client = AsyncOpenAI(base_url=provider.base_url, api_key="test", max_retries=0)
+    return OpenAIAgent(
+        client=client,
+        model="gpt-test",
+        system_prompt="You are a test agent",
+        tools={},
+        transport=transport,
+    )
+
+
+ERROR = {"error": {"message": "boom", "type": "server_error"}}
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_honours_retry_after():
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+
+    script = [
+        (429, {"retry-after": "2"}, 0, ERROR),
+        (200, {}, 0, completion("hello")),
+    ]
+    transport = ResilientTransport(RetryPolicy(base_delay=0.01), sleep=sleep)
+    with FakeProvider(script) as provider:
+        messages = [m async for m in make_agent(provider, transport).ask("hi")]
+
+    assert provider.requests == 2
+    assert slept == [2.0]
+    assert transport.retries == 1
+    assert isinstance(messages[0], AgentResponse)
+    assert messages[0].content == "hello"
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_capped():
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+
+    script = [
+        (429, {"retry-after-ms": "900000"}, 0, ERROR),
+        (200, {}, 0, completion("ok")),
+    ]
+    policy = RetryPolicy(base_delay=0.01, max_retry_after=1.5)
+    transport = ResilientTransport(policy, sleep=sleep)
+    with FakeProvider(script) as provider:
+        [m async for m in make_agent(provider, transport).ask("hi")]
+
+    assert slept == [1.5]
+
+
+@pytest.mark.asyncio
+async def test_repeated_server_errors_open_the_circuit():
+    async def sleep(seconds):
+        pass
+
+    clock = [0.0]
+    breaker = CircuitBreaker(
+        failure_threshold=3, reset_timeout=10, clock=lambda: clock[0]
+    )
+    transport = ResilientTransport(
+        RetryPolicy(max_retries=5, base_delay=0.01), breaker, sleep=sleep
+    )
+    with FakeProvider([(500, {}, 0, ERROR)]) as provider:
+        agent = make_agent(provider, transport)
+        with pytest.raises(CircuitOpenError):
+            [m async for m in agent.ask("hi")]
+        assert provider.requests == 3
+        assert breaker.state == "open"
+
+        # Fails fast without reaching the provider while open.
+        with pytest.raises(CircuitOpenError):
+            [m async for m in agent.ask("again")]
+        assert provider.requests == 3
+
+        # After the timeout a single trial request is let through.
+        provider.script = [(200, {}, 0, completion("recovered"))]
+        clock[0] = 11
+        messages = [m async for m in agent.ask("later")]
+        assert messages[0].content == "recovered"
+        assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_trial_releases_the_circuit():
+    clock = [0.0]
+    breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=10, clock=lambda: clock[0]
+    )
+    breaker.record_failure()
+    clock[0] = 11
+    transport = ResilientTransport(RetryPolicy(max_retries=0), breaker)
+
+    async def hangs():
+        await asyncio.sleep(60)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(transport.call(hangs), 0.01)
+    assert breaker.state == "half_open"
+
+    async def answers():
+        return "recovered"
+
+    assert await transport.call(answers) == "recovered"
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    transport = ResilientTransport(RetryPolicy(base_delay=0.01))
+    bad_request = {"error": {"message": "bad", "type": "invalid_request_error"}}
+    with FakeProvider([(400, {}, 0, bad_request)]) as provider:
+        with pytest.raises(Exception) as info:
+            [m async for m in make_agent(provider, transport).ask("hi")]
+
+    assert getattr(info.value, "status_code", None) == 400
+    assert provider.requests == 1
+    assert transport.breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged():
+    transport = ResilientTransport(hedge_percentile=95, hedge_min_samples=5)
+    transport.latencies.extend([0.05] * 5)
+    script = [
+        (200, {}, 2.0, completion("slow")),
+        (200, {}, 0, completion("fast")),
+    ]
+    with FakeProvider(script) as provider:
+        start = time.monotonic()
+        messages = [m async for m in make_agent(provider, transport).ask("hi")]
+        elapsed = time.monotonic() - start
+
+    assert messages[0].content == "fast"
+    assert transport.hedges == 1
+    assert provider.requests == 2
+    assert elapsed < 1.5
+
+
+def test_retry_after_parses_http_dates():
+    class Response:
+        headers = {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}
+
+    error = RateLimitError.__new__(RateLimitError)
+    error.response = Response()
+    assert retry_after(error) == 0.0
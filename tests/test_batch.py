@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from vibecoder.batch import BatchRunner, completed_ids, load_tasks, task_workdir
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_load_tasks_assigns_ids(tmp_path):
+    tasks_path = tmp_path / "tasks.jsonl"
+    write_jsonl(tasks_path, [{"prompt": "a"}, {"id": 7, "prompt": "b"}])
+
+    tasks = load_tasks(str(tasks_path))
+
+    assert [t["id"] for t in tasks] == ["1", "7"]
+
+
+def test_load_tasks_rejects_duplicates(tmp_path):
+    tasks_path = tmp_path / "tasks.jsonl"
+    write_jsonl(tasks_path, [{"id": "x", "prompt": "a"}, {"id": "x", "prompt": "b"}])
+
+    with pytest.raises(ValueError, match="duplicate"):
+        load_tasks(str(tasks_path))
+
+
+def test_completed_ids_skips_truncated_lines(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text(
+        json.dumps({"id": "a", "status": "ok"})
+        + "\n"
+        + json.dumps({"id": "b", "status": "error"})
+        + '\n{"id": "c", "sta'
+    )
+
+    assert completed_ids(str(output)) == {"a", "b"}
+    assert completed_ids(str(output), retry_failed=True) == {"a"}
+
+
+def test_task_workdir_copies_source_once(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "main.py").write_text("print(1)\n")
+    task = {"id": "task/1", "prompt": "p", "source": str(source)}
+
+    workdir = task_workdir(task, str(tmp_path / "runs"))
+    (tmp_path / "runs" / "task_1" / "main.py").write_text("changed\n")
+
+    assert workdir == str(tmp_path / "runs" / "task_1")
+    assert task_workdir(task, str(tmp_path / "runs")) == workdir
+    assert (tmp_path / "runs" / "task_1" / "main.py").read_text() == "changed\n"
+
+
+def test_task_workdir_does_not_copy_the_root_into_itself(tmp_path):
+    (tmp_path / "main.py").write_text("print(1)\n")
+    (tmp_path / ".vibecoder").mkdir()
+    (tmp_path / ".vibecoder" / "trigram.idx").write_text("index")
+    root = tmp_path / ".vibecoder" / "batch"
+
+    for task_id in ["a", "b"]:
+        task_workdir({"id": task_id, "prompt": "p", "source": str(tmp_path)}, str(root))
+
+    assert sorted(p.name for p in root.iterdir()) == ["a", "b"]
+    assert sorted(p.name for p in (root / "b").iterdir()) == ["main.py"]
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_tasks_in_isolated_workdirs(tmp_path):
+    output = tmp_path / "out.jsonl"
+    tasks = [{"id": str(i), "prompt": f"task {i}"} for i in range(3)]
+    runner = BatchRunner(
+        str(output), str(tmp_path / "runs"), concurrency=2, role="mock", echo=str
+    )
+
+    results = await runner.run(tasks)
+
+    assert results == {"ok": 3}
+    records = {r["id"]: r for r in read_jsonl(output)}
+    assert set(records) == {"0", "1", "2"}
+    for task_id, record in records.items():
+        assert record["status"] == "ok"
+        assert record["workdir"] == str(tmp_path / "runs" / task_id)
+        assert record["messages"][0]["type"] == "AgentResponse"
+        assert set(record["usage"]) == {
+            "input_tokens",
+            "output_tokens",
+            "cache_read_tokens",
+            "cache_write_tokens",
+        }
+        assert record["duration_s"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_batch_records_worker_errors(tmp_path):
+    output = tmp_path / "out.jsonl"
+    runner = BatchRunner(str(output), str(tmp_path / "runs"), role="nope", echo=str)
+
+    results = await runner.run([{"id": "bad", "prompt": "p"}])
+
+    assert results == {"error": 1}
+    (record,) = read_jsonl(output)
+    assert record["status"] == "error"
+    assert "Traceback" in record["error"]
+
+
+@pytest.mark.asyncio
+async def test_batch_timeout(tmp_path):
+    output = tmp_path / "out.jsonl"
+    runner = BatchRunner(
+        str(output), str(tmp_path / "runs"), role="mock", timeout=0.001, echo=str
+    )
+
+    results = await runner.run([{"id": "slow", "prompt": "p"}])
+
+    assert results == {"timeout": 1}
+    assert read_jsonl(output)[0]["status"] == "timeout"
@@ -47,3 +47,18 @@ async def test_ask_functionality(setup_mock_agent):
         # Check that the last_output was saved correctly
         print(manager.last_output)
         assert any("This is a test response" in resp for resp in manager.last_output)
+
+
+@pytest.mark.asyncio
+async def test_context_rejects_budgets_below_one(setup_mock_agent):
+    with patch("vibecoder.main.build_swe_agent", return_value=setup_mock_agent):
+        manager = REPLContextManager()
+        manager.agent.context_window = None
+
+        for setting in ["0", "-500", "lots"]:
+            await manager.handle_command(f"context {setting}")
+            assert manager.agent.context_window is None
+            assert "Usage: /context" in manager._output_lines[-1][1]
+
+        await manager.handle_command("context 500")
+        assert manager.agent.context_window.max_tokens == 500
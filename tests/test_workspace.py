@@ -0,0 +1,181 @@
+import os
+
+import pytest
+
+from vibecoder import workspace
+from vibecoder.tools import grep_engine
+from vibecoder.workspace import WorkspaceSnapshot
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / ".gitignore").write_text("build/\n*.log\n")
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "main.py").write_text("main\n")
+    (tmp_path / "src" / "pkg" / "util.py").write_text("util\n")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "out.o").write_text("obj\n")
+    (tmp_path / "debug.log").write_text("log\n")
+    (tmp_path / "README.md").write_text("readme\n")
+    return tmp_path
+
+
+@pytest.fixture(params=["inotify", "poll"])
+def snapshot(request, tree):
+    snapshot = WorkspaceSnapshot(str(tree), watch=request.param)
+    yield snapshot
+    snapshot.close()
+
+
+def changed(snapshot):
+    return sorted((c.kind, c.path) for c in snapshot.refresh())
+
+
+def names(snapshot, **kwargs):
+    return [rel for rel, _ in snapshot.files(**kwargs)]
+
+
+def test_files_follow_the_search_walk(snapshot, tree):
+    assert names(snapshot) == [
+        ".gitignore",
+        "README.md",
+        "src/main.py",
+        "src/pkg/util.py",
+    ]
+    assert "debug.log" in names(snapshot, include_ignored=True)
+    # Ignored directories are listed, but not descended into.
+    assert snapshot.directory("").dirs == {"build": True, "src": False}
+    assert snapshot.directory("build") is None
+
+    walked = grep_engine.walk_files(str(tree), grep_engine.SearchOptions())
+    assert [os.path.relpath(p, tree) for p in walked] == names(snapshot)
+    assert names(snapshot, rel="src", skip=("src",)) == [
+        "src/main.py",
+        "src/pkg/util.py",
+    ]
+    assert names(snapshot, skip=("src",)) == [".gitignore", "README.md"]
+
+
+def test_refresh_reports_changes(snapshot, tree):
+    assert changed(snapshot) == []
+    (tree / "src" / "main.py").write_text("main, edited\n")
+    (tree / "src" / "new.py").write_text("new\n")
+    (tree / "README.md").unlink()
+    assert changed(snapshot) == [
+        ("added", "src/new.py"),
+        ("modified", "src/main.py"),
+        ("removed", "README.md"),
+    ]
+
+    (tree / "src" / "pkg" / "util.py").unlink()
+    (tree / "src" / "pkg").rmdir()
+    (tree / "docs").mkdir()
+    (tree / "docs" / "index.md").write_text("docs\n")
+    assert changed(snapshot) == [
+        ("added", "docs"),
+        ("added", "docs/index.md"),
+        ("removed", "src/pkg"),
+        ("removed", "src/pkg/util.py"),
+    ]
+    assert names(snapshot, rel="src") == ["src/main.py", "src/new.py"]
+    assert changed(snapshot) == []
+
+
+def test_gitignore_changes_flip_directories(snapshot, tree):
+    (tree / ".gitignore").write_text("src/\n")
+    changes = changed(snapshot)
+    assert ("modified", ".gitignore") in changes
+    assert ("removed", "src") in changes
+    assert names(snapshot) == [".gitignore", "README.md", "debug.log", "build/out.o"]
+
+    (tree / ".gitignore").write_text("")
+    changed(snapshot)
+    assert names(snapshot) == [
+        ".gitignore",
+        "README.md",
+        "debug.log",
+        "build/out.o",
+        "src/main.py",
+        "src/pkg/util.py",
+    ]
+
+
+def test_changes_in_ignored_directories_are_not_tracked(snapshot, tree):
+    (tree / "build" / "more.o").write_text("obj\n")
+    assert changed(snapshot) == []
+    assert snapshot.uncovered(str(tree)) == [str(tree / "build")]
+    assert snapshot.uncovered(str(tree / "src")) == []
+    assert snapshot.uncovered(str(tree / "src" / "missing.py")) == []
+    assert snapshot.uncovered(str(tree / "build" / "out.o")) == [
+        str(tree / "build" / "out.o")
+    ]
+    outside = os.path.dirname(str(tree))
+    assert snapshot.uncovered(outside) == [outside]
+
+
+def test_subscribers_receive_each_batch(snapshot, tree):
+    class Listener:
+        def __init__(self):
+            self.batches = []
+
+        def __call__(self, changes):
+            self.batches.append([c.path for c in changes])
+
+        def on_changes(self, changes):
+            self(changes)
+
+    received = []
+    snapshot.subscribe(received.extend)
+    listener = Listener()
+    snapshot.subscribe(listener.on_changes)
+
+    (tree / "a.txt").write_text("a\n")
+    snapshot.refresh()
+    assert [c.abspath for c in received] == [str(tree / "a.txt")]
+    assert listener.batches == [["a.txt"]]
+    version = snapshot.version
+
+    # Bound methods are held weakly.
+    del listener
+    snapshot.unsubscribe(received.extend)
+    (tree / "b.txt").write_text("b\n")
+    snapshot.refresh()
+    assert len(received) == 1
+    assert snapshot._subscribers == []
+    assert snapshot.version == version + 1
+
+
+def test_running_out_of_watches_falls_back_to_polling(tree, monkeypatch):
+    snapshot = WorkspaceSnapshot(str(tree), watch="inotify")
+    if snapshot.mode != "inotify":
+        pytest.skip("inotify is not available")
+
+    def add(self, path):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(workspace._Inotify, "add", add)
+    (tree / "lib").mkdir()
+    (tree / "lib" / "x.py").write_text("x\n")
+    assert changed(snapshot) == [("added", "lib"), ("added", "lib/x.py")]
+    assert snapshot.mode == "poll"
+    (tree / "lib" / "x.py").write_text("x = 1\n")
+    assert changed(snapshot) == [("modified", "lib/x.py")]
+
+
+def test_snapshot_for_shares_and_evicts(tmp_path, monkeypatch):
+    monkeypatch.setattr(workspace, "_snapshots", workspace.OrderedDict())
+    monkeypatch.setattr(workspace, "MAX_SNAPSHOTS", 2)
+    roots = []
+    for name in "abc":
+        (tmp_path / name).mkdir()
+        roots.append(str(tmp_path / name))
+
+    first = workspace.snapshot_for(roots[0])
+    assert workspace.snapshot_for(roots[0] + "/") is first
+    (tmp_path / "a" / "f.txt").write_text("f\n")
+    assert workspace.snapshot_for(roots[0]).directory("").files.keys() == {"f.txt"}
+
+    workspace.snapshot_for(roots[1])
+    workspace.snapshot_for(roots[2])
+    assert list(workspace._snapshots) == roots[1:]
+    assert first.mode == "poll"
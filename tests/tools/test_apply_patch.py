@@ -1,7 +1,9 @@
 import asyncio
+import threading
 
 import pytest
 
+from vibecoder.tools import apply_patch_lib
 from vibecoder.tools.apply_patch import ApplyPatchTool
 from vibecoder.tools.apply_patch_lib import DiffError
 
@@ -13,12 +15,12 @@ def test_apply_patch_success(monkeypatch):
 
     called = {}
 
-    def fake_process_patch(text, open_fn, write_fn, remove_fn):
+    async def fake_process_patch(text, open_fn, write_fn, remove_fn):
         called["patch_text"] = text
         return "Done!"
 
     monkeypatch.setattr(
-        "vibecoder.tools.apply_patch_lib.process_patch", fake_process_patch
+        "vibecoder.tools.apply_patch_lib.process_patch_async", fake_process_patch
     )
 
     args = {"input": "*** Begin Patch\n...patch content...\n*** End Patch"}
@@ -44,11 +46,11 @@ def test_apply_patch_diff_error(monkeypatch):
 
     tool = ApplyPatchTool()
 
-    def fake_process_patch(text, open_fn, write_fn, remove_fn):
+    async def fake_process_patch(text, open_fn, write_fn, remove_fn):
         raise DiffError("Patch failed.")
 
     monkeypatch.setattr(
-        "vibecoder.tools.apply_patch_lib.process_patch", fake_process_patch
+        "vibecoder.tools.apply_patch_lib.process_patch_async", fake_process_patch
     )
 
     args = {"input": "*** Begin Patch\n...bad patch...\n*** End Patch"}
@@ -63,11 +65,11 @@ def test_apply_patch_generic_exception(monkeypatch):
 
     tool = ApplyPatchTool()
 
-    def fake_process_patch(text, open_fn, write_fn, remove_fn):
+    async def fake_process_patch(text, open_fn, write_fn, remove_fn):
         raise Exception("Something unexpected")
 
     monkeypatch.setattr(
-        "vibecoder.tools.apply_patch_lib.process_patch", fake_process_patch
+        "vibecoder.tools.apply_patch_lib.process_patch_async", fake_process_patch
     )
 
     args = {"input": "*** Begin Patch\n...patch content...\n*** End Patch"}
@@ -75,3 +77,73 @@ def test_apply_patch_generic_exception(monkeypatch):
     output = asyncio.run(tool.run_helper(args))
 
     assert "Unexpected error" in output
+
+
+PATCH = """*** Begin Patch
+*** Update File: a.py
+@@
+-a = 1
++a = 2
+*** Update File: b.py
+@@
+-b = 1
++b = 2
+*** Delete File: c.py
+*** Add File: d.py
++d = 1
+*** End Patch
+"""
+
+
+def test_process_patch_async_loads_and_writes_concurrently():
+    files = {"a.py": "a = 1\n", "b.py": "b = 1\n", "c.py": "c = 1\n"}
+    # Each barrier only opens once every file has reached it at the same time.
+    loading = threading.Barrier(3, timeout=5)
+    writing = threading.Barrier(4, timeout=5)
+    written = {}
+
+    def open_fn(path):
+        loading.wait()
+        return files[path]
+
+    def write_fn(path, content):
+        writing.wait()
+        written[path] = content
+
+    def remove_fn(path):
+        writing.wait()
+        written[path] = None
+
+    result = asyncio.run(
+        apply_patch_lib.process_patch_async(PATCH, open_fn, write_fn, remove_fn)
+    )
+    assert result == "Done!"
+
+    expected = {}
+    apply_patch_lib.process_patch(
+        PATCH,
+        files.get,
+        expected.__setitem__,
+        lambda path: expected.__setitem__(path, None),
+    )
+    assert (
+        written
+        == expected
+        == {
+            "a.py": "a = 2\n",
+            "b.py": "b = 2\n",
+            "c.py": None,
+            "d.py": "d = 1",
+        }
+    )
+
+
+def test_apply_patch_tool_writes_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in "abc":
+        (tmp_path / f"{name}.py").write_text(f"{name} = 1\n")
+
+    output = asyncio.run(ApplyPatchTool().run_helper({"input": PATCH}))
+    assert output == "Done!"
+    assert sorted(p.name for p in tmp_path.glob("*.py")) == ["a.py", "b.py", "d.py"]
+    assert (tmp_path / "a.py").read_text() == "a = 2\n"
@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from vibecoder.tools import code_index
+from vibecoder.tools.code_index import CodeIndex, chunk_lines, tokenize
+from vibecoder.tools.code_search import CodeSearchTool
+
+TRANSPORT = '''\
+"""HTTP transport."""
+
+import random
+
+DEFAULT_TIMEOUT = 30
+
+
+class RetryPolicy:
+    max_retries = 3
+
+    def backoff(self, attempt):
+        return random.uniform(0, 2**attempt)
+
+    @property
+    def enabled(self):
+        return self.max_retries > 0
+
+
+def send(request, policy):
+    for attempt in range(policy.max_retries):
+        try:
+            return request()
+        except ConnectionError:
+            policy.backoff(attempt)
+'''
+
+PARSER = """\
+def parse_header(line):
+    name, _, value = line.partition(":")
+    return name.strip().lower(), value.strip()
+
+
+def parse_headers(lines):
+    return dict(parse_header(line) for line in lines)
+"""
+
+
+def test_tokenize_splits_identifiers():
+    counts = tokenize("retryAfter = parse_retry_after(HTTPHeaders) + 2 retries")
+    assert counts["retry"] == 3
+    assert counts["after"] == 2
+    assert counts["http"] == 1 and counts["header"] == 1
+    assert counts["retryafter"] == 1 and counts["parse_retry_after"] == 1
+    assert "2" not in counts
+    assert "the" not in tokenize("the value of")
+
+
+def test_python_files_are_chunked_by_definition():
+    assert chunk_lines(TRANSPORT, python=True) == [
+        (1, 7),  # module docstring, imports and constants
+        (8, 10),  # class header and attributes
+        (11, 12),  # backoff
+        (13, 13),
+        (14, 16),  # enabled, with its decorator
+        (17, 18),
+        (19, 24),  # send
+    ]
+    # Other files, and Python that does not parse, are cut into windows. Blank
+    # chunks are dropped when indexing.
+    assert chunk_lines("x\n" * 130, python=False) == [(1, 60), (61, 120), (121, 130)]
+    assert chunk_lines("def broken(:\n", python=True) == [(1, 1)]
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    (tmp_path / "net").mkdir()
+    (tmp_path / "net" / "transport.py").write_text(TRANSPORT)
+    (tmp_path / "net" / "headers.py").write_text(PARSER)
+    (tmp_path / "README.md").write_text("# Demo\n\nA tiny HTTP client.\n")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG\0\0retry")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(code_index, "_indexes", {})
+    return tmp_path
+
+
+def test_search_ranks_the_relevant_chunk_first(workspace):
+    index = CodeIndex(str(workspace))
+    assert index.refresh() == 4
+
+    results = index.search("where is the random backoff", k=3)
+    assert results[0][1] == ("net/transport.py", 11, 12)
+    assert all(rel == "net/transport.py" for _, (rel, _, _) in results)
+    assert [c for _, c in index.search("parse headers", k=1)] == [
+        ("net/headers.py", 6, 7)
+    ]
+    assert index.search("retry", path="net/headers.py") == []
+    assert index.search("zebra") == []
+
+
+def test_absolute_path_filter(workspace):
+    index = CodeIndex(str(workspace))
+    index.refresh()
+    assert index.search("backoff", path=str(workspace / "net")) == index.search(
+        "backoff", path="net"
+    )
+    assert index.search("backoff", path=str(workspace / "net"))
+    assert index.search("backoff", path=str(workspace / "net" / "headers.py")) == []
+
+
+def test_index_updates_incrementally(workspace, monkeypatch):
+    index = CodeIndex(str(workspace))
+    index.refresh()
+    read = []
+    real_read_text = code_index.read_text
+    monkeypatch.setattr(
+        code_index, "read_text", lambda path: read.append(path) or real_read_text(path)
+    )
+
+    assert index.refresh() == 0
+    (workspace / "net" / "headers.py").write_text(
+        PARSER + "\n\ndef retry_header_parse(line):\n    pass\n"
+    )
+    (workspace / "README.md").unlink()
+    assert index.refresh() == 2
+    assert [p.rsplit("/", 1)[-1] for p in read] == ["headers.py"]
+    assert ("net/headers.py", 10, 11) in [c for _, c in index.search("retry", k=10)]
+    assert index.search("tiny client") == []
+
+
+def test_compaction_and_round_trip_keep_results(workspace):
+    index = CodeIndex(str(workspace))
+    index.refresh()
+    for i in range(3):
+        (workspace / "net" / "transport.py").write_text(TRANSPORT + f"\n# v{i}\n")
+        (workspace / "net" / "headers.py").write_text(PARSER + f"\n# v{i}\n")
+        index.refresh()
+    assert index.dead <= index.live
+
+    expected = index.search("retry backoff attempt", k=5)
+    index.save()
+    loaded = CodeIndex.load(str(workspace))
+    assert loaded.search("retry backoff attempt", k=5) == expected
+    assert loaded.refresh() == 0
+    assert loaded.dead == index.dead
+
+
+def code_search(**args):
+    return asyncio.run(CodeSearchTool().run_helper(args))
+
+
+def test_tool_output(workspace):
+    result = code_search(query="random backoff", max_results=1)
+    lines = result.splitlines()
+    assert lines[0].startswith("net/transport.py:11-12 (score ")
+    assert lines[1:] == [
+        "  11:     def backoff(self, attempt):",
+        "  12:         return random.uniform(0, 2**attempt)",
+    ]
+    assert (workspace / ".vibecoder" / "code_search.npz").exists()
+
+    assert "No code matching" in code_search(query="zebra")
+    assert "`query` is required" in code_search(query="")
+    assert "`max_results` must be positive" in code_search(query="x", max_results=-1)
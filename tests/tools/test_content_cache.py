@@ -0,0 +1,76 @@
+import asyncio
+import os
+
+import pytest
+
+from vibecoder.tools import apply_patch_lib, content_cache, grep_engine
+from vibecoder.tools.read_file import ReadFileTool
+from vibecoder.tools.write_file import WriteFileTool
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = content_cache.ContentCache(max_bytes=100)
+    monkeypatch.setattr(content_cache, "_cache", cache)
+    monkeypatch.chdir(tmp_path)
+    return cache
+
+
+def test_hits_are_validated_by_stat(cache, tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("one\n")
+    assert cache.read("a.txt") == b"one\n"
+    assert cache.read(str(path)) == b"one\n"
+
+    path.write_text("three\n")
+    assert cache.read("a.txt") == b"three\n"
+    # Same size, new mtime.
+    path.write_text("four!\n")
+    os.utime(path, ns=(1, 1))
+    assert cache.read("a.txt") == b"four!\n"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 1)
+    assert stats["hit_rate"] == 0.25
+    assert stats["size_bytes"] == 6
+
+
+def test_lru_eviction_by_size(cache, tmp_path):
+    for name in "abc":
+        (tmp_path / name).write_bytes(name.encode() * 40)
+    cache.read("a")
+    cache.read("b")
+    cache.read("a")
+    cache.read("c")  # Over 100 bytes: evicts b, the least recently used.
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size_bytes"] == 80
+    cache.read("a")
+    cache.read("b")
+    assert (cache.hits, cache.misses) == (2, 4)
+
+    (tmp_path / "big").write_bytes(b"x" * 101)
+    assert cache.read("big") == b"x" * 101
+    assert "big" not in [os.path.basename(p) for p in cache._entries]
+
+
+def test_writes_update_the_cache(cache, tmp_path):
+    apply_patch_lib.process_patch(
+        "*** Begin Patch\n*** Add File: new.py\n+x = 1\n*** End Patch\n",
+        apply_patch_lib.open_file,
+        apply_patch_lib.write_file,
+        apply_patch_lib.remove_file,
+    )
+    write = WriteFileTool()
+    asyncio.run(
+        write.run_helper({"path": "new.py", "content": "\ny = 2\n", "append": True})
+    )
+    read = asyncio.run(ReadFileTool().run_helper({"path": "new.py"}))
+    assert read == "x = 1\ny = 2\n"
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    matches = grep_engine.search_file("new.py", grep_engine.compile_pattern("y"))
+    assert matches.lines == ["y = 2"]
+    assert cache.hits == 2
+
+    apply_patch_lib.remove_file("new.py")
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from vibecoder.tools import file_transaction
+from vibecoder.tools.apply_patch import ApplyPatchTool
+from vibecoder.tools.file_transaction import FileTransaction
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text("old a\n")
+    (tmp_path / "b.txt").write_text("old b\n")
+    (tmp_path / "a.txt").chmod(0o755)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def tree(root):
+    """Every file under root, journal directory included, with its contents."""
+    return {
+        os.path.relpath(os.path.join(d, name), root): open(os.path.join(d, name)).read()
+        for d, _, names in os.walk(root)
+        for name in names
+    }
+
+
+@pytest.mark.parametrize("durability", file_transaction.DURABILITY_LEVELS)
+def test_commit_applies_everything(project, durability):
+    with FileTransaction(durability) as transaction:
+        transaction.write("a.txt", "new a\n")
+        transaction.remove("b.txt")
+        transaction.write("pkg/sub/c.txt", "new c\n")
+        # Staged only: nothing has changed yet.
+        assert (project / "a.txt").read_text() == "old a\n"
+        assert (project / "b.txt").exists()
+
+    assert tree(project) == {"a.txt": "new a\n", "pkg/sub/c.txt": "new c\n"}
+    assert (project / "a.txt").stat().st_mode & 0o777 == 0o755
+
+
+def test_failure_while_committing_rolls_everything_back(project, monkeypatch):
+    before = tree(project)
+    real_replace = os.replace
+    renames = []
+
+    def failing_replace(src, dst):
+        renames.append(dst)
+        if len(renames) == 2:
+            raise OSError("disk on fire")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(file_transaction.os, "replace", failing_replace)
+    with pytest.raises(OSError, match="disk on fire"):
+        with FileTransaction() as transaction:
+            transaction.write("a.txt", "new a\n")
+            transaction.write("new/c.txt", "new c\n")
+            transaction.remove("b.txt")
+    # a.txt had been replaced before the failure, and is put back.
+    a, c = str(project / "a.txt"), str(project / "new" / "c.txt")
+    assert renames == [a, c, a]
+    assert tree(project) == before
+
+
+def test_exception_before_commit_discards(project):
+    before = tree(project)
+    with pytest.raises(RuntimeError):
+        with FileTransaction() as transaction:
+            transaction.write("a.txt", "new a\n")
+            transaction.write("new/c.txt", "new c\n")
+            raise RuntimeError
+    assert tree(project) == before
+
+
+def test_journal_of_a_dead_process_is_rolled_back(project):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    # The state a crash between the two renames leaves behind.
+    (project / ".a.txt.1.bak").write_text("old a\n")
+    (project / "a.txt").write_text("new a\n")
+    (project / "c.txt").write_text("new c\n")
+    (project / ".d.txt.2.tmp").write_text("new d\n")
+    journal = {
+        "pid": dead.pid,
+        "entries": [
+            {"target": str(project / name), "temp": temp, "backup": backup}
+            for name, temp, backup in [
+                ("a.txt", str(project / ".a.txt.0.tmp"), str(project / ".a.txt.1.bak")),
+                ("c.txt", str(project / ".c.txt.0.tmp"), None),
+                ("d.txt", str(project / ".d.txt.2.tmp"), None),
+            ]
+        ],
+        "created_dirs": [],
+    }
+    journal_dir = project / ".vibecoder" / "journal"
+    journal_dir.mkdir(parents=True)
+    (journal_dir / f"{dead.pid}-0.json").write_text(json.dumps(journal))
+
+    FileTransaction().discard()
+    assert tree(project) == {"a.txt": "old a\n", "b.txt": "old b\n"}
+
+
+def test_apply_patch_is_all_or_nothing(project):
+    patch = (
+        "*** Begin Patch\n"
+        "*** Update File: b.txt\n"
+        "@@\n"
+        "-old b\n"
+        "+new b\n"
+        "*** Add File: a.txt/inside.txt\n"
+        "+a.txt is a file, not a directory\n"
+        "*** End Patch\n"
+    )
+    before = tree(project)
+    output = asyncio.run(ApplyPatchTool().run_helper({"input": patch}))
+    assert output.startswith("[Unexpected error during patch:")
+    assert tree(project) == before
+
+
+def test_removing_a_symlink_removes_the_link(project):
+    (project / "link.txt").symlink_to("a.txt")
+    with FileTransaction() as transaction:
+        transaction.remove("link.txt")
+    assert not os.path.lexists(project / "link.txt")
+    assert (project / "a.txt").read_text() == "old a\n"
+
+
+def test_rolled_back_removal_restores_the_symlink(project, monkeypatch):
+    (project / "link.txt").symlink_to("a.txt")
+    real_replace = os.replace
+
+    def failing_replace(src, dst):
+        if dst.endswith("b.txt"):
+            raise OSError("disk on fire")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(file_transaction.os, "replace", failing_replace)
+    with pytest.raises(OSError, match="disk on fire"):
+        with FileTransaction() as transaction:
+            transaction.remove("link.txt")
+            transaction.write("b.txt", "new b\n")
+    assert os.readlink(project / "link.txt") == "a.txt"
+    assert (project / "a.txt").read_text() == "old a\n"
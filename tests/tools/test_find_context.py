@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from vibecoder.tools import apply_patch_lib
+from vibecoder.tools.apply_patch_lib import ContextIndex
+
+
+def scan_find_context_core(lines, context, start):
+    """The straightforward scan ContextIndex must agree with."""
+    if not context:
+        return start, 0
+    for i in range(start, len(lines)):
+        if lines[i : i + len(context)] == context:
+            return i, 0
+    for i in range(start, len(lines)):
+        if [s.rstrip() for s in lines[i : i + len(context)]] == [
+            s.rstrip() for s in context
+        ]:
+            return i, 1
+    for i in range(start, len(lines)):
+        if [s.strip() for s in lines[i : i + len(context)]] == [
+            s.strip() for s in context
+        ]:
+            return i, 100
+    return -1, 0
+
+
+# Few distinct lines, in whitespace variants, so that contexts repeat and
+# match at every fuzz level.
+WORDS = ["", "x = 1", "return x", "def f():", "}", "pass"]
+
+
+def random_line(rng):
+    word = rng.choice(WORDS)
+    return rng.choice(["", " ", "    ", "\t"]) + word + rng.choice(["", " ", "\t"])
+
+
+def random_case(rng):
+    lines = [random_line(rng) for _ in range(rng.randint(0, 40))]
+    if lines and rng.random() < 0.7:
+        # Usually a window of the file, perhaps with its whitespace changed.
+        i = rng.randrange(len(lines))
+        context = lines[i : i + rng.randint(1, 6)]
+        if rng.random() < 0.5:
+            context = [s.strip() if rng.random() < 0.5 else s + " " for s in context]
+    else:
+        context = [random_line(rng) for _ in range(rng.randint(0, 4))]
+    start = rng.randint(-len(lines) - 5, len(lines) + 2)
+    return lines, context, start
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_the_scan(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        lines, context, start = random_case(rng)
+        expected = scan_find_context_core(lines, context, start)
+        assert apply_patch_lib.find_context_core(lines, context, start) == expected
+        # One index answers every lookup in the file.
+        index = ContextIndex(lines)
+        for other in [start, 0, len(lines) - len(context)]:
+            assert index.find(context, other) == scan_find_context_core(
+                lines, context, other
+            )
+
+
+def test_find_context_at_eof():
+    lines = ["a", "b", "a", "b", " a", "b"]
+    index = ContextIndex(lines)
+    assert apply_patch_lib.find_context(lines, ["a", "b"], 0, False, index) == (0, 0)
+    assert apply_patch_lib.find_context(lines, ["a", "b"], 0, True, index) == (4, 100)
+    assert apply_patch_lib.find_context(lines, ["c"], 0, True, index) == (-1, 10_000)
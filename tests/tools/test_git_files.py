@@ -0,0 +1,99 @@
+import asyncio
+import os
+import subprocess
+
+import pytest
+
+from vibecoder.tools import git_files, grep_engine
+from vibecoder.tools.grep import GrepTool
+from vibecoder.tools.tree_files import TreeFilesTool
+
+
+def git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    (tmp_path / ".gitignore").write_text("node_modules/\n")
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "main.py").write_text("needle = 1\n")
+    (tmp_path / "src" / "pkg" / "util.py").write_text("needle = 2\n")
+    (tmp_path / "setup.py").write_text("needle = 3\n")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    # Untracked, and ignored.
+    (tmp_path / "scratch.py").write_text("needle = 4\n")
+    (tmp_path / "node_modules" / "lib").mkdir(parents=True)
+    (tmp_path / "node_modules" / "lib" / "index.js").write_text("needle\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(git_files, "_cache", {})
+    return tmp_path
+
+
+def test_tracked_files_in_walk_order(repo):
+    assert git_files.tracked_files(".") == [
+        "./.gitignore",
+        "./setup.py",
+        "./src/main.py",
+        "./src/pkg/util.py",
+    ]
+    assert git_files.tracked_files("src") == ["src/main.py", "src/pkg/util.py"]
+    walked = grep_engine.walk_files(".", grep_engine.SearchOptions())
+    assert [p for p in walked if p != "./scratch.py"] == git_files.tracked_files(".")
+    assert git_files.index_file("src") == str(repo / ".git" / "index")
+
+
+def test_list_is_cached_until_the_index_changes(repo, monkeypatch):
+    runs = []
+    real_run = subprocess.run
+    monkeypatch.setattr(
+        git_files.subprocess,
+        "run",
+        lambda *args, **kwargs: runs.append(args) or real_run(*args, **kwargs),
+    )
+    git_files.tracked_files(".")
+    git_files.tracked_files("src")
+    assert len(runs) == 1
+
+    git(repo, "add", "scratch.py")
+    assert "./scratch.py" in git_files.tracked_files(".")
+    assert [args[0][3] for args in runs] == ["ls-files", "add", "ls-files"]
+
+
+def test_outside_a_repository(tmp_path):
+    assert git_files.repository(str(tmp_path)) is None
+    assert git_files.tracked_files(str(tmp_path)) is None
+
+
+def test_grep_tracked_only(repo):
+    grep = GrepTool()
+    args = {"pattern": "needle", "paths": ["."], "tracked_only": True}
+    assert asyncio.run(grep.run_helper(args)) == (
+        "./setup.py:needle = 3\n"
+        "./src/main.py:needle = 1\n"
+        "./src/pkg/util.py:needle = 2\n"
+    )
+    assert "scratch.py" in asyncio.run(grep.run_helper({**args, "tracked_only": False}))
+    assert grep.cache_paths(args) == [".", str(repo / ".git" / "index")]
+
+
+def test_tree_tracked_only(repo):
+    tree = TreeFilesTool()
+    (repo / "src" / "pkg" / "util.py").unlink()
+    output = asyncio.run(tree.run_helper({"tracked_only": True}))
+    assert output == "\n".join(
+        [
+            ".",
+            "├── setup.py",
+            "└── src",
+            "    ├── main.py",
+            "    └── pkg",
+            "",
+            "2 directories, 2 files",
+        ]
+    )
+    sized = asyncio.run(
+        tree.run_helper({"tracked_only": True, "show_directory_sizes": True})
+    )
+    assert sized.splitlines()[-1] == "22 used in 2 directories, 2 files"
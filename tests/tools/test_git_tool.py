@@ -1,7 +1,10 @@
 import asyncio
+import subprocess
 
 import pytest
 
+from vibecoder.agents.result_cache import ToolResultCache
+from vibecoder.messages import ToolUse
 from vibecoder.tools.git_tool import GitTool
 
 git_tool = GitTool()
@@ -22,3 +25,58 @@ def test_git_invalid_command():
     # Run the async tool
     output = asyncio.run(git_tool.run_helper(args))
     assert "Error:" in output, "Expected an error message for an invalid git command."
+
+
+def git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_cached_log_sees_new_commits_from_a_subdirectory(tmp_path, monkeypatch):
+    git(tmp_path, "init", "-q")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("a = 1\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "first")
+    monkeypatch.chdir(tmp_path / "src")
+    cache = ToolResultCache()
+
+    def log():
+        tool_use = ToolUse(
+            tool_name=git_tool.name,
+            tool_call_id="call",
+            arguments={"command": "log", "options": ["--format=%s"]},
+        )
+        return asyncio.run(cache.run(git_tool, tool_use)).content
+
+    assert log() == "first"
+    assert log() == "first"
+    git(tmp_path, "commit", "-q", "--allow-empty", "-m", "second")
+    assert log() == "second\nfirst"
+    assert cache.hits == 1
+
+
+def test_nothing_is_cached_outside_a_repository(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert git_tool.cache_paths({"command": "log"}) is None
+
+
+def test_linked_worktree_refs_are_fingerprinted(tmp_path, monkeypatch):
+    main = tmp_path / "main"
+    main.mkdir()
+    git(main, "init", "-q")
+    git(main, "commit", "-q", "--allow-empty", "-m", "first")
+    git(main, "worktree", "add", "-q", str(tmp_path / "linked"))
+    monkeypatch.chdir(tmp_path / "linked")
+
+    paths = git_tool.cache_paths({"command": "log"})
+
+    git_dir = main / ".git"
+    assert paths == [
+        str(git_dir / "worktrees" / "linked" / "HEAD"),
+        str(git_dir / "packed-refs"),
+        str(git_dir / "refs"),
+    ]
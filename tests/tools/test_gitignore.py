@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from vibecoder.tools.gitignore import IgnoreRules, IgnoreStack
+
+
+@pytest.mark.parametrize(
+    "pattern, path, is_dir, expected",
+    [
+        ("*.pyc", "a/b/c.pyc", False, True),
+        ("build/", "pkg/build", True, True),
+        ("build/", "pkg/build", False, None),
+        ("/dist", "dist", True, True),
+        ("/dist", "pkg/dist", True, None),
+        ("docs/*.md", "docs/a.md", False, True),
+        ("docs/*.md", "docs/sub/a.md", False, None),
+        ("**/cache", "x/y/cache", True, True),
+        ("logs/**", "logs/a/b.txt", False, True),
+        ("a/**/b", "a/x/y/b", False, True),
+        ("file[0-9].txt", "file7.txt", False, True),
+    ],
+)
+def test_rule_matching(pattern, path, is_dir, expected):
+    rules = IgnoreRules("/repo", [pattern])
+    assert rules.match(os.path.join("/repo", path), is_dir) is expected
+
+
+def test_nested_files_override_parents(tmp_path):
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("*.log\n")
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    (sub / ".gitignore").write_text("!important.log\n")
+
+    stack = IgnoreStack.for_directory(str(sub))
+
+    assert stack.ignored(str(sub / "debug.log"), False)
+    assert not stack.ignored(str(sub / "important.log"), False)
@@ -2,7 +2,9 @@ import asyncio
 import os
 import tempfile
 import unittest
+from unittest.mock import patch
 
+from vibecoder.tools import grep_engine
 from vibecoder.tools.grep import GrepTool
 
 
@@ -83,6 +85,162 @@ class TestGrepTool(unittest.TestCase):
         )
         self.assertEqual(result, "[Error: No valid paths provided!]")
 
+    def write(self, relative, content):
+        path = os.path.join(self.test_dir.name, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        mode = "wb" if isinstance(content, bytes) else "w"
+        with open(path, mode) as f:
+            f.write(content)
+        return path
+
+    def grep(self, **args):
+        args.setdefault("paths", [self.test_dir.name])
+        return asyncio.run(self.grep_tool.run_helper(args))
+
+    def test_output_format_and_order(self):
+        a = self.write("b/a.py", "x = 1\nneedle one\n")
+        b = self.write("a.py", "needle two\nneedle three\n")
+        result = self.grep(pattern="needle")
+        self.assertEqual(
+            result,
+            f"{b}:needle two\n{b}:needle three\n{a}:needle one\n",
+        )
+
+    def test_single_file_has_no_prefix(self):
+        path = self.write("one.txt", "alpha\nbeta\n")
+        self.assertEqual(self.grep(pattern="beta", paths=[path]), "beta\n")
+
+    def test_skips_gitignored_and_binary_files(self):
+        self.write(".gitignore", "build/\n*.log\n!keep.log\n")
+        self.write("build/out.txt", "needle")
+        self.write("debug.log", "needle")
+        self.write("keep.log", "needle")
+        self.write("blob.bin", b"needle\0\x01")
+        self.write("src/main.py", "needle")
+        self.write(".git/config", "needle")
+        result = self.grep(pattern="needle")
+        self.assertIn("keep.log:needle", result)
+        self.assertIn("main.py:needle", result)
+        self.assertNotIn("out.txt", result)
+        self.assertNotIn("debug.log", result)
+        self.assertNotIn("blob.bin", result)
+        self.assertNotIn("config", result)
+
+    def test_matches_do_not_span_lines(self):
+        path = self.write("lines.txt", "foo\nbar\nfoo bar\n")
+        result = self.grep(pattern=r"foo\s+bar", paths=[path])
+        self.assertEqual(result, "foo bar\n")
+
+    def test_no_empty_line_after_the_final_newline(self):
+        path = self.write("blank.txt", "a\n\nb\n")
+        for pattern in ["^$", r"^\s*$"]:
+            self.assertEqual(
+                self.grep(pattern=pattern, paths=[path], count=True), "1\n"
+            )
+        # The last line itself still matches.
+        path = self.write("open.txt", "a\n")
+        self.assertEqual(self.grep(pattern="$", paths=[path], count=True), "1\n")
+
+    def test_invalid_regex_is_searched_literally(self):
+        path = self.write("code.py", "def run(self):\n")
+        result = self.grep(pattern="def run(", paths=[path])
+        self.assertIn("searched for it literally", result)
+        self.assertIn("def run(self):", result)
+
+    def test_missing_path_is_reported(self):
+        self.write("here.txt", "needle")
+        result = self.grep(
+            pattern="needle", paths=[self.test_dir.name, "/tmp/does-not-exist"]
+        )
+        self.assertIn("here.txt:needle", result)
+        self.assertIn("grep: /tmp/does-not-exist: No such file or directory", result)
+
+    def test_large_files_are_mapped(self):
+        path = self.write("big.txt", "filler\n" * 1000 + "needle at the end")
+        with patch.object(grep_engine, "MMAP_THRESHOLD", 0):
+            result = self.grep(pattern="needle", paths=[path])
+        self.assertEqual(result, "needle at the end\n")
+
+    def test_results_are_paginated_with_a_cursor(self):
+        for i in range(5):
+            self.write(f"f{i}.txt", "needle\nhay\nneedle\nneedle\n")
+        everything = self.grep(pattern="needle", max_results=100).splitlines()
+        self.assertEqual(len(everything), 15)
+
+        pages = []
+        cursor = 0
+        while True:
+            page = self.grep(pattern="needle", max_results=4, cursor=cursor)
+            lines = page.splitlines()
+            if lines[-1].startswith("[Showing matches"):
+                self.assertIn(f"cursor={cursor + 4}", lines[-1])
+                lines = lines[:-1]
+                cursor += 4
+                pages.extend(lines)
+            else:
+                pages.extend(lines)
+                break
+        self.assertEqual(pages, everything)
+        self.assertIn("No results past cursor=20", self.grep(pattern="x", cursor=20))
+
+    def test_search_stops_once_the_page_is_full(self):
+        for i in range(200):
+            self.write(f"f{i:03}.txt", "needle\n")
+        opened = []
+        real_search_file = grep_engine.search_file
+
+        def spy(path, *args):
+            opened.append(path)
+            return real_search_file(path, *args)
+
+        with patch.object(grep_engine, "BATCH_SIZE", 1), patch.object(
+            grep_engine, "search_file", spy
+        ):
+            result = self.grep(pattern="needle", max_results=3)
+        self.assertEqual(result.count("needle\n"), 3)
+        self.assertIn("cursor=3", result)
+        self.assertLess(len(opened), 100)
+
+    def test_max_per_file_and_count(self):
+        a = self.write("a.txt", "hit\n" * 5)
+        b = self.write("b.txt", "hit\nmiss\n")
+        self.assertEqual(self.grep(pattern="hit", count=True), f"{a}:5\n{b}:1\n")
+        self.assertEqual(
+            self.grep(pattern="hit", count=True, max_per_file=2), f"{a}:2\n{b}:1\n"
+        )
+        result = self.grep(pattern="hit", max_per_file=2)
+        self.assertEqual(result, f"{a}:hit\n{a}:hit\n{b}:hit\n")
+        page = self.grep(pattern="hit", count=True, max_results=1)
+        self.assertEqual(page.splitlines()[0], f"{a}:5")
+        self.assertIn("Showing files 1-1; call grep again with cursor=1", page)
+
+    def test_context_lines(self):
+        path = self.write(
+            "ctx.txt", "one\ntwo\nneedle a\nthree\nfour\nfive\nsix\nneedle b\n"
+        )
+        other = self.write("z.txt", "needle z\nafter z\n")
+        result = self.grep(pattern="needle", before_context=1, after_context=1)
+        self.assertEqual(
+            result,
+            f"{path}-two\n{path}:needle a\n{path}-three\n--\n"
+            f"{path}-six\n{path}:needle b\n--\n"
+            f"{other}:needle z\n{other}-after z\n",
+        )
+        # Overlapping context is merged into one group.
+        result = self.grep(pattern="needle", paths=[path], before_context=5)
+        self.assertEqual(
+            result,
+            "one\ntwo\nneedle a\nthree\nfour\nfive\nsix\nneedle b\n",
+        )
+
+    def test_invalid_limits_are_reported(self):
+        result = self.grep(pattern="x", max_results=0)
+        self.assertEqual(
+            result, "[Error in call to grep] `max_results` must be an integer >= 1"
+        )
+        result = self.grep(pattern="x", cursor="soon")
+        self.assertIn("`cursor` must be an integer >= 0", result)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import os
+
+import pytest
+
+from vibecoder.tools import line_index, read_file
+from vibecoder.tools.read_file import ReadFileTool
+from vibecoder.tools.read_files import ReadFilesTool
+
+
+@pytest.fixture(autouse=True)
+def small_index(monkeypatch):
+    # Small strides and chunks exercise every boundary with tiny files.
+    monkeypatch.setattr(line_index, "STRIDE", 4)
+    monkeypatch.setattr(line_index, "CHUNK", 7)
+    monkeypatch.setattr(line_index, "_cache", line_index.OrderedDict())
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "one line, no newline",
+        "\n\n\n",
+        "".join(f"line {i}\n" for i in range(23)),
+        "".join(f"line {i}\n" for i in range(23)) + "last",
+        "crlf\r\nendings\r\nand ünïcode\r\n",
+        "lone\rcarriage\rreturns\r\r\nmixed\n\r",
+        "\r\n" * 9 + "\r" * 5 + "\n" * 3,
+    ],
+)
+def test_ranges_match_reading_the_whole_file(tmp_path, content):
+    path = tmp_path / "f.txt"
+    path.write_bytes(content.encode())
+    with open(path) as f:
+        expected = f.readlines()
+
+    index = line_index.index_for(str(path))
+    assert len(index) == len(expected)
+    for start in range(len(expected) + 2):
+        for end in range(start, len(expected) + 2):
+            assert index.text(start, end) == "".join(expected[start:end])
+            assert index.lines(start, end) == expected[start:end]
+
+
+def test_index_is_rebuilt_when_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "f.txt"
+    path.write_text("a\nb\n")
+    builds = []
+    real_build = line_index.LineIndex.build
+    monkeypatch.setattr(
+        line_index.LineIndex,
+        "build",
+        classmethod(lambda cls, p: builds.append(p) or real_build(p)),
+    )
+    assert len(line_index.index_for(str(path))) == 2
+    assert len(line_index.index_for(str(path))) == 2
+    assert len(builds) == 1
+
+    path.write_text("a\nb\nc\n")
+    os.utime(path, ns=(0, 0))
+    assert line_index.index_for(str(path)).text(2, 3) == "c\n"
+    assert len(builds) == 2
+
+
+def test_read_tools_use_the_index_for_large_files(tmp_path, monkeypatch):
+    path = tmp_path / "big.log"
+    path.write_text("".join(f"entry {i}\n" for i in range(100)))
+    monkeypatch.setattr(read_file, "LINE_INDEX_MIN_BYTES", 0)
+    monkeypatch.setattr(
+        read_file,
+        "read_lines",
+        lambda p: pytest.fail("large files are not read whole"),
+    )
+
+    read = ReadFileTool()
+    output = asyncio.run(read.run_helper({"path": str(path), "start": 50, "end": 52}))
+    assert output == "entry 50\nentry 51\n[Showing lines [50:52] of 100]"
+    output = asyncio.run(read.run_helper({"path": str(path), "start": 200}))
+    assert output == "[No lines in range; the file has 100 lines]"
+    output = asyncio.run(read.run_helper({"path": str(path)}))
+    assert output == path.read_text()
+
+    output = asyncio.run(
+        ReadFilesTool().run_helper(
+            {"files": [{"path": str(path), "start": 98}], "max_chars": 1000}
+        )
+    )
+    assert output == f"==> {path} [98:100] of 100 lines <==\nentry 98\nentry 99\n"
+
+
+@pytest.mark.parametrize(
+    "content", ["".join(f"row {i}\r\n" for i in range(30)), "a\rb\r\nc\n" * 10]
+)
+def test_small_and_large_files_read_alike(tmp_path, monkeypatch, content):
+    path = tmp_path / "f.txt"
+    path.write_bytes(content.encode())
+
+    def read(args):
+        return (
+            asyncio.run(ReadFileTool().run_helper({"path": str(path), **args})),
+            asyncio.run(
+                ReadFilesTool().run_helper({"files": [{"path": str(path), **args}]})
+            ),
+        )
+
+    ranges = [{}, {"start": 3}, {"start": 5, "end": 17}, {"end": 2}]
+    whole = [read(args) for args in ranges]
+    monkeypatch.setattr(read_file, "LINE_INDEX_MIN_BYTES", 0)
+    assert [read(args) for args in ranges] == whole
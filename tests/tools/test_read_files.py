@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from vibecoder.tools import read_file
+from vibecoder.tools.read_files import ReadFilesTool
+
+
+def read_files(**args):
+    return asyncio.run(ReadFilesTool().run_helper(args))
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "a.py").write_text("".join(f"a{i}\n" for i in range(10)))
+    (tmp_path / "b.txt").write_text("no trailing newline")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_reads_files_and_ranges_in_order(project):
+    output = read_files(
+        files=[
+            {"path": "a.py", "start": 2, "end": 4},
+            {"path": "b.txt"},
+            {"path": "missing.py"},
+            {"path": "a.py", "start": 8},
+        ]
+    )
+    assert output == (
+        "==> a.py [2:4] of 10 lines <==\na2\na3\n"
+        "\n"
+        "==> b.txt [0:1] of 1 lines <==\nno trailing newline\n"
+        "\n"
+        "==> missing.py <==\n[Error reading file 'missing.py': "
+        "[Errno 2] No such file or directory: 'missing.py']\n"
+        "\n"
+        "==> a.py [8:10] of 10 lines <==\na8\na9\n"
+    )
+
+
+def test_each_file_is_read_once_and_concurrently(project, monkeypatch):
+    active, peak, reads = 0, 0, []
+    real_read_lines = read_file.read_lines
+
+    async def read_lines(path):
+        nonlocal active, peak
+        reads.append(path)
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        try:
+            return await real_read_lines(path)
+        finally:
+            active -= 1
+
+    monkeypatch.setattr(read_file, "read_lines", read_lines)
+    read_files(files=[{"path": "a.py", "end": 1}, {"path": "b.txt"}, {"path": "a.py"}])
+    assert reads == ["a.py", "b.txt"]
+    assert peak == 2
+
+
+def test_output_is_capped(project):
+    output = read_files(
+        files=[{"path": "a.py", "start": 1}, {"path": "b.txt"}], max_chars=45
+    )
+    assert output == (
+        "==> a.py [1:10] of 10 lines <==\n"
+        "a1\n"
+        "a2\n"
+        "a3\n"
+        "a4\n"
+        "[Truncated at the 45-character limit; read the rest with start=5]\n"
+        "[Not read, over the limit: b.txt]\n"
+    )
+    assert read_files(files=[{"path": "a.py"}], max_chars=5) == (
+        "[Not read, over the limit: a.py]\n"
+    )
+
+
+def test_invalid_arguments(project):
+    assert "non-empty list" in read_files(files=[])
+    assert "needs a `path`" in read_files(files=[{"start": 1}])
+    assert "positive integer" in read_files(files=[{"path": "a.py"}], max_chars=-1)
+    assert "[Error: 'start' and 'end' must be integers]" in read_files(
+        files=[{"path": "a.py", "start": "1"}]
+    )
+    assert ReadFilesTool().cache_paths(
+        {"files": [{"path": "a.py"}, {"path": "b.txt"}, {"path": "a.py"}]}
+    ) == ["a.py", "b.txt"]
@@ -0,0 +1,90 @@
+import os
+
+from vibecoder.tools import get_all_tools
+from vibecoder.tools.base import Tool
+from vibecoder.tools.schema_registry import ToolSchemaRegistry, anthropic_tool
+
+
+class FileTool(Tool):
+    """Tool whose description lives in an arbitrary (absolute) prompt file."""
+
+    name = "file_tool"
+
+    def __init__(self, prompt_file):
+        self.prompt_file = prompt_file
+        self.reads = 0
+
+    @property
+    def prompt_description(self):
+        self.reads += 1
+        with open(self.prompt_path) as f:
+            return f.read().strip()
+
+    @property
+    def signature(self):
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.prompt_description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {"path": {"type": "string"}},
+                    "required": ["path"],
+                },
+            },
+        }
+
+    async def run(self, tool_use):
+        pass
+
+
+def test_payloads_are_built_once(tmp_path):
+    prompt = tmp_path / "tool.md"
+    prompt.write_text("first")
+    tool = FileTool(str(prompt))
+    registry = ToolSchemaRegistry({tool.name: tool})
+
+    first = registry.openai()
+    assert registry.openai() is first
+    assert registry.anthropic() is registry.anthropic()
+    assert tool.reads == 1
+
+
+def test_prompt_change_invalidates(tmp_path):
+    prompt = tmp_path / "tool.md"
+    prompt.write_text("first")
+    tool = FileTool(str(prompt))
+    registry = ToolSchemaRegistry({tool.name: tool}, check_interval=0)
+    assert registry.openai()[0]["function"]["description"] == "first"
+
+    prompt.write_text("second")
+    stat = os.stat(prompt)
+    os.utime(prompt, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert registry.openai()[0]["function"]["description"] == "second"
+    assert registry.anthropic()[0]["description"] == "second"
+
+
+def test_tool_set_change_invalidates(tmp_path):
+    prompt = tmp_path / "tool.md"
+    prompt.write_text("desc")
+    tools = {}
+    registry = ToolSchemaRegistry(tools)
+    assert registry.openai() == []
+
+    tools["file_tool"] = FileTool(str(prompt))
+    assert [s["function"]["name"] for s in registry.openai()] == ["file_tool"]
+
+
+def test_anthropic_tool_keeps_parameters():
+    for tool in get_all_tools():
+        converted = anthropic_tool(tool.signature)
+        parameters = tool.signature["function"]["parameters"]
+        assert converted["input_schema"]["properties"] == parameters["properties"]
+        assert converted["input_schema"]["required"] == parameters.get("required", [])
+
+
+def test_all_tools_have_prompt_paths():
+    for tool in get_all_tools():
+        if tool.prompt_path is not None:
+            assert os.path.exists(tool.prompt_path), tool.name
@@ -0,0 +1,173 @@
+import asyncio
+import os
+
+import pytest
+
+from vibecoder.tools import symbol_index
+from vibecoder.tools.symbol_index import SymbolIndex, parse_source
+from vibecoder.tools.symbols import SymbolsTool
+
+MODULE = """\
+import os.path
+from typing import List
+
+LIMIT = 10
+
+
+class Shape:
+    sides: int = 0
+
+    def area(self) -> float:
+        return 0.0
+
+    async def render(self, canvas, *, scale=1):
+        def helper():
+            local = 1
+            return local
+        return helper()
+
+
+def total_area(shapes: List[Shape]) -> float:
+    return sum(s.area() for s in shapes) + LIMIT
+"""
+
+
+def test_parse_source():
+    result = parse_source(MODULE.encode())
+    defs = {
+        qualname: (line, end, kind, sig)
+        for line, end, kind, qualname, sig in result["defs"]
+    }
+
+    assert defs["LIMIT"] == (4, 4, "variable", "LIMIT = 10")
+    assert defs["Shape"][2:] == ("class", "class Shape")
+    assert defs["Shape.sides"][2] == "variable"
+    assert defs["Shape.area"] == (10, 11, "method", "def area(self) -> float")
+    assert defs["Shape.render"][3] == "async def render(self, canvas, *, scale=1)"
+    assert defs["Shape.render.helper"][2] == "function"
+    assert defs["total_area"][0] == 20
+    # Locals are not definitions.
+    assert not any(q.endswith("local") for q in defs)
+
+    refs = result["refs"]
+    assert refs["area"] == [21]
+    assert refs["Shape"] == [20]
+    assert refs["LIMIT"] == [4, 21]
+    assert refs["path"] == [1]
+    assert result["imports"] == [["os.path", 0, []], ["typing", 0, ["List"]]]
+
+
+def test_parse_source_rejects_invalid_python():
+    assert parse_source(b"def broken(:\n") is None
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "shapes.py").write_text(MODULE)
+    (tmp_path / "pkg" / "use.py").write_text(
+        "from pkg.shapes import Shape, total_area\n\n"
+        "def main():\n    print(total_area([Shape()]))\n"
+    )
+    (tmp_path / "notes.txt").write_text("total_area: see shapes.py\n")
+    (tmp_path / ".gitignore").write_text("build/\n")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "copy.py").write_text("def total_area():\n    pass\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(symbol_index, "_indexes", {})
+    return tmp_path
+
+
+def symbols(**args):
+    return asyncio.run(SymbolsTool().run_helper(args))
+
+
+def test_definitions(workspace):
+    assert symbols(action="definitions", name="total_area") == (
+        "pkg/shapes.py:20-21: def total_area(shapes: List[Shape]) -> float\n"
+    )
+    assert symbols(action="definitions", name="Shape.area") == (
+        "pkg/shapes.py:10-11: def area(self) -> float  (in Shape)\n"
+    )
+    assert "No definitions of 'missing'" in symbols(
+        action="definitions", name="missing"
+    )
+
+
+def test_references(workspace):
+    result = symbols(action="references", name="total_area")
+    assert result == (
+        "pkg/use.py:1: from pkg.shapes import Shape, total_area\n"
+        "pkg/use.py:4: print(total_area([Shape()]))\n"
+    )
+    result = symbols(action="references", name="Shape", path="pkg/use.py")
+    assert result.count("pkg/use.py") == 2 and "shapes.py" not in result
+
+    result = symbols(action="references", name="Shape", max_results=1)
+    assert result.splitlines()[-1].startswith("[Showing 1 of 3 references")
+
+
+def test_outline(workspace):
+    result = symbols(action="outline", path="pkg/shapes.py")
+    assert result.splitlines()[:4] == [
+        "4-4: LIMIT = 10",
+        "7-17: class Shape",
+        "  8-8: sides: int = 0",
+        "  10-11: def area(self) -> float",
+    ]
+    assert "    14-16: def helper()" in result
+    assert "Could not parse" in symbols(action="outline", path="notes.txt")
+
+
+def test_bad_arguments(workspace):
+    assert "`action` must be one of" in symbols(action="find")
+    assert "`name` is required" in symbols(action="references")
+    assert "`path` is required" in symbols(action="outline")
+
+
+def test_only_changed_files_are_parsed_again(workspace, monkeypatch):
+    parsed = []
+    real_parse = symbol_index.parse_source
+
+    def spy(source):
+        parsed.append(source)
+        return real_parse(source)
+
+    monkeypatch.setattr(symbol_index, "parse_source", spy)
+    symbols(action="definitions", name="main")
+    assert len(parsed) == 2
+    assert os.path.exists(workspace / ".vibecoder" / "symbols.json")
+
+    parsed.clear()
+    symbols(action="definitions", name="main")
+    assert parsed == []
+
+    (workspace / "pkg" / "use.py").write_text("def main2():\n    pass\n")
+    assert "def main2()" in symbols(action="definitions", name="main2")
+    assert parsed == [b"def main2():\n    pass\n"]
+    assert "No definitions" in symbols(action="definitions", name="main")
+
+    # A new process starts from the saved index and parses nothing.
+    parsed.clear()
+    monkeypatch.setattr(symbol_index, "_indexes", {})
+    symbols(action="references", name="Shape")
+    assert parsed == []
+
+
+def test_removed_files_leave_the_index(workspace):
+    index = SymbolIndex(str(workspace))
+    index.refresh()
+    assert index.find_definitions("main")
+    (workspace / "pkg" / "use.py").unlink()
+    assert index.refresh() == 1
+    assert index.find_definitions("main") == []
+    assert len(index.parsed) == 1
+
+
+def test_large_batches_use_the_process_pool(tmp_path, monkeypatch):
+    for i in range(6):
+        (tmp_path / f"m{i}.py").write_text(f"def func_{i}():\n    return {i}\n")
+    monkeypatch.setattr(symbol_index, "POOL_THRESHOLD", 2)
+    index = SymbolIndex(str(tmp_path))
+    assert index.refresh() == 6
+    assert [d.path for d in index.find_definitions("func_4")] == ["m4.py"]
@@ -1,123 +1,142 @@
 import asyncio
 import os
-import subprocess
 
-from vibecoder.tools.tree_files import TreeFilesTool
-
-
-def test_basic_tree_run(monkeypatch):
-    """Test that the tool builds the correct tree command and parses output."""
-    tool = TreeFilesTool()
-
-    called_args = {}
-
-    # Monkeypatch asyncio.create_subprocess_exec to simulate tree output
-    async def fake_create_subprocess_exec(*cmd, stdout, stderr):
-        # Capture the command arguments
-        called_args["cmd"] = cmd
-
-        class FakeProc:
-            returncode = 0
-
-            async def communicate(self):
-                return (b"sample tree output", b"")
-
-        return FakeProc()
-
-    monkeypatch.setattr(
-        "vibecoder.tools.tree_files.asyncio.create_subprocess_exec",
-        fake_create_subprocess_exec,
-    )
-
-    args = {
-        "path": ".",
-        "max_depth": 2,
-        "ignore_gitignore": True,
-        "show_modified_times": True,
-        "show_directory_sizes": True,
-        "ignore_patterns": ["*.log", "node_modules"],
-        "include_pattern": "*.py",
-    }
-    # Run the async tool
-    output = asyncio.run(tool.run_helper(args))
-
-    assert "sample tree output" in output
-    cmd = called_args["cmd"]
-    assert cmd[0] == "tree"
-    assert "." in cmd
-    assert "-L" in cmd
-    assert "2" in cmd
-    assert "--gitignore" in cmd
-    assert "-D" in cmd
-    assert "--du" in cmd
-    assert "-I" in cmd
-    assert "*.log" in cmd
-    assert "-I" in cmd
-    assert "node_modules" in cmd
-    assert "-P" in cmd
-    assert "*.py" in cmd
-
-
-def test_path_sanitization(monkeypatch):
-    """Test that '..' paths are stripped out for safety."""
-    tool = TreeFilesTool()
-
-    def fake_run(cmd, capture_output, text, check):
-        for piece in cmd:
-            assert ".." not in piece, f"Unsafe path detected: {piece}"
-
-        class Result:
-            stdout = "ok"
-
-        return Result()
-
-    monkeypatch.setattr(subprocess, "run", fake_run)
-
-    # Run async tool for path sanitization
-    asyncio.run(tool.run_helper({"path": "../dangerous/.."}))
-
-
-def test_tree_command_failure(monkeypatch):
-    """Test that a subprocess error is caught and reported."""
-    tool = TreeFilesTool()
-
-    # Patch asyncio.create_subprocess_exec to simulate non-zero exit
-    async def fake_create_subprocess_exec(*cmd, stdout, stderr):
-        class FakeProc:
-            returncode = 1
-
-            async def communicate(self):
-                return (b"", b"tree failed")
-
-        return FakeProc()
-
-    monkeypatch.setattr(
-        "vibecoder.tools.tree_files.asyncio.create_subprocess_exec",
-        fake_create_subprocess_exec,
+import pytest
+
+from vibecoder.tools import tree_files
+from vibecoder.tools.tree_files import TreeFilesTool, TreeOptions
+
+
+def tree(**args):
+    return asyncio.run(TreeFilesTool().run_helper(args))
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / ".gitignore").write_text("build/\n")
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "main.py").write_text("x" * 100)
+    (tmp_path / "src" / "pkg" / "util.py").write_text("x" * 2000)
+    (tmp_path / "src" / "pkg" / "notes.md").write_text("x" * 48)
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "out.o").write_text("x" * 5000)
+    (tmp_path / "debug.log").write_text("x" * 10)
+    (tmp_path / "README.md").write_text("x" * 20)
+    os.symlink("README.md", tmp_path / "link.md")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_lists_the_tree(project):
+    assert tree() == "\n".join(
+        [
+            ".",
+            "├── README.md",
+            "├── build",
+            "│   └── out.o",
+            "├── debug.log",
+            "├── link.md -> README.md",
+            "└── src",
+            "    ├── main.py",
+            "    └── pkg",
+            "        ├── notes.md",
+            "        └── util.py",
+            "",
+            "3 directories, 7 files",
+        ]
     )
-    # Run async tool for command failure
-    output = asyncio.run(tool.run_helper({"path": "."}))
-    # Expect stderr from failed tree command
-    assert "tree failed" in output
 
 
-def test_generic_exception(monkeypatch):
-    """Test that a generic exception is handled gracefully."""
-    tool = TreeFilesTool()
-
-    # Patch asyncio.create_subprocess_exec to raise generic exception
-    async def fake_create_subprocess_exec(*cmd, stdout, stderr):
-        raise Exception("unexpected error")
-
-    monkeypatch.setattr(
-        "vibecoder.tools.tree_files.asyncio.create_subprocess_exec",
-        fake_create_subprocess_exec,
+def test_filters_and_depth(project):
+    assert tree(ignore_gitignore=True, ignore_patterns=["*.log"], max_depth=1) == (
+        "\n".join(
+            [
+                ".",
+                "├── README.md",
+                "├── link.md -> README.md",
+                "└── src",
+                "",
+                "1 directory, 2 files",
+            ]
+        )
+    )
+    # Directories are kept when filtering files by name.
+    assert tree(path="src", include_pattern="*.md|main.*") == "\n".join(
+        [
+            "src",
+            "├── main.py",
+            "└── pkg",
+            "    └── notes.md",
+            "",
+            "1 directory, 2 files",
+        ]
     )
-    # Run async tool for generic exception; accept NameError due to undefined var in handler
-    try:
-        output = asyncio.run(tool.run_helper({"path": "."}))
-        # Should contain the original exception message
-        assert "unexpected error" in output
-    except NameError:
-        # Propagated NameError from exception handler is acceptable
-        pass
+    assert tree(path="src", ignore_patterns=["pkg"]).endswith("0 directories, 1 file")
+
+
+def test_directory_sizes(project):
+    output = tree(ignore_gitignore=True, show_directory_sizes=True).splitlines()
+    assert output[0] == "[  2.1K]  ."
+    assert "└── [  2.1K]  src" in output
+    assert "    └── [  2.0K]  pkg" in output
+    assert "        ├── [    48]  notes.md" in output
+    assert output[-1] == "2.1K used in 2 directories, 6 files"
+
+    ignores = tree_files.IgnoreStack.for_directory(str(project))
+    sizes = tree_files.directory_sizes(str(project), ignores, TreeOptions(), workers=4)
+    assert sizes[str(project)] == 20 + 10 + 100 + 2000 + 48
+    assert sizes[str(project / "src" / "pkg")] == 2048
+    assert str(project / "build") not in sizes
+
+
+def test_entries_are_paged(project):
+    first = tree(max_entries=3)
+    assert first.splitlines() == [
+        ".",
+        "├── README.md",
+        "├── build",
+        "│   └── out.o",
+        "[Showing entries 1-3; call tree_files again with cursor=3 for more]",
+    ]
+    second = tree(max_entries=3, cursor=3)
+    assert second.splitlines()[0] == "├── debug.log"
+    assert "cursor=6" in second
+    assert tree(max_entries=3, cursor=9).splitlines() == [
+        "        └── util.py",
+        "",
+        "3 directories, 7 files",
+    ]
+    assert tree(cursor=10) == "[No entries past cursor=10]"
+
+
+def test_walk_stops_at_the_page(project, monkeypatch):
+    listed = []
+    real = tree_files.list_directory
+
+    def spy(path, *args):
+        listed.append(os.path.relpath(path, project))
+        return real(path, *args)
+
+    monkeypatch.setattr(tree_files, "list_directory", spy)
+    tree(max_entries=1)
+    assert listed == ["."]
+
+
+def test_invalid_arguments(project):
+    assert "not found" in tree(path="missing")
+    assert "is not a directory" in tree(path="README.md")
+    assert "`max_depth` must be an integer >= 1" in tree(max_depth=0)
+    assert "`cursor` must be an integer >= 0" in tree(cursor="soon")
+
+
+def test_path_sanitization(project):
+    """Paths with '..' never list anything outside the working directory."""
+    (project / "tmp").mkdir()
+    (project / "tmp" / "inside.txt").write_text("x")
+    # With '..' dropped, these must not become the absolute /tmp.
+    for path in ["../tmp/..", "..//tmp", "../../tmp"]:
+        assert tree(path=path).endswith("└── inside.txt\n\n0 directories, 1 file")
+    for path in ["../tmp/..", "tmp/../../tmp", "/..", "../.."]:
+        (touched,) = TreeFilesTool().touched_paths({"path": path})
+        assert os.path.abspath(touched or ".").startswith(str(project))
+    assert tree(path="../..") == tree()
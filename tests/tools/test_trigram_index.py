@@ -0,0 +1,223 @@
+import asyncio
+import os
+import random
+
+import pytest
+
+from vibecoder.tools import grep_engine, trigram_index
+from vibecoder.tools.grep import GrepTool
+from vibecoder.tools.trigram_index import (
+    IndexManager,
+    TrigramIndex,
+    required_literals,
+    walk_workspace,
+)
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        ("def run", [[b"def run"]]),
+        ("foo.*bar", [[b"foo", b"bar"]]),
+        (
+            "^class (Foo|Bar)Tool",
+            [[b"class ", b"Foo", b"Tool"], [b"class ", b"Bar", b"Tool"]],
+        ),
+        ("colou?r", [[b"colo", b"r"]]),
+        ("(abc)+x", [[b"abc", b"x"]]),
+        ("[a-z]+", [[]]),
+    ],
+)
+def test_required_literals(pattern, expected):
+    assert required_literals(pattern) == expected
+
+
+def test_required_literals_ignore_case_drops_non_ascii():
+    assert required_literals("café au lait", ignore_case=True) == [
+        [b"caf", b" au lait"]
+    ]
+
+
+def make_tree(root, files):
+    for rel, content in files.items():
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+
+def candidates(index, pattern, ignore_case=False):
+    return index.candidates(required_literals(pattern, ignore_case))
+
+
+def test_index_narrows_and_updates(tmp_path):
+    make_tree(
+        tmp_path,
+        {
+            "a.py": "def alpha():\n    return 1\n",
+            "b.py": "def beta():\n    return 2\n",
+            "sub/c.py": "class Alpha:\n    pass\n",
+        },
+    )
+    index = TrigramIndex(str(tmp_path))
+    assert index.update(dict(walk_workspace(str(tmp_path)))) == 3
+
+    # Trigrams are case-folded, so candidates are a superset of the matches.
+    assert candidates(index, "def alpha") == {"a.py"}
+    assert candidates(index, "alpha") == {"a.py", "sub/c.py"}
+    assert candidates(index, "return [0-9]") == {"a.py", "b.py"}
+    assert candidates(index, "zzz") == set()
+    assert candidates(index, "..") is None
+
+    (tmp_path / "b.py").write_text("def alphabet():\n    pass\n")
+    os.utime(tmp_path / "b.py", ns=(1, 1))
+    (tmp_path / "a.py").unlink()
+    assert index.update(dict(walk_workspace(str(tmp_path)))) == 2
+    assert candidates(index, "def alpha") == {"b.py"}
+    assert "a.py" not in index.ids
+
+
+def test_index_round_trips_through_disk(tmp_path):
+    make_tree(tmp_path, {f"f{i}.txt": f"token{i} shared\n" for i in range(20)})
+    index = TrigramIndex(str(tmp_path))
+    index.update(dict(walk_workspace(str(tmp_path))))
+    (tmp_path / "f3.txt").unlink()
+    index.update(dict(walk_workspace(str(tmp_path))))
+    index.save()
+
+    loaded = TrigramIndex.load(str(tmp_path))
+
+    assert loaded is not None
+    assert loaded.ids == index.ids
+    assert loaded.dead == index.dead
+    assert {k: list(v) for k, v in loaded.postings.items()} == {
+        k: list(v) for k, v in index.postings.items()
+    }
+    assert candidates(loaded, "token7") == {"f7.txt"}
+    # The index never indexes itself.
+    assert all(not rel.startswith(".vibecoder") for rel in loaded.ids)
+
+
+def test_compaction_keeps_results(tmp_path):
+    make_tree(tmp_path, {f"f{i}.txt": f"word{i}\n" for i in range(10)})
+    index = TrigramIndex(str(tmp_path))
+    for round in range(3):
+        for i in range(8):
+            (tmp_path / f"f{i}.txt").write_text(f"word{i} round{round}\n")
+            os.utime(tmp_path / f"f{i}.txt", ns=(round + 10, round + 10))
+        index.update(dict(walk_workspace(str(tmp_path))))
+
+    assert index.dead <= len(index.ids)
+    assert len(index.paths) < 30
+    assert candidates(index, "round2") == {f"f{i}.txt" for i in range(8)}
+    assert candidates(index, "word9") == {"f9.txt"}
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    rng = random.Random(1)
+    words = ["alpha", "beta", "gamma", "delta", "needle", "Needle", "return"]
+    make_tree(
+        tmp_path,
+        {
+            f"pkg{i % 5}/mod{i}.py": "\n".join(
+                " ".join(rng.choice(words) for _ in range(6)) for _ in range(20)
+            )
+            for i in range(60)
+        },
+    )
+    for i in (3, 17, 42):
+        with open(tmp_path / f"pkg{i % 5}" / f"mod{i}.py", "a") as f:
+            f.write(f"\nmarker_{i} = True\n")
+    monkeypatch.chdir(tmp_path)
+    manager = IndexManager(min_files=0)
+    monkeypatch.setattr(trigram_index, "manager", manager)
+    return tmp_path, manager
+
+
+def grep(**args):
+    return asyncio.run(GrepTool().run_helper(args))
+
+
+def full_scan(pattern, paths, ignore_case=False):
+    regex = grep_engine.compile_pattern(pattern, ignore_case)
+    return [(m.path, m.lines) for m in grep_engine.search(paths, regex)]
+
+
+def test_grep_uses_index_with_identical_results(workspace, monkeypatch):
+    root, manager = workspace
+    # Nothing is indexed yet: the first search scans everything.
+    first = grep(pattern="marker_[0-9]+ =", paths=["."])
+    manager.wait()
+    assert os.path.exists(root / ".vibecoder" / "trigram.idx")
+
+    opened = []
+    real_search_file = grep_engine.search_file
+
+    def spy(path, *args):
+        opened.append(path)
+        return real_search_file(path, *args)
+
+    monkeypatch.setattr(grep_engine, "search_file", spy)
+    second = grep(pattern="marker_[0-9]+ =", paths=["."])
+
+    assert second == first
+    assert second.count("marker_") == 3
+    assert sorted(opened) == [
+        "./pkg2/mod17.py",
+        "./pkg2/mod42.py",
+        "./pkg3/mod3.py",
+    ]
+    for pattern, ignore_case in [
+        ("needle", True),
+        ("(beta|delta) return", False),
+        ("alpha.*Needle", False),
+        ("a", False),
+    ]:
+        expected = full_scan(pattern, ["."], ignore_case)
+        actual = grep(
+            pattern=pattern, paths=["."], ignore_case=ignore_case, max_results=10**6
+        )
+        assert actual == "".join(
+            f"{path}:{line}\n" for path, lines in expected for line in lines
+        )
+
+
+def test_grep_finds_changes_the_index_has_not_seen(workspace):
+    root, manager = workspace
+    grep(pattern="anything", paths=["."])
+    manager.wait()
+
+    (root / "pkg1" / "fresh.py").write_text("unique_marker_xyz\n")
+    assert "fresh.py:unique_marker_xyz" in grep(
+        pattern="unique_marker_xyz", paths=["."]
+    )
+
+    # The stale file triggered a background refresh that indexes it.
+    manager.wait()
+    index = manager.indexes[str(root)]
+    assert "pkg1/fresh.py" in index.ids
+
+
+def test_index_can_be_disabled(workspace, monkeypatch):
+    root, manager = workspace
+    monkeypatch.setenv("VIBECODER_GREP_INDEX", "off")
+    grep(pattern="needle", paths=["."])
+    manager.wait()
+    assert not os.path.exists(root / ".vibecoder")
+
+
+def test_small_workspace_is_indexed_once_it_grows(tmp_path, monkeypatch):
+    make_tree(tmp_path, {f"f{i}.txt": f"word{i}\n" for i in range(3)})
+    monkeypatch.chdir(tmp_path)
+    manager = IndexManager(min_files=5)
+    monkeypatch.setattr(trigram_index, "manager", manager)
+
+    grep(pattern="word1", paths=["."])
+    manager.wait()
+    assert manager.index_for(str(tmp_path)) is None
+
+    make_tree(tmp_path, {f"g{i}.txt": f"word{i}\n" for i in range(3)})
+    assert "f1.txt:word1" in grep(pattern="word1", paths=["."])
+    manager.wait()
+    assert len(manager.index_for(str(tmp_path))) == 6
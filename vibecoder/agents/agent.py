@@ -2,11 +2,25 @@ import base64
 import hashlib
 import json
 import re
+import time
 from abc import ABC, abstractmethod
-from typing import AsyncIterator, Dict
-
-from vibecoder.messages import AgentMessage, AgentResponse, ToolResult, ToolUse
+from typing import AsyncIterator, Dict, List, Optional
+
+from vibecoder.agents import prompt_cache
+from vibecoder.agents.context_window import ContextWindow, estimate_tokens
+from vibecoder.agents.result_cache import ToolResultCache
+from vibecoder.agents.scheduler import ToolScheduler
+from vibecoder.agents.telemetry import Telemetry
+from vibecoder.agents.transport import ResilientTransport
+from vibecoder.messages import (
+    AgentMessage,
+    AgentResponse,
+    AgentResponseDelta,
+    ToolResult,
+    ToolUse,
+)
 from vibecoder.tools.base import Tool
+from vibecoder.tools.schema_registry import ToolSchemaRegistry
 
 
 def to_openai_tool_call_id(original: str) -> str:
@@ -23,7 +37,21 @@ def to_openai_tool_call_id(original: str) -> str:
     return "call_" + alnum[:35]
 
 
+def _usage_fields(stats) -> dict:
+    """Token counts of a request, as AgentMessage keyword arguments."""
+    return dict(
+        input_tokens=stats.input_tokens,
+        output_tokens=stats.output_tokens,
+        cache_read_tokens=stats.cache_read_tokens,
+        cache_write_tokens=stats.cache_write_tokens,
+    )
+
+
 class BaseAgent(ABC):
+    # When True, ask() yields AgentResponseDelta fragments as tokens arrive and
+    # starts each tool call as soon as its arguments have been received.
+    stream: bool = False
+
     @abstractmethod
     def set_model(self, model: str) -> None:
         pass
@@ -41,10 +69,26 @@ class OpenAIAgent(BaseAgent):
         tools: Dict[str, Tool] = {},
         model: str = "gpt-5-mini",
         messages: list[AgentMessage] = [],
+        stream: bool = False,
+        max_context_tokens: Optional[int] = None,
+        prompt_caching: bool = False,
+        result_cache: Optional[ToolResultCache] = None,
+        transport: Optional[ResilientTransport] = None,
+        telemetry: Optional[Telemetry] = None,
     ):
         self.model = model
         self.tools = tools
+        self.tool_schemas = ToolSchemaRegistry(tools)
         self.client = client
+        self.stream = stream
+        self.context_window = (
+            ContextWindow(max_context_tokens) if max_context_tokens else None
+        )
+        self.prompt_caching = prompt_caching
+        self.result_cache = result_cache
+        self.transport = transport or ResilientTransport()
+        self.telemetry = telemetry or Telemetry()
+        self.prompt_cache_key = prompt_cache.prompt_cache_key(system_prompt)
         self.messages = [{"role": "system", "content": system_prompt}]
         for message in messages:
             # ensure compliance with openai's 40-char tool call id limit.
@@ -61,61 +105,180 @@ class OpenAIAgent(BaseAgent):
         self.messages.append({"role": "user", "content": user_input})
 
         while True:
+            scheduler = ToolScheduler(self.tools, self._execute_tool)
+            if self.stream:
+                turn = self._streaming_completion(scheduler)
+            else:
+                turn = self._completion(scheduler)
+            async for message in turn:
+                yield message
 
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=self.messages,
-                stream=False,
-                tools=[tool.signature for tool in self.tools.values()],
-            )
-
-            usage = response.usage
-            input_tokens = usage.prompt_tokens
-            output_tokens = usage.completion_tokens
+            if not scheduler.has_calls:
+                break
 
-            choice = response.choices[0]
-            if hasattr(choice.message, "content") and choice.message.content:
-                response = AgentResponse(
-                    content=choice.message.content,
-                    input_tokens=input_tokens,
-                    output_tokens=output_tokens,
-                )
-                yield response
-                self.messages.append(response.to_openai_dict())
+            # Tools run concurrently; results come back in call order.
+            async for tool_use, tool_result in scheduler.results():
+                yield tool_result
 
-            if hasattr(choice.message, "tool_calls") and choice.message.tool_calls:
-                for call in choice.message.tool_calls:
+                self.messages.append(tool_use.to_openai_dict())
+                self.messages.append(tool_result.to_openai_dict())
+        return
 
-                    tool_name = call.function.name
-                    args = json.loads(call.function.arguments)
+    def _request_messages(self, tools: List[dict]) -> List[dict]:
+        """History to send, compacted to the context budget if one is set."""
+        if self.context_window is None:
+            return self.messages
+        return self.context_window.prepare(
+            self.messages, overhead_tokens=estimate_tokens(tools)
+        )
+
+    def _request_kwargs(self) -> dict:
+        tools = self.tool_schemas.openai()
+        kwargs = {}
+        if self.prompt_caching:
+            # OpenAI caches automatically, but only byte-identical prefixes.
+            tools = prompt_cache.stable_tool_order(
+                tools, name=lambda tool: tool["function"]["name"]
+            )
+            kwargs["prompt_cache_key"] = self.prompt_cache_key
+        return dict(
+            model=self.model,
+            messages=self._request_messages(tools),
+            tools=tools,
+            **kwargs,
+        )
+
+    async def _completion(self, scheduler: ToolScheduler):
+        with self.telemetry.span("serialize"):
+            kwargs = self._request_kwargs()
+        start = time.perf_counter()
+        response = await self.transport.call(
+            self.client.chat.completions.create, stream=False, **kwargs
+        )
+
+        usage = response.usage
+        stats = self.telemetry.record_request(
+            "openai",
+            self.model,
+            time.perf_counter() - start,
+            input_tokens=usage.prompt_tokens,
+            output_tokens=usage.completion_tokens,
+            cache_read_tokens=prompt_cache.openai_cached_tokens(usage),
+        )
+        # The request's usage goes on its first message only, so that summing
+        # over messages counts every request once.
+        usage = _usage_fields(stats)
+
+        choice = response.choices[0]
+        if hasattr(choice.message, "content") and choice.message.content:
+            response = AgentResponse(content=choice.message.content, **usage)
+            usage = {}
+            yield response
+            self.messages.append(response.to_openai_dict())
+
+        if hasattr(choice.message, "tool_calls") and choice.message.tool_calls:
+            for call in choice.message.tool_calls:
+                tool_use = ToolUse(
+                    tool_name=call.function.name,
+                    tool_call_id=call.id,
+                    arguments=json.loads(call.function.arguments),
+                    **usage,
+                )
+                usage = {}
+                scheduler.submit(tool_use)
+                yield tool_use
+
+    async def _streaming_completion(self, scheduler: ToolScheduler):
+        with self.telemetry.span("serialize"):
+            kwargs = self._request_kwargs()
+        start = time.perf_counter()
+        stream = await self.transport.call(
+            self.client.chat.completions.create,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs,
+        )
+
+        content = []
+        calls: Dict[int, dict] = {}
+        usage = None
+        first_token_s = None
+
+        def dispatch(index: int) -> ToolUse:
+            call = calls.pop(index)
+            tool_use = ToolUse(
+                tool_name=call["name"],
+                tool_call_id=call["id"],
+                arguments=json.loads("".join(call["arguments"]) or "{}"),
+            )
+            scheduler.submit(tool_use)
+            return tool_use
 
-                    tool_use = ToolUse(
-                        tool_name=tool_name,
-                        tool_call_id=call.id,
-                        arguments=args,
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
-                    )
-                    yield tool_use
-
-                    # Execute tool and wrap result in ToolResult
-                    if tool_name not in self.tools:
-                        content = f"[Tool {tool_name} not implemented] Available tools: {', '.join(self.tools.keys())}"
-                        tool_result = ToolResult(
-                            content=content,
-                            tool_name=tool_name,
-                            tool_call_id=call.id,
-                        )
-                    else:
-                        # Delegate execution to tool.run, which returns a ToolResult
-                        tool_result = await self.tools[tool_name].run(tool_use)
-                    yield tool_result
-
-                    self.messages.append(tool_use.to_openai_dict())
-                    self.messages.append(tool_result.to_openai_dict())
-            else:
-                break
-        return
+        async for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if first_token_s is None:
+                first_token_s = time.perf_counter() - start
+
+            if getattr(delta, "content", None):
+                content.append(delta.content)
+                yield AgentResponseDelta(content=delta.content)
+
+            for call_delta in getattr(delta, "tool_calls", None) or []:
+                # Calls stream one after another, so once a later call starts
+                # the arguments of every earlier one are complete.
+                for index in sorted(calls):
+                    if index < call_delta.index:
+                        yield dispatch(index)
+                call = calls.setdefault(
+                    call_delta.index, {"id": "", "name": "", "arguments": []}
+                )
+                if call_delta.id:
+                    call["id"] = call_delta.id
+                function = call_delta.function
+                if function is not None:
+                    if function.name:
+                        call["name"] = function.name
+                    if function.arguments:
+                        call["arguments"].append(function.arguments)
+
+        if content:
+            response = AgentResponse(content="".join(content))
+            yield response
+            self.messages.append(response.to_openai_dict())
+
+        for index in sorted(calls):
+            yield dispatch(index)
+
+        # Usage is only known once the stream ends; report it exactly once.
+        stats = self.telemetry.record_request(
+            "openai",
+            self.model,
+            time.perf_counter() - start,
+            input_tokens=usage.prompt_tokens if usage else 0,
+            output_tokens=usage.completion_tokens if usage else 0,
+            cache_read_tokens=prompt_cache.openai_cached_tokens(usage),
+            first_token_s=first_token_s,
+        )
+        yield AgentResponseDelta(**_usage_fields(stats))
+
+    async def _execute_tool(self, tool_use: ToolUse) -> ToolResult:
+        tool_name = tool_use.tool_name
+        if tool_name not in self.tools:
+            content = f"[Tool {tool_name} not implemented] Available tools: {', '.join(self.tools.keys())}"
+            return ToolResult(
+                content=content,
+                tool_name=tool_name,
+                tool_call_id=tool_use.tool_call_id,
+            )
+        # Delegate execution to tool.run, which returns a ToolResult
+        with self.telemetry.span(f"tool.{tool_name}"):
+            if self.result_cache is not None:
+                return await self.result_cache.run(self.tools[tool_name], tool_use)
+            return await self.tools[tool_name].run(tool_use)
 
 
 class AnthropicAgent(BaseAgent):
@@ -126,10 +289,25 @@ class AnthropicAgent(BaseAgent):
         tools: Dict[str, Tool] = {},
         model: str = "claude-3-5-haiku-latest",
         messages: list[dict] = [],
+        stream: bool = False,
+        max_context_tokens: Optional[int] = None,
+        prompt_caching: bool = False,
+        result_cache: Optional[ToolResultCache] = None,
+        transport: Optional[ResilientTransport] = None,
+        telemetry: Optional[Telemetry] = None,
     ):
         self.model = model
         self.tools = tools
+        self.tool_schemas = ToolSchemaRegistry(tools)
         self.client = client
+        self.stream = stream
+        self.context_window = (
+            ContextWindow(max_context_tokens) if max_context_tokens else None
+        )
+        self.prompt_caching = prompt_caching
+        self.result_cache = result_cache
+        self.transport = transport or ResilientTransport()
+        self.telemetry = telemetry or Telemetry()
         self.messages = [message.to_anthropic_dict() for message in messages]
         self.system_prompt = system_prompt
 
@@ -138,86 +316,190 @@ class AnthropicAgent(BaseAgent):
         self.model = model
 
     def _convert_tools(self):
-        """Convert tools to Anthropic's expected format."""
-        converted_tools = []
-        for tool in self.tools.values():
-            sig = tool.signature["function"]
-            params = (sig.get("parameters", {}),)
-            anth_tool = {
-                "name": sig["name"],
-                "description": sig.get("description", ""),
-                "input_schema": {"type": "object", "properties": {}, "required": []},
-            }
-            if "properties" in params:
-                anth_tool["input_schema"]["properties"] = sig["properties"]
-            if "required" in params:
-                anth_tool["input_schema"]["required"] = sig["required"]
-
-            converted_tools.append(anth_tool)
-        return converted_tools
+        """Tools in Anthropic's expected format (cached between requests)."""
+        return self.tool_schemas.anthropic()
 
     async def ask(self, user_input: str) -> AsyncIterator[AgentMessage]:
         self.messages.append({"role": "user", "content": user_input})
 
         while True:
-            response = await self.client.messages.create(
-                model=self.model,
-                messages=self.messages,
-                tools=self._convert_tools(),
-                stream=False,
-                max_tokens=4096,
-                system=self.system_prompt,
-            )
+            scheduler = ToolScheduler(self.tools, self._execute_tool)
+            if self.stream:
+                turn = self._streaming_completion(scheduler)
+            else:
+                turn = self._completion(scheduler)
+            async for message in turn:
+                yield message
 
-            usage = response.usage
-            input_tokens = usage.input_tokens
-            output_tokens = usage.output_tokens
-
-            has_tool_use = False
-            for content_block in response.content:
-                if content_block.type == "text":
-                    response = AgentResponse(
-                        content=content_block.text,
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
-                    )
-                    yield response
-                    self.messages.append(response.to_anthropic_dict())
+            if not scheduler.has_calls:
+                break
 
-                elif content_block.type == "tool_use":
-                    has_tool_use = True
-                    tool_use = content_block
-                    tool_name = tool_use.name
-                    args = tool_use.input
+            # Tools run concurrently; results come back in call order.
+            async for tool_use_msg, tool_result in scheduler.results():
+                yield tool_result
 
+                # Append tool use and result to messages
+                self.messages.append(tool_use_msg.to_anthropic_dict())
+                self.messages.append(tool_result.to_anthropic_dict())
+        return
+
+    def _request_messages(self, tools: List[dict]) -> List[dict]:
+        """History to send, compacted to the context budget if one is set."""
+        if self.context_window is None:
+            return self.messages
+        return self.context_window.prepare(
+            self.messages,
+            overhead_tokens=estimate_tokens(tools)
+            + estimate_tokens(self.system_prompt),
+        )
+
+    def _request_kwargs(self) -> dict:
+        tools = self._convert_tools()
+        messages = self._request_messages(tools)
+        system = self.system_prompt
+        if self.prompt_caching:
+            # Breakpoints after the tools, the system prompt and the history.
+            tools = prompt_cache.anthropic_tools(prompt_cache.stable_tool_order(tools))
+            system = prompt_cache.anthropic_system(system)
+            messages = prompt_cache.anthropic_messages(messages)
+        return dict(
+            model=self.model,
+            messages=messages,
+            tools=tools,
+            max_tokens=4096,
+            system=system,
+        )
+
+    async def _completion(self, scheduler: ToolScheduler):
+        with self.telemetry.span("serialize"):
+            kwargs = self._request_kwargs()
+        start = time.perf_counter()
+        response = await self.transport.call(
+            self.client.messages.create, stream=False, **kwargs
+        )
+
+        usage = response.usage
+        cache_read_tokens, cache_write_tokens = prompt_cache.anthropic_cache_tokens(
+            usage
+        )
+        stats = self.telemetry.record_request(
+            "anthropic",
+            self.model,
+            time.perf_counter() - start,
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+        )
+        # The request's usage goes on its first message only, so that summing
+        # over messages counts every request once.
+        usage = _usage_fields(stats)
+
+        for content_block in response.content:
+            if content_block.type == "text":
+                response = AgentResponse(content=content_block.text, **usage)
+                usage = {}
+                yield response
+                self.messages.append(response.to_anthropic_dict())
+
+            elif content_block.type == "tool_use":
+                tool_use_msg = ToolUse(
+                    tool_name=content_block.name,
+                    tool_call_id=content_block.id,
+                    arguments=content_block.input,
+                    **usage,
+                )
+                usage = {}
+                scheduler.submit(tool_use_msg)
+                yield tool_use_msg
+
+    async def _streaming_completion(self, scheduler: ToolScheduler):
+        with self.telemetry.span("serialize"):
+            kwargs = self._request_kwargs()
+        start = time.perf_counter()
+        stream = await self.transport.call(
+            self.client.messages.create, stream=True, **kwargs
+        )
+
+        blocks: Dict[int, dict] = {}
+        input_tokens = 0
+        output_tokens = 0
+        cache_read_tokens = cache_write_tokens = 0
+        first_token_s = None
+
+        async for event in stream:
+            if first_token_s is None and event.type == "content_block_delta":
+                first_token_s = time.perf_counter() - start
+            if event.type == "message_start":
+                input_tokens = event.message.usage.input_tokens
+                cache_read_tokens, cache_write_tokens = (
+                    prompt_cache.anthropic_cache_tokens(event.message.usage)
+                )
+            elif event.type == "content_block_start":
+                block = event.content_block
+                if block.type == "tool_use":
+                    blocks[event.index] = {
+                        "type": "tool_use",
+                        "id": block.id,
+                        "name": block.name,
+                        "parts": [],
+                    }
+                else:
+                    blocks[event.index] = {"type": block.type, "parts": []}
+            elif event.type == "content_block_delta":
+                delta = event.delta
+                if delta.type == "text_delta":
+                    blocks[event.index]["parts"].append(delta.text)
+                    yield AgentResponseDelta(content=delta.text)
+                elif delta.type == "input_json_delta":
+                    blocks[event.index]["parts"].append(delta.partial_json)
+            elif event.type == "content_block_stop":
+                block = blocks.get(event.index)
+                if block and block["type"] == "tool_use":
+                    # The arguments of this call are complete; start it while
+                    # the rest of the response is still streaming.
+                    del blocks[event.index]
                     tool_use_msg = ToolUse(
-                        tool_name=tool_name,
-                        tool_call_id=tool_use.id,
-                        arguments=args,
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
+                        tool_name=block["name"],
+                        tool_call_id=block["id"],
+                        arguments=json.loads("".join(block["parts"]) or "{}"),
                     )
+                    scheduler.submit(tool_use_msg)
                     yield tool_use_msg
-
-                    # Execute tool and wrap result
-                    if tool_name not in self.tools:
-                        content = f"[Tool {tool_name} not implemented]"
-                        tool_result = ToolResult(
-                            content=content,
-                            tool_name=tool_name,
-                            tool_call_id=tool_use.id,
-                        )
-                    else:
-                        tool_result = await self.tools[tool_name].run(tool_use_msg)
-
-                    yield tool_result
-
-                    # Append tool use and result to messages
-                    self.messages.append(tool_use_msg.to_anthropic_dict())
-                    self.messages.append(tool_result.to_anthropic_dict())
-
-            if has_tool_use:
-                continue
-            else:
-                break
-        return
+            elif event.type == "message_delta":
+                if getattr(event, "usage", None):
+                    output_tokens = event.usage.output_tokens
+
+        for index in sorted(blocks):
+            block = blocks[index]
+            if block["type"] == "text" and block["parts"]:
+                response = AgentResponse(content="".join(block["parts"]))
+                yield response
+                self.messages.append(response.to_anthropic_dict())
+
+        # Usage is only known once the stream ends; report it exactly once.
+        stats = self.telemetry.record_request(
+            "anthropic",
+            self.model,
+            time.perf_counter() - start,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+            first_token_s=first_token_s,
+        )
+        yield AgentResponseDelta(**_usage_fields(stats))
+
+    async def _execute_tool(self, tool_use: ToolUse) -> ToolResult:
+        tool_name = tool_use.tool_name
+        if tool_name not in self.tools:
+            content = f"[Tool {tool_name} not implemented]"
+            return ToolResult(
+                content=content,
+                tool_name=tool_name,
+                tool_call_id=tool_use.tool_call_id,
+            )
+        with self.telemetry.span(f"tool.{tool_name}"):
+            if self.result_cache is not None:
+                return await self.result_cache.run(self.tools[tool_name], tool_use)
+            return await self.tools[tool_name].run(tool_use)
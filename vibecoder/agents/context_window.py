@@ -0,0 +1,229 @@
+import json
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Tuple
+
+# Rough size of a token for English text and code; good enough for budgeting.
+CHARS_PER_TOKEN = 4
+
+STUB_PREVIEW_CHARS = 160
+
+# Reports kept for inspection; the saved-token total covers every request.
+MAX_REPORTS = 100
+
+
+def estimate_tokens(value) -> int:
+    """Approximate the number of tokens a message (or any JSON value) costs."""
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False)
+    return len(value) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class CompactionReport:
+    """What the context window did to a single request."""
+
+    original_tokens: int = 0
+    sent_tokens: int = 0
+    stubbed_results: int = 0
+    dropped_messages: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.sent_tokens
+
+
+class ContextWindow:
+    """
+    Keeps the history sent to the model within a token budget.
+
+    The agent's own message list is never modified; prepare() returns the
+    (possibly compacted) list to send. When the estimate exceeds max_tokens the
+    window compacts down to target_ratio * max_tokens, first by replacing old
+    tool results with a short stub naming the call that produced them, then by
+    dropping the oldest whole turns. Turns start at a user prompt, so tool
+    calls and their results are always kept or dropped together.
+
+    Compaction is sticky: once a result is stubbed or a turn dropped it stays
+    that way, so the prefix of the request is stable between compactions.
+    Works on both OpenAI and Anthropic message dicts.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        target_ratio: float = 0.75,
+        keep_recent_results: int = 4,
+    ):
+        self.max_tokens = max_tokens
+        self.target_ratio = target_ratio
+        self.keep_recent_results = keep_recent_results
+        self.reports: Deque[CompactionReport] = deque(maxlen=MAX_REPORTS)
+        self.total_saved_tokens = 0
+        self._stubbed = set()
+        # Number of leading history messages no longer sent.
+        self._dropped = 0
+
+    @property
+    def last_report(self) -> Optional[CompactionReport]:
+        return self.reports[-1] if self.reports else None
+
+    def prepare(self, messages: List[dict], overhead_tokens: int = 0) -> List[dict]:
+        """Return the messages to send, compacted to fit the budget."""
+        prefix_len = 0
+        while (
+            prefix_len < len(messages) and messages[prefix_len].get("role") == "system"
+        ):
+            prefix_len += 1
+        prefix, history = messages[:prefix_len], messages[prefix_len:]
+
+        report = CompactionReport(
+            original_tokens=overhead_tokens + sum(estimate_tokens(m) for m in messages)
+        )
+        calls = _index_tool_calls(history)
+
+        compacted = self._render(prefix, history, calls)
+        sent = overhead_tokens + sum(estimate_tokens(m) for m in compacted)
+        if sent > self.max_tokens:
+            target = int(self.max_tokens * self.target_ratio)
+            sent = self._compact(prefix, history, calls, overhead_tokens, target)
+            compacted = self._render(prefix, history, calls)
+
+        report.sent_tokens = sent
+        report.stubbed_results = sum(
+            1 for m in history[self._dropped :] if _tool_result(m)[0] in self._stubbed
+        )
+        report.dropped_messages = self._dropped
+        self.reports.append(report)
+        self.total_saved_tokens += report.saved_tokens
+        return compacted
+
+    def _compact(self, prefix, history, calls, overhead_tokens, target) -> int:
+        sizes = [estimate_tokens(m) for m in history]
+        total = overhead_tokens + sum(estimate_tokens(m) for m in prefix)
+        total += sum(
+            self._sent_size(m, sizes[i], calls)
+            for i, m in enumerate(history)
+            if i >= self._dropped
+        )
+
+        # Stub the oldest tool results first, sparing the most recent ones.
+        result_indexes = [
+            i for i in range(self._dropped, len(history)) if _tool_result(history[i])[0]
+        ]
+        if self.keep_recent_results:
+            result_indexes = result_indexes[: -self.keep_recent_results]
+        for i in result_indexes:
+            if total <= target:
+                return total
+            call_id, content = _tool_result(history[i])
+            if call_id in self._stubbed:
+                continue
+            stub = _stub(content, calls.get(call_id))
+            if len(stub) >= len(content):
+                continue
+            self._stubbed.add(call_id)
+            total -= sizes[i] - estimate_tokens(_with_result(history[i], stub))
+
+        # Then drop whole turns from the front, always keeping the latest one.
+        turn_starts = [
+            i
+            for i in range(self._dropped + 1, len(history))
+            if _is_user_prompt(history[i])
+        ]
+        for start in turn_starts:
+            if total <= target:
+                break
+            for i in range(self._dropped, start):
+                total -= self._sent_size(history[i], sizes[i], calls)
+            self._dropped = start
+        return total
+
+    def _sent_size(self, message, size, calls) -> int:
+        call_id, content = _tool_result(message)
+        if call_id in self._stubbed:
+            return estimate_tokens(
+                _with_result(message, _stub(content, calls.get(call_id)))
+            )
+        return size
+
+    def _render(self, prefix, history, calls) -> List[dict]:
+        rendered = list(prefix)
+        for i in range(self._dropped, len(history)):
+            message = history[i]
+            call_id, content = _tool_result(message)
+            if call_id in self._stubbed:
+                message = _with_result(message, _stub(content, calls.get(call_id)))
+            elif i == self._dropped and self._dropped:
+                message = dict(message)
+                message["content"] = (
+                    f"[{self._dropped} earlier messages were dropped to fit the "
+                    f"context window.]\n\n{message['content']}"
+                )
+            rendered.append(message)
+        return rendered
+
+
+def _is_user_prompt(message: dict) -> bool:
+    return message.get("role") == "user" and isinstance(message.get("content"), str)
+
+
+def _tool_result(message: dict) -> Tuple[Optional[str], str]:
+    """(tool_call_id, content) if the message is a tool result, else (None, "")."""
+    if message.get("role") == "tool":
+        return message.get("tool_call_id"), message.get("content") or ""
+    content = message.get("content")
+    if message.get("role") == "user" and isinstance(content, list):
+        for block in content:
+            if isinstance(block, dict) and block.get("type") == "tool_result":
+                text = block.get("content")
+                return block.get("tool_use_id"), text if isinstance(text, str) else ""
+    return None, ""
+
+
+def _with_result(message: dict, text: str) -> dict:
+    """Copy of a tool result message with its content replaced."""
+    if message.get("role") == "tool":
+        return {**message, "content": text}
+    blocks = [
+        (
+            {**block, "content": text}
+            if isinstance(block, dict) and block.get("type") == "tool_result"
+            else block
+        )
+        for block in message["content"]
+    ]
+    return {**message, "content": blocks}
+
+
+def _index_tool_calls(history: List[dict]) -> dict:
+    """Map tool call ids to (name, arguments) from both providers' formats."""
+    calls = {}
+    for message in history:
+        if message.get("role") != "assistant":
+            continue
+        for call in message.get("tool_calls") or []:
+            function = call.get("function", {})
+            calls[call.get("id")] = (function.get("name"), function.get("arguments"))
+        content = message.get("content")
+        if isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict) and block.get("type") == "tool_use":
+                    calls[block.get("id")] = (
+                        block.get("name"),
+                        json.dumps(block.get("input")),
+                    )
+    return calls
+
+
+def _stub(content: str, call: Optional[Tuple[str, str]]) -> str:
+    """Short placeholder for an evicted tool result that says how to get it back."""
+    preview = content[:STUB_PREVIEW_CHARS].rstrip()
+    if len(content) > STUB_PREVIEW_CHARS:
+        preview += "..."
+    if call:
+        name, arguments = call
+        handle = f"Call {name} with {arguments} again if you need the full output."
+    else:
+        handle = "Repeat the tool call if you need the full output."
+    return f"[Stale tool output ({len(content)} chars) elided to save context. {handle}]\n{preview}"
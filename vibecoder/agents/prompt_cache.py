@@ -0,0 +1,71 @@
+"""
+Request layout helpers for provider-side prompt caching.
+
+Both providers cache the longest previously seen request prefix. Anthropic only
+does so at explicit ``cache_control`` breakpoints, of which a request may carry
+four; OpenAI caches automatically, but only when the prefix is byte-identical,
+and routes requests sharing a ``prompt_cache_key`` to the same cache.
+"""
+
+import hashlib
+from typing import Dict, List
+
+EPHEMERAL = {"type": "ephemeral"}
+
+
+def prompt_cache_key(*parts: str) -> str:
+    """A stable key for requests that share the same static prefix."""
+    digest = hashlib.sha256("\0".join(parts).encode()).hexdigest()
+    return f"vibecoder-{digest[:16]}"
+
+
+def stable_tool_order(tools: List[Dict], name=lambda tool: tool["name"]) -> List[Dict]:
+    """Tools sorted by name so the payload does not depend on discovery order."""
+    return sorted(tools, key=name)
+
+
+def anthropic_system(system_prompt: str) -> List[Dict]:
+    """System prompt as a single text block ending in a cache breakpoint."""
+    return [{"type": "text", "text": system_prompt, "cache_control": EPHEMERAL}]
+
+
+def anthropic_tools(tools: List[Dict]) -> List[Dict]:
+    """Tool list with a breakpoint after the last tool, caching all of them."""
+    if not tools:
+        return tools
+    return tools[:-1] + [{**tools[-1], "cache_control": EPHEMERAL}]
+
+
+def anthropic_messages(messages: List[Dict]) -> List[Dict]:
+    """
+    History with a breakpoint on the last content block.
+
+    The breakpoint moves forward with every request. Anthropic looks back from
+    a breakpoint for the longest cached prefix, so each request reads what the
+    previous one wrote and only pays for the newly appended messages.
+    """
+    if not messages:
+        return messages
+    last = messages[-1]
+    content = last.get("content")
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    elif isinstance(content, list) and content:
+        blocks = list(content)
+    else:
+        return messages
+    blocks[-1] = {**blocks[-1], "cache_control": EPHEMERAL}
+    return messages[:-1] + [{**last, "content": blocks}]
+
+
+def openai_cached_tokens(usage) -> int:
+    """Prompt tokens served from OpenAI's cache."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", None) or 0
+
+
+def anthropic_cache_tokens(usage):
+    """(cache read, cache write) input tokens reported by Anthropic."""
+    read = getattr(usage, "cache_read_input_tokens", None) or 0
+    write = getattr(usage, "cache_creation_input_tokens", None) or 0
+    return read, write
@@ -0,0 +1,234 @@
+"""
+Record and replay model API traffic.
+
+RecordingClient wraps a real AsyncOpenAI or AsyncAnthropic client and appends
+every request/response exchange, including streamed chunks and their timing,
+to a JSONL "cassette". ReplayClient serves a cassette back in order, sleeping
+for the recorded (or a fixed) latency, so whole multi-turn sessions can be
+re-run offline and deterministically. That makes it possible to profile the
+agent loop, tools and rendering without model latency or API spend.
+
+Setting VIBECODER_RECORD=<path> or VIBECODER_REPLAY=<path> makes the agent
+builders in vibecoder.agents.swe record to or replay from that cassette.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+OPENAI_ENDPOINT = "chat.completions"
+ANTHROPIC_ENDPOINT = "messages"
+
+
+class ReplayError(RuntimeError):
+    """The cassette cannot answer the request that was made."""
+
+
+class ReplayedAPIError(Exception):
+    """
+    Stand-in for a provider error that was recorded.
+
+    Carries the same status_code and response headers, so retry handling
+    behaves as it did when the error was recorded.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int], headers: Dict):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = Payload({"status_code": status_code, "headers": headers})
+
+
+class Payload(dict):
+    """A decoded JSON object that also allows attribute access, like SDK models."""
+
+    def __init__(self, data: Dict):
+        super().__init__({key: _decode(value) for key, value in data.items()})
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        return Payload(value)
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def _dump(obj):
+    """JSON-compatible form of an SDK response object."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    return obj
+
+
+class _Cassette:
+    """Append-only JSONL file of exchanges, numbered in the order requests start."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._next_seq = 0
+
+    def next_seq(self) -> int:
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            return seq
+
+    def append(self, record: Dict) -> None:
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+
+
+class _Namespace:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class RecordingClient:
+    """Wraps a provider client and records every create() call to a cassette."""
+
+    def __init__(self, client, path: str):
+        self._client = client
+        self._cassette = _Cassette(path)
+        self.chat = _Namespace(
+            completions=_Namespace(create=self._recorder(OPENAI_ENDPOINT))
+        )
+        self.messages = _Namespace(create=self._recorder(ANTHROPIC_ENDPOINT))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _recorder(self, endpoint: str):
+        async def create(**kwargs):
+            if endpoint == OPENAI_ENDPOINT:
+                fn = self._client.chat.completions.create
+            else:
+                fn = self._client.messages.create
+            record = {
+                "seq": self._cassette.next_seq(),
+                "endpoint": endpoint,
+                "request": kwargs,
+            }
+            start = time.monotonic()
+            try:
+                response = await fn(**kwargs)
+            except Exception as exc:
+                record["latency_s"] = time.monotonic() - start
+                headers = getattr(getattr(exc, "response", None), "headers", None)
+                record["error"] = {
+                    "message": str(exc),
+                    "status_code": getattr(exc, "status_code", None),
+                    "headers": dict(headers or {}),
+                }
+                self._cassette.append(record)
+                raise
+            record["latency_s"] = time.monotonic() - start
+            if kwargs.get("stream"):
+                return self._record_stream(response, record, start)
+            record["response"] = _dump(response)
+            self._cassette.append(record)
+            return response
+
+        return create
+
+    async def _record_stream(self, stream, record: Dict, start: float):
+        chunks = []
+        record["chunks"] = chunks
+        try:
+            async for chunk in stream:
+                chunks.append({"t": time.monotonic() - start, "data": _dump(chunk)})
+                yield chunk
+        finally:
+            self._cassette.append(record)
+
+
+class ReplayClient:
+    """
+    Serves a recorded cassette in place of a provider client.
+
+    Exchanges are replayed in recording order. latency is "recorded" to wait
+    as long as the original request took (and between streamed chunks), or a
+    number of seconds to wait before each response. With strict=True the
+    request messages must match the recording exactly.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        latency: Union[str, float] = "recorded",
+        strict: bool = False,
+        sleep=asyncio.sleep,
+    ):
+        with open(path, "r") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        self.records: List[Dict] = sorted(records, key=lambda r: r.get("seq", 0))
+        self.latency = latency
+        self.strict = strict
+        self.sleep = sleep
+        self.position = 0
+        self.chat = _Namespace(
+            completions=_Namespace(create=self._replayer(OPENAI_ENDPOINT))
+        )
+        self.messages = _Namespace(create=self._replayer(ANTHROPIC_ENDPOINT))
+
+    @property
+    def remaining(self) -> int:
+        return len(self.records) - self.position
+
+    def rewind(self) -> None:
+        self.position = 0
+
+    def _replayer(self, endpoint: str):
+        async def create(**kwargs):
+            record = self._next(endpoint, kwargs)
+            await self._wait(record.get("latency_s", 0.0))
+            error = record.get("error")
+            if error:
+                raise ReplayedAPIError(
+                    error["message"], error.get("status_code"), error.get("headers")
+                )
+            if "chunks" in record:
+                return self._stream(record)
+            return Payload(record["response"])
+
+        return create
+
+    def _next(self, endpoint: str, kwargs: Dict) -> Dict:
+        if self.position >= len(self.records):
+            raise ReplayError(f"Cassette exhausted after {len(self.records)} requests")
+        record = self.records[self.position]
+        if record["endpoint"] != endpoint:
+            raise ReplayError(
+                f"Request {self.position} was recorded against {record['endpoint']}, "
+                f"not {endpoint}"
+            )
+        if bool(record["request"].get("stream")) != bool(kwargs.get("stream")):
+            raise ReplayError(f"Request {self.position} differs in stream mode")
+        if self.strict:
+            recorded = json.dumps(record["request"].get("messages"), default=str)
+            if recorded != json.dumps(kwargs.get("messages"), default=str):
+                raise ReplayError(f"Request {self.position} messages do not match")
+        self.position += 1
+        return record
+
+    async def _wait(self, recorded: float) -> None:
+        delay = recorded if self.latency == "recorded" else float(self.latency)
+        if delay > 0:
+            await self.sleep(delay)
+
+    async def _stream(self, record: Dict):
+        previous = record.get("latency_s", 0.0)
+        for chunk in record["chunks"]:
+            if self.latency == "recorded":
+                await self._wait(max(0.0, chunk["t"] - previous))
+                previous = chunk["t"]
+            yield Payload(chunk["data"])
@@ -0,0 +1,156 @@
+"""
+Repo map: a compact outline of the workspace for the system prompt.
+
+The map lists the Python files of the workspace with the signatures of their
+public classes and functions (and of the public methods of those classes),
+most imported files first, followed by the other files by path, cut to a
+token budget. Definitions and imports come from the symbol index, so after
+edits only the changed files are parsed again; the outline of each file is
+cached by its content hash.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from vibecoder.agents.context_window import CHARS_PER_TOKEN
+from vibecoder.tools import symbol_index
+from vibecoder.tools.trigram_index import walk_workspace
+
+DEFAULT_MAX_TOKENS = 2000
+# Longer signatures are cut; the file itself has the full parameter list.
+MAX_SIGNATURE_CHARS = 120
+
+# Content hash -> outline lines of a Python file.
+_outlines: Dict[str, List[str]] = {}
+_lock = threading.Lock()
+
+
+def _dotted(rel: str) -> List[str]:
+    parts = rel[: -len(".py")].split(os.sep)
+    return parts[:-1] if parts[-1] == "__init__" else parts
+
+
+class ModuleMap:
+    """Resolves imported module names to the workspace's Python files."""
+
+    def __init__(self, files: Iterable[str]):
+        # Each file is known by its dotted path from the root and, for
+        # layouts like src/pkg/mod.py or namespace packages, by every suffix.
+        self.exact: Dict[str, str] = {}
+        self.suffixes: Dict[str, List[str]] = defaultdict(list)
+        for rel in sorted(files):
+            parts = _dotted(rel)
+            if not parts:
+                continue
+            self.exact.setdefault(".".join(parts), rel)
+            for i in range(1, len(parts)):
+                self.suffixes[".".join(parts[i:])].append(rel)
+
+    def resolve(self, name: str, relative: bool = False) -> Optional[str]:
+        if name in self.exact:
+            return self.exact[name]
+        candidates = [] if relative else self.suffixes.get(name, [])
+        # An ambiguous name more likely refers to an installed module.
+        return candidates[0] if len(candidates) == 1 else None
+
+    def imported_by(self, rel: str, index: symbol_index.SymbolIndex) -> Set[str]:
+        """The workspace files rel imports; modules from elsewhere are left out."""
+        package = rel.split(os.sep)[:-1]
+        found = set()
+        for name, level, names in index.imports(rel):
+            if level:
+                base = package[: len(package) - (level - 1)] if level > 1 else package
+                target = ".".join(base + ([name] if name else []))
+            else:
+                target = name
+            # "from pkg import mod" imports the module pkg.mod.
+            for candidate in [target] + [
+                f"{target}.{n}" if target else n for n in names
+            ]:
+                path = self.resolve(candidate, relative=bool(level))
+                if path is not None:
+                    found.add(path)
+        found.discard(rel)
+        return found
+
+
+def _shorten(signature: str) -> str:
+    if len(signature) <= MAX_SIGNATURE_CHARS:
+        return signature
+    return signature[: MAX_SIGNATURE_CHARS - 3] + "..."
+
+
+def _outline(index: symbol_index.SymbolIndex, rel: str) -> List[str]:
+    digest = index.files[rel][2]
+    with _lock:
+        lines = _outlines.get(digest)
+    if lines is not None:
+        return lines
+    lines = []
+    in_public_class = False
+    for definition in index.definitions(rel):
+        public = not definition.name.startswith("_")
+        if definition.depth == 0:
+            in_public_class = public and definition.kind == "class"
+            if public and definition.kind in ("class", "function"):
+                lines.append("  " + _shorten(definition.signature))
+        elif (
+            definition.depth == 1
+            and definition.kind == "method"
+            and in_public_class
+            and (public or definition.name == "__init__")
+        ):
+            lines.append("    " + _shorten(definition.signature))
+    with _lock:
+        _outlines[digest] = lines
+    return lines
+
+
+def _tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def build_repo_map(root: str, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
+    """
+    The map of the workspace at root, at most about max_tokens long. Files
+    whose outline does not fit are listed by path while there is room.
+    """
+    index = symbol_index.index_for(root)
+    with index.lock:
+        python_files = sorted(index.files)
+        modules = ModuleMap(python_files)
+        importers: Dict[str, Set[str]] = defaultdict(set)
+        for rel in python_files:
+            for target in modules.imported_by(rel, index):
+                importers[target].add(rel)
+        outlines = {rel: _outline(index, rel) for rel in python_files}
+        live = {entry[2] for entry in index.files.values()}
+    with _lock:
+        for digest in [d for d in _outlines if d not in live]:
+            del _outlines[digest]
+
+    ranked = sorted(
+        python_files,
+        key=lambda rel: (-len(importers[rel]), rel.count(os.sep), rel),
+    )
+    python = set(python_files)
+    others = [rel for rel, _ in walk_workspace(root) if rel not in python]
+
+    sections: List[str] = []
+    budget = max_tokens
+    left_out = 0
+    for rel in ranked + others:
+        outline: Optional[List[str]] = outlines.get(rel)
+        section = "\n".join([rel] + outline) if outline else rel
+        if _tokens(section) > budget:
+            section = rel
+        if left_out or _tokens(section) > budget:
+            left_out += 1
+            continue
+        sections.append(section)
+        budget -= _tokens(section)
+    if left_out:
+        sections.append(f"[... {left_out} more files not shown]")
+    return "\n".join(sections)
@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from vibecoder import workspace
+from vibecoder.agents.scheduler import normalize_paths, paths_overlap
+from vibecoder.messages import ToolResult, ToolUse
+from vibecoder.tools.base import Tool
+from vibecoder.workspace import WorkspaceSnapshot
+
+
+def fingerprint(paths: List[str]) -> str:
+    """
+    Digest of the on-disk state of the given files and directories.
+
+    Files contribute their inode, mtime and size; directories are walked
+    recursively (skipping nested .git directories). Missing paths are recorded
+    as missing, so creating them changes the fingerprint.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            digest.update(f"{path}:missing\n".encode())
+            continue
+        digest.update(f"{path}:{st.st_ino}:{st.st_mtime_ns}:{st.st_size}\n".encode())
+        if os.path.isdir(path):
+            _walk_into(path, digest)
+    return digest.hexdigest()
+
+
+def _walk_into(root: str, digest) -> None:
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            digest.update(
+                f"{entry.path}:{st.st_ino}:{st.st_mtime_ns}:{st.st_size}\n".encode()
+            )
+            if entry.is_dir(follow_symlinks=False) and entry.name != ".git":
+                stack.append(entry.path)
+
+
+@dataclass
+class _Entry:
+    paths: List[str]
+    fingerprint: str
+    content: str
+    size: int
+
+
+class ToolResultCache:
+    """
+    LRU cache of read-only tool results.
+
+    Only calls for which the tool reports cache_paths() are cached. Entries
+    are keyed on the tool name, the canonical JSON of the arguments and the
+    working directory. Changes to the working directory come from its
+    workspace snapshot, whose events drop every entry with an overlapping
+    path; only the parts of the cache paths the snapshot does not track
+    (ignored directories, paths outside the working directory) are
+    fingerprinted on disk, and entries are served while that fingerprint is
+    unchanged. Calls that modify the workspace invalidate every entry whose
+    paths overlap the paths they touched. Total cached content is bounded by
+    max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        # Paths reported changed by snapshots, possibly from worker threads;
+        # applied on the event loop before the next lookup.
+        self._changed: List[str] = []
+        self._changed_lock = threading.Lock()
+        self._snapshots: "weakref.WeakSet[WorkspaceSnapshot]" = weakref.WeakSet()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+        }
+
+    async def run(self, tool: Tool, tool_use: ToolUse) -> ToolResult:
+        """Run a tool call, serving it from the cache when possible."""
+        args = tool_use.arguments if isinstance(tool_use.arguments, dict) else {}
+        if not tool.is_read_only(args):
+            result = await tool.run(tool_use)
+            self.invalidate(tool.touched_paths(args))
+            return result
+
+        cache_paths = tool.cache_paths(args)
+        if cache_paths is None:
+            return await tool.run(tool_use)
+
+        key = (tool.name, json.dumps(args, sort_keys=True, default=str), os.getcwd())
+        paths = normalize_paths(cache_paths)
+        current = await asyncio.to_thread(self._fingerprint, paths)
+        self._apply_changes()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.fingerprint == current:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return ToolResult(
+                content=entry.content,
+                tool_name=tool_use.tool_name,
+                tool_call_id=tool_use.tool_call_id,
+            )
+
+        self.misses += 1
+        result = await tool.run(tool_use)
+        self._store(key, _Entry(paths, current, result.content, len(result.content)))
+        return result
+
+    def _fingerprint(self, paths: List[str]) -> str:
+        """Refresh the snapshot, then fingerprint what it does not cover."""
+        snapshot = workspace.snapshot_for(os.getcwd())
+        if snapshot not in self._snapshots:
+            self._snapshots.add(snapshot)
+            snapshot.subscribe(self._on_changes)
+            # Changes from before the subscription were never reported.
+            self._on_changes([workspace.Change(snapshot.root, "", "modified", True)])
+        uncovered = [u for p in paths for u in snapshot.uncovered(p)]
+        return fingerprint(uncovered)
+
+    def _on_changes(self, changes: List[workspace.Change]) -> None:
+        with self._changed_lock:
+            self._changed.extend(change.abspath for change in changes)
+
+    def _apply_changes(self) -> None:
+        with self._changed_lock:
+            changed, self._changed = self._changed, []
+        if changed:
+            self.invalidate(changed)
+
+    def _store(self, key: Tuple, entry: _Entry) -> None:
+        self._discard(key)
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self.size_bytes += entry.size
+        while self.size_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= evicted.size
+            self.evictions += 1
+
+    def _discard(self, key: Tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry.size
+
+    def invalidate(self, paths: Optional[List[str]] = None) -> None:
+        """Drop entries depending on any of these paths (None drops everything)."""
+        paths = normalize_paths(paths)
+        stale = [
+            key
+            for key, entry in self._entries.items()
+            if paths_overlap(paths, entry.paths)
+        ]
+        for key in stale:
+            self._discard(key)
+        self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
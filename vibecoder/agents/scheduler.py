@@ -0,0 +1,89 @@
+import asyncio
+import os
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from vibecoder.messages import ToolResult, ToolUse
+
+
+def normalize_paths(paths: Optional[List[str]]) -> Optional[List[str]]:
+    """Absolute, normalized form of a tool's touched paths (None stays None)."""
+    if paths is None:
+        return None
+    return [os.path.abspath(p) for p in paths if isinstance(p, str) and p]
+
+
+def paths_overlap(a: Optional[List[str]], b: Optional[List[str]]) -> bool:
+    """True if any path in a is equal to, inside or contains any path in b."""
+    if a is None or b is None:
+        return True
+    for x in a:
+        for y in b:
+            if x == y or x.startswith(y + os.sep) or y.startswith(x + os.sep):
+                return True
+    return False
+
+
+class ToolScheduler:
+    """
+    Runs the tool calls of a single model turn concurrently where it is safe.
+
+    Read-only calls run alongside each other. A call that mutates the workspace
+    waits for every earlier call touching an overlapping path, and every later
+    call touching one of its paths waits for it. Results are handed back in
+    submission order regardless of completion order.
+    """
+
+    def __init__(
+        self,
+        tools: Dict,
+        execute: Callable[[ToolUse], Awaitable[ToolResult]],
+    ):
+        self.tools = tools
+        self.execute = execute
+        self._submitted: List[
+            Tuple[ToolUse, bool, Optional[List[str]], asyncio.Task]
+        ] = []
+
+    @property
+    def has_calls(self) -> bool:
+        return bool(self._submitted)
+
+    def _access(self, tool_use: ToolUse) -> Tuple[bool, Optional[List[str]]]:
+        tool = self.tools.get(tool_use.tool_name)
+        if tool is None:
+            # Unknown tools only produce an error message.
+            return True, []
+        args = tool_use.arguments if isinstance(tool_use.arguments, dict) else {}
+        return tool.is_read_only(args), normalize_paths(tool.touched_paths(args))
+
+    def submit(self, tool_use: ToolUse) -> asyncio.Task:
+        """Start a tool call as soon as the calls it conflicts with have finished."""
+        read_only, paths = self._access(tool_use)
+        blockers = [
+            task
+            for _, other_read_only, other_paths, task in self._submitted
+            if not (read_only and other_read_only) and paths_overlap(paths, other_paths)
+        ]
+        task = asyncio.ensure_future(self._run_after(blockers, tool_use))
+        self._submitted.append((tool_use, read_only, paths, task))
+        return task
+
+    async def _run_after(
+        self, blockers: List[asyncio.Task], tool_use: ToolUse
+    ) -> ToolResult:
+        if blockers:
+            await asyncio.wait(blockers)
+        return await self.execute(tool_use)
+
+    async def results(self) -> AsyncIterator[Tuple[ToolUse, ToolResult]]:
+        """Yield (tool_use, tool_result) pairs in the order calls were submitted."""
+        try:
+            index = 0
+            while index < len(self._submitted):
+                tool_use, _, _, task = self._submitted[index]
+                yield tool_use, await task
+                index += 1
+        finally:
+            for _, _, _, task in self._submitted:
+                if not task.done():
+                    task.cancel()
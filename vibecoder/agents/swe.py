@@ -5,7 +5,9 @@ from dotenv import find_dotenv, load_dotenv
 from jinja2 import Template
 
 import vibecoder.tools
+from vibecoder.agents import replay, repo_map
 from vibecoder.agents.agent import AnthropicAgent, OpenAIAgent
+from vibecoder.agents.result_cache import ToolResultCache
 
 PROMPTS_DIR = pathlib.Path(__file__).parent.parent / "prompts"
 
@@ -13,10 +15,38 @@ dot_env = find_dotenv(usecwd=True)
 load_dotenv(dotenv_path=dot_env)
 
 
+def _client(factory):
+    """Build a provider client, recording or replaying it if asked to."""
+    if os.getenv("VIBECODER_REPLAY"):
+        return replay.ReplayClient(os.environ["VIBECODER_REPLAY"])
+    client = factory()
+    if os.getenv("VIBECODER_RECORD"):
+        return replay.RecordingClient(client, os.environ["VIBECODER_RECORD"])
+    return client
+
+
+def _repo_map() -> str:
+    """
+    The repo map of the working directory for the system prompt. Its size is
+    set with VIBECODER_REPO_MAP_TOKENS; 0 leaves it out.
+    """
+    try:
+        max_tokens = int(
+            os.getenv("VIBECODER_REPO_MAP_TOKENS", repo_map.DEFAULT_MAX_TOKENS)
+        )
+    except ValueError:
+        max_tokens = repo_map.DEFAULT_MAX_TOKENS
+    if max_tokens <= 0:
+        return ""
+    return repo_map.build_repo_map(os.getcwd(), max_tokens)
+
+
 def build_swe_agent() -> OpenAIAgent:
     from openai import AsyncOpenAI
 
-    openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    openai_client = _client(
+        lambda: AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    )
 
     tools = vibecoder.tools.get_all_tools()
 
@@ -26,20 +56,23 @@ def build_swe_agent() -> OpenAIAgent:
     with open(swe_prompt_path, "r") as f:
         swe_template = Template(f.read())
 
-    system_prompt = swe_template.render(tools=tool_descriptions)
+    system_prompt = swe_template.render(tools=tool_descriptions, repo_map=_repo_map())
 
     # Pass the client to the Agent
     return OpenAIAgent(
         openai_client,
         system_prompt=system_prompt.strip(),
         tools={tool.name: tool for tool in tools},
+        result_cache=ToolResultCache(),
     )
 
 
 def code_reviewer_analyst() -> OpenAIAgent:
     from openai import AsyncOpenAI
 
-    openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    openai_client = _client(
+        lambda: AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    )
 
     tools = vibecoder.tools.get_analyst_tools()
 
@@ -56,6 +89,7 @@ def code_reviewer_analyst() -> OpenAIAgent:
         openai_client,
         system_prompt=system_prompt.strip(),
         tools={tool.name: tool for tool in tools},
+        result_cache=ToolResultCache(),
     )
 
 
@@ -68,14 +102,18 @@ def build_anthropic_swe_agent() -> AnthropicAgent:
     with open(swe_prompt_path, "r") as f:
         swe_template = Template(f.read())
 
-    system_prompt = swe_template.render(tools=tool_descriptions)
+    system_prompt = swe_template.render(tools=tool_descriptions, repo_map=_repo_map())
 
     from anthropic import AsyncAnthropic
 
-    anthropic_client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    # Retries are handled by the agent's ResilientTransport.
+    anthropic_client = _client(
+        lambda: AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), max_retries=0)
+    )
 
     return AnthropicAgent(
         anthropic_client,
         system_prompt=system_prompt.strip(),
         tools={tool.name: tool for tool in tools},
+        result_cache=ToolResultCache(),
     )
@@ -0,0 +1,232 @@
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """USD per million tokens."""
+
+    input: float
+    output: float
+    cache_read: float = 0.0
+    cache_write: float = 0.0
+
+
+# List prices at the time of writing; models are matched by longest prefix.
+MODEL_PRICES: Dict[str, ModelPrice] = {
+    "gpt-5": ModelPrice(1.25, 10.0, cache_read=0.125),
+    "gpt-5-mini": ModelPrice(0.25, 2.0, cache_read=0.025),
+    "gpt-5-nano": ModelPrice(0.05, 0.4, cache_read=0.005),
+    "gpt-4.1": ModelPrice(2.0, 8.0, cache_read=0.5),
+    "gpt-4.1-mini": ModelPrice(0.4, 1.6, cache_read=0.1),
+    "gpt-4o": ModelPrice(2.5, 10.0, cache_read=1.25),
+    "gpt-4o-mini": ModelPrice(0.15, 0.6, cache_read=0.075),
+    "claude-3-5-haiku": ModelPrice(0.8, 4.0, cache_read=0.08, cache_write=1.0),
+    "claude-3-7-sonnet": ModelPrice(3.0, 15.0, cache_read=0.3, cache_write=3.75),
+    "claude-sonnet-4": ModelPrice(3.0, 15.0, cache_read=0.3, cache_write=3.75),
+    "claude-opus-4": ModelPrice(15.0, 75.0, cache_read=1.5, cache_write=18.75),
+}
+
+
+def price_for(model: str, prices: Dict[str, ModelPrice]) -> Optional[ModelPrice]:
+    matches = [prefix for prefix in prices if model.startswith(prefix)]
+    return prices[max(matches, key=len)] if matches else None
+
+
+@dataclass
+class RequestStats:
+    """Token usage, cost and latency of a single model request."""
+
+    provider: str
+    model: str
+    duration_s: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    first_token_s: Optional[float] = None
+    cost_usd: Optional[float] = None
+
+
+def request_cost(stats: RequestStats, price: Optional[ModelPrice]) -> Optional[float]:
+    if price is None:
+        return None
+    uncached = stats.input_tokens
+    if stats.provider == "openai":
+        # OpenAI counts cached tokens as part of prompt_tokens; Anthropic
+        # reports them separately from input_tokens.
+        uncached -= stats.cache_read_tokens
+    return (
+        uncached * price.input
+        + stats.output_tokens * price.output
+        + stats.cache_read_tokens * price.cache_read
+        + stats.cache_write_tokens * price.cache_write
+    ) / 1e6
+
+
+class RollingTimings:
+    """Count and total of every sample, percentiles over the most recent ones."""
+
+    def __init__(self, window: int = 500):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(len(ordered) * p / 100))
+        return ordered[rank - 1]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count else 0.0,
+            "p50_s": self.percentile(50),
+            "p90_s": self.percentile(90),
+            "p99_s": self.percentile(99),
+            "max_s": max(self.samples, default=0.0),
+        }
+
+
+class Telemetry:
+    """
+    Latency and token accounting for an agent.
+
+    Spans time named operations: "model" for whole requests (including
+    retries), "model.first_token" for streamed requests, "tool.<name>" for
+    each tool call, "serialize" for building request payloads and "ui" for
+    REPL rendering. Every model request is also recorded once with its
+    token usage and estimated cost.
+    """
+
+    def __init__(
+        self,
+        window: int = 500,
+        prices: Dict[str, ModelPrice] = MODEL_PRICES,
+        max_requests: int = 1000,
+    ):
+        self.window = window
+        self.prices = prices
+        self.timings: Dict[str, RollingTimings] = {}
+        self.requests = deque(maxlen=max_requests)
+        self.totals = self._empty_totals()
+
+    @staticmethod
+    def _empty_totals() -> Dict[str, float]:
+        return {
+            "requests": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_read_tokens": 0,
+            "cache_write_tokens": 0,
+            "cost_usd": 0.0,
+            "unpriced_requests": 0,
+        }
+
+    def add_timing(self, name: str, seconds: float) -> None:
+        timings = self.timings.get(name)
+        if timings is None:
+            timings = self.timings[name] = RollingTimings(self.window)
+        timings.add(seconds)
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_timing(name, time.perf_counter() - start)
+
+    def record_request(
+        self,
+        provider: str,
+        model: str,
+        duration_s: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        first_token_s: Optional[float] = None,
+    ) -> RequestStats:
+        stats = RequestStats(
+            provider=provider,
+            model=model,
+            duration_s=duration_s,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+            first_token_s=first_token_s,
+        )
+        stats.cost_usd = request_cost(stats, price_for(model, self.prices))
+        self.requests.append(stats)
+        self.add_timing("model", duration_s)
+        if first_token_s is not None:
+            self.add_timing("model.first_token", first_token_s)
+
+        totals = self.totals
+        totals["requests"] += 1
+        for key in (
+            "input_tokens",
+            "output_tokens",
+            "cache_read_tokens",
+            "cache_write_tokens",
+        ):
+            totals[key] += getattr(stats, key)
+        if stats.cost_usd is None:
+            totals["unpriced_requests"] += 1
+        else:
+            totals["cost_usd"] += stats.cost_usd
+        return stats
+
+    def snapshot(self) -> Dict:
+        """Everything recorded so far, as plain data."""
+        return {
+            "totals": dict(self.totals),
+            "timings": {
+                name: timings.summary() for name, timings in self.timings.items()
+            },
+            "last_request": asdict(self.requests[-1]) if self.requests else None,
+        }
+
+    def report(self) -> List[str]:
+        """Human readable summary, one line per entry."""
+        t = self.totals
+        cost = f"${t['cost_usd']:.4f}"
+        if t["unpriced_requests"]:
+            cost += f" (+{t['unpriced_requests']} requests with unknown pricing)"
+        lines = [
+            f"Requests: {t['requests']}  cost: {cost}",
+            f"Tokens: {t['input_tokens']} in ({t['cache_read_tokens']} cache read, "
+            f"{t['cache_write_tokens']} cache write), {t['output_tokens']} out",
+        ]
+        if self.timings:
+            lines.append(
+                f"{'span':<24}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}"
+                f"{'p99 ms':>10}{'total s':>10}"
+            )
+        for name in sorted(self.timings):
+            s = self.timings[name].summary()
+            lines.append(
+                f"{name:<24}{s['count']:>7}{s['p50_s'] * 1e3:>10.1f}"
+                f"{s['p90_s'] * 1e3:>10.1f}{s['p99_s'] * 1e3:>10.1f}"
+                f"{s['total_s']:>10.2f}"
+            )
+        return lines
+
+    def reset(self) -> None:
+        self.timings.clear()
+        self.requests.clear()
+        self.totals = self._empty_totals()
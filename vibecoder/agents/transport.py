@@ -0,0 +1,240 @@
+import asyncio
+import email.utils
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the provider while the circuit breaker is open."""
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter: sleep ~ U(0, base * 2**attempt)."""
+
+    max_retries: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    # Upper bound on how long a provider's Retry-After may make us wait.
+    max_retry_after: float = 60.0
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing provider for a while.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast with CircuitOpenError. Once reset_timeout has passed a single
+    trial call is let through (half-open); its success closes the circuit, its
+    failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+
+    def release(self) -> None:
+        """End a call that neither succeeded nor failed, e.g. a cancelled one."""
+        self._trial_in_flight = False
+
+
+def _connection_errors() -> tuple:
+    errors = [ConnectionError, TimeoutError, asyncio.TimeoutError]
+    try:
+        import openai
+
+        errors.append(openai.APIConnectionError)
+    except ImportError:
+        pass
+    try:
+        import anthropic
+
+        errors.append(anthropic.APIConnectionError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate limits, timeouts, server errors and dropped connections are retried."""
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    return isinstance(exc, _connection_errors())
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from Retry-After(-Ms) headers."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class ResilientTransport:
+    """
+    Wraps the provider SDK's create() calls for both agent classes.
+
+    Retryable failures are retried with jittered exponential backoff, waiting
+    at least as long as a Retry-After header asks. Repeated failures open a
+    circuit breaker. With hedge_percentile set, a non-streaming request that
+    takes longer than that percentile of recent latencies gets a duplicate
+    request; whichever answers first wins and the other is cancelled.
+    """
+
+    def __init__(
+        self,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        sleep: Callable[[float], Awaitable] = asyncio.sleep,
+    ):
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.sleep = sleep
+        self.latencies = deque(maxlen=200)
+        self.retries = 0
+        self.hedges = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Latency after which a duplicate request is sent, if hedging is on."""
+        if self.hedge_percentile is None:
+            return None
+        if len(self.latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))
+        return ordered[index]
+
+    async def call(self, fn: Callable[..., Awaitable], **kwargs):
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(
+                    f"Provider circuit is open after {self.breaker.failures} failures"
+                )
+            try:
+                result = await self._attempt(fn, kwargs)
+            except Exception as exc:
+                if not is_retryable(exc):
+                    # The provider answered; the request itself was bad.
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.retry.max_retries:
+                    raise
+                delay = self.retry.backoff(attempt)
+                requested = retry_after(exc)
+                if requested is not None:
+                    delay = max(delay, min(requested, self.retry.max_retry_after))
+                attempt += 1
+                self.retries += 1
+                await self.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled: says nothing about the provider, but the
+                # half-open trial is over.
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def _attempt(self, fn, kwargs):
+        start = time.monotonic()
+        delay = None if kwargs.get("stream") else self.hedge_delay()
+        if delay is None:
+            result = await fn(**kwargs)
+        else:
+            result = await self._hedged(fn, kwargs, delay)
+        if not kwargs.get("stream"):
+            self.latencies.append(time.monotonic() - start)
+        return result
+
+    async def _hedged(self, fn, kwargs, delay: float):
+        primary = asyncio.ensure_future(fn(**kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        pending = {primary, asyncio.ensure_future(fn(**kwargs))}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
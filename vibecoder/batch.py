@@ -0,0 +1,329 @@
+"""
+Headless batch mode: run many agent tasks from a JSONL file.
+
+Each input line is a task object::
+
+    {"id": "fix-123", "prompt": "Fix the failing test", "role": "swe",
+     "source": "/path/to/checkout"}
+
+Only "prompt" is required. "id" defaults to the line number, "role" to the
+--role option. Every task runs in its own working directory, by default
+<workdir-root>/<id>, into which "source" is copied the first time the task
+runs; "workdir" runs the task in an existing directory instead. The copy
+leaves out .vibecoder directories and the workdir root itself, so a source
+that contains the root is not copied into itself. A task that is run again
+(after a crash, or with --retry-failed) reuses its directory as the earlier
+run left it, edits included.
+
+The tools resolve paths against the process working directory, so each task
+runs in a child process started in its directory. The parent keeps at most
+--concurrency children running and appends one result line per finished
+task to the output file. Tasks already present in the output are skipped, so
+a crashed or interrupted run resumes where it stopped; Ctrl-C or SIGTERM
+stops the running children and leaves their tasks for the next run.
+"""
+
+import asyncio
+import dataclasses
+import json
+import os
+import re
+import shutil
+import signal
+import sys
+import time
+import traceback
+from typing import Dict, List, Optional, Set
+
+import click
+
+from vibecoder.messages import AgentResponseDelta
+
+STDERR_TAIL_CHARS = 4000
+
+
+def load_tasks(path: str) -> List[Dict]:
+    """Read tasks from a JSONL file, assigning ids to tasks without one."""
+    tasks = []
+    seen = set()
+    with open(path, "r") as f:
+        for lineno, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            task = json.loads(line)
+            if not isinstance(task, dict) or not isinstance(task.get("prompt"), str):
+                raise ValueError(f"{path}:{lineno}: a task needs a string 'prompt'")
+            task.setdefault("id", str(lineno))
+            task["id"] = str(task["id"])
+            if task["id"] in seen:
+                raise ValueError(f"{path}:{lineno}: duplicate task id {task['id']!r}")
+            seen.add(task["id"])
+            tasks.append(task)
+    return tasks
+
+
+def completed_ids(output_path: str, retry_failed: bool = False) -> Set[str]:
+    """Ids of tasks already recorded in the output file."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash; that task simply runs again.
+                continue
+            if retry_failed and record.get("status") != "ok":
+                continue
+            done.add(str(record.get("id")))
+    return done
+
+
+def _skip_batch_state(workdir_root: str):
+    """A copytree ignore function leaving out the workdir root and .vibecoder."""
+
+    def ignore(directory: str, names: List[str]) -> Set[str]:
+        return {
+            name
+            for name in names
+            if name == ".vibecoder"
+            or os.path.abspath(os.path.join(directory, name)) == workdir_root
+        }
+
+    return ignore
+
+
+def task_workdir(task: Dict, workdir_root: str) -> str:
+    """Create (once) and return the isolated working directory for a task."""
+    if task.get("workdir"):
+        return os.path.abspath(task["workdir"])
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", task["id"])
+    workdir_root = os.path.abspath(workdir_root)
+    workdir = os.path.join(workdir_root, name)
+    if not os.path.exists(workdir):
+        source = task.get("source")
+        if source:
+            # Copy to a temporary name so a crash never leaves half a checkout.
+            partial = workdir + ".partial"
+            shutil.rmtree(partial, ignore_errors=True)
+            shutil.copytree(
+                source,
+                partial,
+                symlinks=True,
+                ignore=_skip_batch_state(workdir_root),
+            )
+            os.rename(partial, workdir)
+        else:
+            os.makedirs(workdir)
+    return workdir
+
+
+def message_record(message) -> Dict:
+    return {"type": type(message).__name__, **dataclasses.asdict(message)}
+
+
+async def run_task(task: Dict) -> Dict:
+    """Run one task with a fresh agent in the current directory."""
+    from vibecoder import agents
+
+    agent = agents.create_agent_by_role(task["role"])
+    messages = []
+    usage = dict(
+        input_tokens=0, output_tokens=0, cache_read_tokens=0, cache_write_tokens=0
+    )
+    async for message in agent.ask(task["prompt"]):
+        # Each request's usage is carried by exactly one message.
+        for key in usage:
+            usage[key] += getattr(message, key)
+        if not isinstance(message, AgentResponseDelta):
+            messages.append(message_record(message))
+    result = {"messages": messages, "usage": usage}
+    telemetry = getattr(agent, "telemetry", None)
+    if telemetry is not None:
+        result["telemetry"] = telemetry.snapshot()
+    return result
+
+
+def worker_main() -> None:
+    """Entry point of a task's child process: task on stdin, result on stdout."""
+    task = json.loads(sys.stdin.read())
+    result_out = sys.stdout
+    # Anything the agent or its tools print must not corrupt the result.
+    sys.stdout = sys.stderr
+    try:
+        result = asyncio.run(run_task(task))
+        result["status"] = "ok"
+    except Exception:
+        result = {"status": "error", "error": traceback.format_exc()}
+    result_out.write(json.dumps(result))
+    result_out.flush()
+
+
+class BatchRunner:
+    """Runs tasks in child processes with bounded concurrency."""
+
+    def __init__(
+        self,
+        output_path: str,
+        workdir_root: str,
+        concurrency: int = 4,
+        role: str = "swe",
+        timeout: Optional[float] = None,
+        echo=print,
+    ):
+        self.output_path = output_path
+        self.workdir_root = workdir_root
+        self.concurrency = concurrency
+        self.role = role
+        self.timeout = timeout
+        self.echo = echo
+        self.results: Dict[str, int] = {}
+
+    async def run(self, tasks: List[Dict]) -> Dict[str, int]:
+        queue: asyncio.Queue = asyncio.Queue()
+        for task in tasks:
+            queue.put_nowait(task)
+        os.makedirs(self.workdir_root, exist_ok=True)
+        with open(self.output_path, "a") as output:
+            workers = [
+                asyncio.create_task(self._worker(queue, output))
+                for _ in range(min(self.concurrency, len(tasks)))
+            ]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        return self.results
+
+    async def _worker(self, queue: asyncio.Queue, output) -> None:
+        while True:
+            try:
+                task = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            record = await self._run_one(task)
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            os.fsync(output.fileno())
+            status = record["status"]
+            self.results[status] = self.results.get(status, 0) + 1
+            self.echo(f"{status:>7}  {task['id']}  ({record['duration_s']:.1f}s)")
+
+    async def _run_one(self, task: Dict) -> Dict:
+        task = {"role": self.role, **task}
+        record = {"id": task["id"], "role": task["role"]}
+        started = time.time()
+        record["started_at"] = started
+        try:
+            record["workdir"] = await asyncio.to_thread(
+                task_workdir, task, self.workdir_root
+            )
+        except OSError as e:
+            record.update(status="error", error=f"Could not prepare workdir: {e}")
+            record["duration_s"] = time.time() - started
+            return record
+
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "vibecoder.batch",
+            "--worker",
+            cwd=record["workdir"],
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(json.dumps(task).encode()), self.timeout
+            )
+        except asyncio.TimeoutError:
+            await _stop(proc)
+            record.update(status="timeout", error=f"Timed out after {self.timeout}s")
+        except asyncio.CancelledError:
+            await _stop(proc)
+            raise
+        else:
+            try:
+                record.update(json.loads(stdout))
+            except json.JSONDecodeError:
+                tail = stderr.decode(errors="replace")[-STDERR_TAIL_CHARS:]
+                record.update(
+                    status="error",
+                    error=f"Worker exited with code {proc.returncode}:\n{tail}",
+                )
+        record["duration_s"] = time.time() - started
+        return record
+
+
+async def _stop(proc) -> None:
+    if proc.returncode is None:
+        proc.kill()
+    await proc.wait()
+
+
+@click.command()
+@click.argument("tasks_path", required=False)
+@click.option("-o", "--output", "output_path", help="Results JSONL file.")
+@click.option("-j", "--concurrency", default=4, show_default=True)
+@click.option("--role", default="swe", show_default=True, help="Default agent role.")
+@click.option(
+    "--workdir-root",
+    default=".vibecoder/batch",
+    show_default=True,
+    help="Directory holding one working directory per task.",
+)
+@click.option("--timeout", type=float, help="Per-task timeout in seconds.")
+@click.option("--retry-failed", is_flag=True, help="Re-run tasks that did not succeed.")
+@click.option("--worker", is_flag=True, hidden=True)
+def main(
+    tasks_path,
+    output_path,
+    concurrency,
+    role,
+    workdir_root,
+    timeout,
+    retry_failed,
+    worker,
+):
+    """Run every task in TASKS_PATH (JSONL) headlessly."""
+    if worker:
+        worker_main()
+        return
+    if not tasks_path or not output_path:
+        raise click.UsageError("TASKS_PATH and --output are required.")
+
+    tasks = load_tasks(tasks_path)
+    done = completed_ids(output_path, retry_failed)
+    pending = [task for task in tasks if task["id"] not in done]
+    click.echo(f"{len(pending)} of {len(tasks)} tasks to run.")
+
+    runner = BatchRunner(
+        output_path,
+        workdir_root,
+        concurrency=concurrency,
+        role=role,
+        timeout=timeout,
+        echo=click.echo,
+    )
+
+    async def run():
+        main_task = asyncio.current_task()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+        return await runner.run(pending)
+
+    try:
+        results = asyncio.run(run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        click.echo("Interrupted; unfinished tasks will run on the next invocation.")
+        sys.exit(130)
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(results.items()))
+    click.echo(f"Done: {summary or 'nothing to do'}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import asyncio
+import contextlib
 import os
 import sys
 import traceback
@@ -23,8 +24,10 @@ from prompt_toolkit.widgets import TextArea
 
 from vibecoder import agents
 from vibecoder.agent_status import RespondingStatus, WaitingStatus, WorkingStatus
+from vibecoder.agents.context_window import ContextWindow
 from vibecoder.agents.swe import build_anthropic_swe_agent, build_swe_agent
-from vibecoder.messages import AgentResponse, ToolResult, ToolUse
+from vibecoder.agents.telemetry import Telemetry
+from vibecoder.messages import AgentResponse, AgentResponseDelta, ToolResult, ToolUse
 
 HISTORY_FILE = os.path.expanduser("~/.vibecoder_history")
 
@@ -137,10 +140,17 @@ class REPLContextManager:
         return Point(0, y)
 
     def print(self, text: str, style: str = "application"):
-        split = text.rstrip().splitlines()
-        for line in split:
-            self._output_lines.append((style, line + "\n"))
-        get_app().invalidate()
+        with self._span("ui"):
+            split = text.rstrip().splitlines()
+            for line in split:
+                self._output_lines.append((style, line + "\n"))
+            get_app().invalidate()
+
+    def _span(self, name: str):
+        telemetry = getattr(self.agent, "telemetry", None)
+        if isinstance(telemetry, Telemetry):
+            return telemetry.span(name)
+        return contextlib.nullcontext()
 
     def on_enter(self, buffer):
         try:
@@ -199,6 +209,25 @@ class REPLContextManager:
             self.print("🛑 Interrupt signal sent. Will yield at next pause.")
         elif command.startswith("role"):
             await self.switch_role(command[5:].strip())
+        elif command.startswith("stream"):
+            setting = command[6:].strip().lower()
+            if setting in {"on", "off"}:
+                self.agent.stream = setting == "on"
+            state = "on" if self.agent.stream else "off"
+            self.print(f"✅ Streaming is {state}.")
+        elif command.startswith("cache"):
+            setting = command[5:].strip().lower()
+            if not hasattr(self.agent, "prompt_caching"):
+                self.print("⚠️ This agent does not support prompt caching.")
+                return
+            if setting in {"on", "off"}:
+                self.agent.prompt_caching = setting == "on"
+            state = "on" if self.agent.prompt_caching else "off"
+            self.print(f"✅ Prompt caching is {state}.")
+        elif command.startswith("context"):
+            self.configure_context(command[7:].strip())
+        elif command.startswith("stats"):
+            self.show_stats(command[5:].strip())
         elif command.startswith("model"):
             model_name = command[5:].strip()
             if not model_name:
@@ -209,6 +238,49 @@ class REPLContextManager:
         else:
             self.print(f"⚠️ Unknown command: /{command}")
 
+    def configure_context(self, setting: str):
+        if not hasattr(self.agent, "context_window"):
+            self.print("⚠️ This agent does not support a context budget.")
+            return
+        if setting == "off":
+            self.agent.context_window = None
+        elif setting:
+            try:
+                max_tokens = int(setting)
+            except ValueError:
+                max_tokens = 0
+            if max_tokens <= 0:
+                self.print(f"⚠️ Invalid token budget: {setting}")
+                self.print("Usage: /context [tokens|off], with tokens above 0")
+                return
+            self.agent.context_window = ContextWindow(max_tokens)
+        window = self.agent.context_window
+        if window is None:
+            self.print("Context budget: unlimited")
+            return
+        self.print(f"Context budget: {window.max_tokens} tokens")
+        report = window.last_report
+        if report:
+            self.print(
+                f"Last request: {report.sent_tokens} of {report.original_tokens} "
+                f"tokens sent ({report.saved_tokens} saved, "
+                f"{report.stubbed_results} results stubbed, "
+                f"{report.dropped_messages} messages dropped)"
+            )
+        self.print(f"Total saved: {window.total_saved_tokens} tokens")
+
+    def show_stats(self, setting: str):
+        telemetry = getattr(self.agent, "telemetry", None)
+        if not isinstance(telemetry, Telemetry):
+            self.print("⚠️ This agent does not record statistics.")
+            return
+        if setting == "reset":
+            telemetry.reset()
+            self.print("✅ Statistics reset.")
+            return
+        for line in telemetry.report():
+            self.print(line)
+
     async def save_context(self, user_text: str):
         prompt_path = "vibecoder/prompts/save_context.md"
         session_file = ".vibecoder/swe_session.md"
@@ -251,12 +323,35 @@ class REPLContextManager:
     async def ask(self, line: str):
         try:
             outputs = []
+            # Start of the output lines showing a response that is still streaming.
+            live_start = None
+            streamed = ""
             async for output in self.agent.ask(line):
+                if isinstance(output, AgentResponseDelta):
+                    if not output.content:
+                        continue
+                    if live_start is None:
+                        live_start = len(self._output_lines)
+                        streamed = ""
+                    streamed += output.content
+                    del self._output_lines[live_start:]
+                    self.print(f"🤖 SWE: {streamed}", style="output")
+                    continue
                 if isinstance(output, AgentResponse):
                     text = f"🤖 SWE: {output.content}"
-                    self.print(text, style="output")
+                    if live_start is not None:
+                        # Replace the streamed preview with the final text.
+                        del self._output_lines[live_start:]
+                        self.print(text, style="output")
+                    elif output.content != streamed:
+                        self.print(text, style="output")
+                    live_start = None
+                    streamed = ""
                     outputs.append(text)
-                elif isinstance(output, ToolUse):
+                    continue
+                # Anything else ends the live preview; the text stays on screen.
+                live_start = None
+                if isinstance(output, ToolUse):
                     args_str = str(output.arguments)
                     if len(args_str) > 200:
                         args_str = args_str[:200] + "..."
@@ -10,6 +10,9 @@ class AgentMessage(ABC):
     input_tokens: int = 0
     output_tokens: int = 0
     content: str = ""
+    # Input tokens read from / written to the provider's prompt cache.
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
 
     @abstractmethod
     def to_openai_dict(self) -> dict:
@@ -31,6 +34,19 @@ class AgentResponse(AgentMessage):
         return {"role": "assistant", "content": self.content}
 
 
+@dataclass
+class AgentResponseDelta(AgentMessage):
+    """A fragment of an assistant response, yielded while a completion streams.
+
+    Deltas are for display only; the complete AgentResponse follows once the
+    stream ends and is what gets recorded in the conversation history. The
+    last delta of a streamed request has no content and carries its token usage.
+    """
+
+    def to_openai_dict(self):
+        return {"role": "assistant", "content": self.content}
+
+
 @dataclass
 class ToolUse(AgentMessage):
     tool_name: str = ""
@@ -29,8 +29,11 @@ def get_all_tools() -> List[Tool]:
 def get_analyst_tools() -> List[Tool]:
     analyst_tool_names = {
         "grep",
+        "code_search",
         "git_tool",
         "read_file",
+        "read_files",
+        "symbols",
         "write_file",
         "tree_files",
         "pytest",
@@ -10,13 +10,14 @@ PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
 
 class ApplyDiffPatchTool(Tool):
     name = "apply_diff_patch"
+    prompt_file = "apply_diff_patch.md"
 
     def __init__(self):
         super().__init__()
 
     @property
     def prompt_description(self) -> str:
-        path = os.path.join(PROMPT_DIR, "apply_diff_patch.md")
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
         with open(path, "r") as f:
             return f.read().strip()
 
@@ -1,8 +1,9 @@
+import asyncio
 import os
-from typing import Dict
+from typing import Dict, List, Optional
 
 from vibecoder.messages import ToolResult, ToolUse
-from vibecoder.tools import apply_patch_lib
+from vibecoder.tools import apply_patch_lib, file_transaction
 from vibecoder.tools.base import Tool
 
 PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
@@ -10,10 +11,11 @@ PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
 
 class ApplyPatchTool(Tool):
     name = "apply_patch"
+    prompt_file = "apply_patch.md"
 
     @property
     def prompt_description(self) -> str:
-        path = os.path.join(PROMPT_DIR, "apply_patch.md")
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
         with open(path, "r") as f:
             return f.read().strip()
 
@@ -37,18 +39,29 @@ class ApplyPatchTool(Tool):
             },
         }
 
+    def touched_paths(self, args: Dict) -> Optional[List[str]]:
+        patch_text = args.get("input") or ""
+        return apply_patch_lib.identify_files_touched(patch_text)
+
     async def run_helper(self, args: Dict) -> str:
         patch_text = args.get("input")
         if not patch_text:
             return "[Error: Missing 'input' (patch text).]"
 
         try:
-            result = apply_patch_lib.process_patch(
-                text=patch_text,
-                open_fn=apply_patch_lib.open_file,
-                write_fn=apply_patch_lib.write_file,
-                remove_fn=apply_patch_lib.remove_file,
-            )
+            # Either every file of the patch is changed or none is.
+            transaction = file_transaction.FileTransaction()
+            try:
+                result = await apply_patch_lib.process_patch_async(
+                    text=patch_text,
+                    open_fn=apply_patch_lib.open_file,
+                    write_fn=transaction.write,
+                    remove_fn=transaction.remove,
+                )
+            except BaseException:
+                await asyncio.to_thread(transaction.discard)
+                raise
+            await asyncio.to_thread(transaction.commit)
             return result
         except apply_patch_lib.DiffError as e:
             return f"[Patch application failed: {e}]"
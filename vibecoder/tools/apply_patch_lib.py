@@ -7,11 +7,15 @@ A self-contained **pure-Python 3.9+** utility for applying human-readable
 
 from __future__ import annotations
 
+import asyncio
+import bisect
 import pathlib
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Callable, Dict, List, Optional, Tuple, Union
 
+from vibecoder.tools import content_cache
+
 
 # --------------------------------------------------------------------------- #
 #  Domain objects
@@ -168,6 +172,7 @@ class Parser:
     def _parse_update_file(self, text: str) -> PatchAction:
         action = PatchAction(type=ActionType.UPDATE)
         lines = text.split("\n")
+        context_index = ContextIndex(lines)
         index = 0
         while not self.is_done(
             (
@@ -205,7 +210,7 @@ class Parser:
                             break
 
             next_ctx, chunks, end_idx, eof = peek_next_section(self.lines, self.index)
-            new_index, fuzz = find_context(lines, next_ctx, index, eof)
+            new_index, fuzz = find_context(lines, next_ctx, index, eof, context_index)
             if new_index == -1:
                 ctx_txt = "\n".join(next_ctx)
                 raise DiffError(
@@ -234,38 +239,114 @@ class Parser:
 # --------------------------------------------------------------------------- #
 #  Helper functions
 # --------------------------------------------------------------------------- #
+class ContextIndex:
+    """
+    Where each line of a file occurs, for each of the normalizations
+    find_context_core tries (as is, rstripped, stripped). Built once per file,
+    so that a context lookup only compares the offsets at which its rarest
+    line occurs instead of every offset.
+    """
+
+    LEVELS: Tuple[Tuple[int, Optional[Callable[[str], str]]], ...] = (
+        (0, None),
+        (1, str.rstrip),
+        (100, str.strip),
+    )
+
+    def __init__(self, lines: List[str]) -> None:
+        self.lines = lines
+        # Per fuzz level, built on first use: the normalized lines, and the
+        # sorted positions of each normalized line.
+        self._levels: Dict[int, Tuple[List[str], Dict[str, List[int]]]] = {}
+
+    def _level(
+        self, fuzz: int, norm: Optional[Callable[[str], str]]
+    ) -> Tuple[List[str], Dict[str, List[int]]]:
+        if fuzz not in self._levels:
+            normalized = self.lines if norm is None else [norm(s) for s in self.lines]
+            positions: Dict[str, List[int]] = {}
+            for i, s in enumerate(normalized):
+                positions.setdefault(s, []).append(i)
+            self._levels[fuzz] = (normalized, positions)
+        return self._levels[fuzz]
+
+    def find(self, context: List[str], start: int) -> Tuple[int, int]:
+        """The first offset >= start where context matches, and its fuzz."""
+        if not context:
+            return start, 0
+        size = len(context)
+        # Offsets past last leave too few lines for the context to fit.
+        last = len(self.lines) - size
+        for fuzz, norm in self.LEVELS:
+            normalized, positions = self._level(fuzz, norm)
+            wanted = context if norm is None else [norm(s) for s in context]
+            anchor, occurrences = min(
+                ((j, positions.get(s, [])) for j, s in enumerate(wanted)),
+                key=lambda found: len(found[1]),
+            )
+            if start < 0:
+                # lines[i : i + size] for a negative i counts from the end,
+                # and is a whole window only while i + size < 0.
+                i = self._first(
+                    normalized,
+                    wanted,
+                    occurrences,
+                    anchor,
+                    len(self.lines) + start,
+                    last - 1,
+                )
+                if i != -1:
+                    return i - len(self.lines), fuzz
+            i = self._first(normalized, wanted, occurrences, anchor, start, last)
+            if i != -1:
+                return i, fuzz
+        return -1, 0
+
+    @staticmethod
+    def _first(
+        normalized: List[str],
+        wanted: List[str],
+        occurrences: List[int],
+        anchor: int,
+        lo: int,
+        hi: int,
+    ) -> int:
+        """The first offset in lo..hi where wanted matches, or -1."""
+        lo = max(lo, 0)
+        first = bisect.bisect_left(occurrences, lo + anchor)
+        for position in occurrences[first:]:
+            i = position - anchor
+            if i > hi:
+                break
+            if normalized[i : i + len(wanted)] == wanted:
+                return i
+        return -1
+
+
 def find_context_core(
-    lines: List[str], context: List[str], start: int
+    lines: List[str],
+    context: List[str],
+    start: int,
+    index: Optional[ContextIndex] = None,
 ) -> Tuple[int, int]:
-    if not context:
-        return start, 0
-
-    for i in range(start, len(lines)):
-        if lines[i : i + len(context)] == context:
-            return i, 0
-    for i in range(start, len(lines)):
-        if [s.rstrip() for s in lines[i : i + len(context)]] == [
-            s.rstrip() for s in context
-        ]:
-            return i, 1
-    for i in range(start, len(lines)):
-        if [s.strip() for s in lines[i : i + len(context)]] == [
-            s.strip() for s in context
-        ]:
-            return i, 100
-    return -1, 0
+    return (index or ContextIndex(lines)).find(context, start)
 
 
 def find_context(
-    lines: List[str], context: List[str], start: int, eof: bool
+    lines: List[str],
+    context: List[str],
+    start: int,
+    eof: bool,
+    index: Optional[ContextIndex] = None,
 ) -> Tuple[int, int]:
+    index = index or ContextIndex(lines)
     if eof:
-        new_index, fuzz = find_context_core(lines, context, len(lines) - len(context))
+        new_index, fuzz = index.find(context, len(lines) - len(context))
         if new_index != -1:
             return new_index, fuzz
-        new_index, fuzz = find_context_core(lines, context, start)
+        new_index, fuzz = index.find(context, start)
         return new_index, fuzz + 10_000
-    return find_context_core(lines, context, start)
+    return index.find(context, start)
 
 
 def peek_next_section(
@@ -440,6 +521,16 @@ def identify_files_added(text: str) -> List[str]:
     ]
 
 
+def identify_files_touched(text: str) -> List[str]:
+    """Every path a patch reads, writes, removes or moves a file to."""
+    moved = [
+        line[len("*** Move to: ") :]
+        for line in text.splitlines()
+        if line.startswith("*** Move to: ")
+    ]
+    return identify_files_needed(text) + identify_files_added(text) + moved
+
+
 # --------------------------------------------------------------------------- #
 #  File-system helpers
 # --------------------------------------------------------------------------- #
@@ -468,6 +559,50 @@ def apply_commit(
                 remove_fn(path)
 
 
+async def load_files_async(
+    paths: List[str], open_fn: Callable[[str], str]
+) -> Dict[str, str]:
+    """load_files, with every file read at the same time in worker threads."""
+    contents = await asyncio.gather(*(asyncio.to_thread(open_fn, p) for p in paths))
+    return dict(zip(paths, contents))
+
+
+async def apply_commit_async(
+    commit: Commit,
+    write_fn: Callable[[str, str], None],
+    remove_fn: Callable[[str], None],
+) -> None:
+    """
+    apply_commit, with the changes to different files made at the same time
+    in worker threads. Changes that share a path (a file moved onto another
+    changed file) are applied one after another, in order, as apply_commit
+    would.
+    """
+    for path, change in commit.changes.items():
+        if change.type is not ActionType.DELETE and change.new_content is None:
+            # Raise before anything is written, with apply_commit's message.
+            apply_commit(Commit(changes={path: change}), write_fn, remove_fn)
+
+    changes = list(commit.changes.items())
+    paths = [p for path, change in changes for p in (path, change.move_path) if p]
+    if len(paths) != len(set(paths)):
+        await asyncio.to_thread(apply_commit, commit, write_fn, remove_fn)
+        return
+    await asyncio.gather(
+        *(
+            asyncio.to_thread(
+                apply_commit, Commit(changes={path: change}), write_fn, remove_fn
+            )
+            for path, change in changes
+        )
+    )
+
+
+def _parse_commit(text: str, orig: Dict[str, str]) -> Commit:
+    patch, _fuzz = text_to_patch(text, orig)
+    return patch_to_commit(patch, orig)
+
+
 def process_patch(
     text: str,
     open_fn: Callable[[str], str],
@@ -478,29 +613,50 @@ def process_patch(
         raise DiffError("Patch text must start with *** Begin Patch")
     paths = identify_files_needed(text)
     orig = load_files(paths, open_fn)
-    patch, _fuzz = text_to_patch(text, orig)
-    commit = patch_to_commit(patch, orig)
+    commit = _parse_commit(text, orig)
     apply_commit(commit, write_fn, remove_fn)
     return "Done!"
 
 
+async def process_patch_async(
+    text: str,
+    open_fn: Callable[[str], str],
+    write_fn: Callable[[str, str], None],
+    remove_fn: Callable[[str], None],
+) -> str:
+    """
+    process_patch without blocking the event loop: the files are read and
+    written concurrently in worker threads, and the patch is parsed and
+    matched in one. open_fn, write_fn and remove_fn must be thread-safe.
+    """
+    if not text.startswith("*** Begin Patch"):
+        raise DiffError("Patch text must start with *** Begin Patch")
+    paths = identify_files_needed(text)
+    orig = await load_files_async(paths, open_fn)
+    commit = await asyncio.to_thread(_parse_commit, text, orig)
+    await apply_commit_async(commit, write_fn, remove_fn)
+    return "Done!"
+
+
 # --------------------------------------------------------------------------- #
 #  Default FS helpers
 # --------------------------------------------------------------------------- #
 def open_file(path: str) -> str:
-    with open(path, "rt", encoding="utf-8") as fh:
-        return fh.read()
+    return content_cache.read_text(path)
 
 
 def write_file(path: str, content: str) -> None:
     target = pathlib.Path(path)
     target.parent.mkdir(parents=True, exist_ok=True)
-    with target.open("wt", encoding="utf-8") as fh:
-        fh.write(content)
+    data = content.encode("utf-8")
+    with target.open("wb") as fh:
+        fh.write(data)
+    content_cache.store(path, data)
 
 
 def remove_file(path: str) -> None:
     pathlib.Path(path).unlink(missing_ok=True)
+    content_cache.invalidate(path)
 
 
 # --------------------------------------------------------------------------- #
@@ -513,8 +669,13 @@ def main() -> None:
     if not patch_text:
         print("Please pass patch text through stdin", file=sys.stderr)
         return
+    from vibecoder.tools.file_transaction import FileTransaction
+
     try:
-        result = process_patch(patch_text, open_file, write_file, remove_file)
+        with FileTransaction() as transaction:
+            result = process_patch(
+                patch_text, open_file, transaction.write, transaction.remove
+            )
     except DiffError as exc:
         print(exc, file=sys.stderr)
         return
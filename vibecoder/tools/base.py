@@ -1,15 +1,28 @@
+import os
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List, Optional
 
-from vibecoder.agents.agent import ToolResult, ToolUse
+from vibecoder.messages import ToolResult, ToolUse
+
+PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
 
 
 class Tool(ABC):
     """
     Abstract base for tools. Subclasses must implement run(tool_use) returning ToolResult.
+
+    Tools also declare how they touch the workspace so that calls from a single
+    model turn can be scheduled concurrently. ``read_only`` tools never modify
+    anything; ``touched_paths`` names the paths a call reads or writes, or
+    returns None when the call may touch the whole working directory.
+    Read-only tools whose output depends only on the workspace can also
+    report ``cache_paths`` so repeated calls are served from a cache.
     """
 
     name: str
+    # Markdown file in vibecoder/prompts/tools/ the description is read from.
+    prompt_file: Optional[str] = None
+    read_only: bool = False
 
     @property
     @abstractmethod
@@ -30,6 +43,30 @@ class Tool(ABC):
         """
         pass
 
+    @property
+    def prompt_path(self) -> Optional[str]:
+        """Absolute path of the prompt file, if the tool has one."""
+        if not isinstance(self.prompt_file, str):
+            return None
+        return os.path.abspath(os.path.join(PROMPT_DIR, self.prompt_file))
+
+    def is_read_only(self, arguments: Dict) -> bool:
+        """Whether a call with these arguments leaves the workspace unchanged."""
+        return self.read_only
+
+    def touched_paths(self, arguments: Dict) -> Optional[List[str]]:
+        """Paths read or written by a call with these arguments (None means everything)."""
+        return None
+
+    def cache_paths(self, arguments: Dict) -> Optional[List[str]]:
+        """
+        Paths whose on-disk state fully determines the result of a read-only call.
+
+        Returning a list lets ToolResultCache reuse the result until one of
+        these paths changes; None (the default) means the call is not cacheable.
+        """
+        return None
+
     @property
     def display_signature(self) -> str:
         """Generate a human-readable summary of the tool's signature."""
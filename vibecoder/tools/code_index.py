@@ -0,0 +1,359 @@
+"""
+Inverted index of a workspace split into function- and class-sized chunks,
+ranked with BM25 for the code_search tool.
+
+Python files are chunked along their top-level functions, classes and
+methods (module-level code in between forms chunks of its own); other text
+files are cut into fixed windows. Identifiers are split on case and
+underscores ("retryAfter", "retry_after" -> "retry", "after") with light
+stemming, so a natural-language query finds code using any spelling.
+
+Posting lists are array('I') of chunk ids and term frequencies that numpy
+reads without copying. As with the trigram index, a changed file's chunks
+are tombstoned and re-added, and the index is compacted once half of it is
+dead. It is refreshed from file mtimes and sizes before every query and
+saved to .vibecoder/code_search.npz.
+"""
+
+import ast
+import io
+import json
+import math
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from vibecoder.tools.trigram_index import INDEX_DIR, walk_workspace
+
+INDEX_FILE = "code_search.npz"
+FORMAT = 1
+# Files larger than this are not indexed.
+MAX_FILE_BYTES = 1024 * 1024
+# Longer chunks (and non-Python files) are cut into windows of this many lines.
+MAX_CHUNK_LINES = 60
+# BM25 parameters.
+K1 = 1.2
+B = 0.75
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from if in into is it not of on or the to "
+    "with def self return import none true false class pass elif else".split()
+)
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_PARTS = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+Chunk = Tuple[str, int, int]  # relative path, first line, last line
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 4 and word.endswith("ed"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=65536)
+def _terms(identifier: str) -> Tuple[str, ...]:
+    parts = [p.lower() for p in _PARTS.findall(identifier)]
+    terms = [_stem(p) for p in parts if p not in STOP_WORDS and len(p) > 1]
+    if len(parts) > 1:
+        terms.append(identifier.lower().strip("_"))
+    return tuple(terms)
+
+
+def tokenize(text: str) -> Counter:
+    """Term frequencies of a piece of code or prose."""
+    counts = Counter()
+    for identifier, n in Counter(_IDENTIFIER.findall(text)).items():
+        for term in _terms(identifier):
+            counts[term] += n
+    return counts
+
+
+def _windows(start: int, end: int) -> Iterator[Tuple[int, int]]:
+    for first in range(start, end + 1, MAX_CHUNK_LINES):
+        yield first, min(end, first + MAX_CHUNK_LINES - 1)
+
+
+def _first_line(node: ast.AST) -> int:
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [d.lineno for d in decorators])
+
+
+def chunk_lines(text: str, python: bool) -> List[Tuple[int, int]]:
+    """1-based inclusive line ranges of the chunks of a file."""
+    count = text.count("\n") + (0 if text.endswith("\n") else 1)
+    if count == 0:
+        return []
+    spans = []
+    if python:
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError, RecursionError):
+            tree = None
+        if tree is not None:
+            defs = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+            for node in tree.body:
+                if not isinstance(node, defs):
+                    continue
+                start, end = _first_line(node), node.end_lineno
+                methods = (
+                    [n for n in node.body if isinstance(n, defs[:2])]
+                    if isinstance(node, ast.ClassDef)
+                    else []
+                )
+                for method in methods:
+                    if _first_line(method) > start:
+                        spans.append((start, _first_line(method) - 1))
+                    start = _first_line(method)
+                    spans.append((start, method.end_lineno))
+                    start = method.end_lineno + 1
+                if start <= end:
+                    spans.append((start, end))
+    # Whatever is not part of a definition is chunked by position.
+    chunks = []
+    line = 1
+    for start, end in sorted(spans):
+        if start > line:
+            chunks.extend(_windows(line, start - 1))
+        chunks.extend(_windows(start, end))
+        line = end + 1
+    if line <= count:
+        chunks.extend(_windows(line, count))
+    return chunks
+
+
+def read_text(path: str) -> Optional[str]:
+    """Text of a file, or None if it is binary, too large or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(MAX_FILE_BYTES + 1)
+    except OSError:
+        return None
+    if len(data) > MAX_FILE_BYTES or b"\0" in data[:8192]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+class CodeIndex:
+    """BM25 index over the chunks of one workspace root."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.path = os.path.join(self.root, INDEX_DIR, INDEX_FILE)
+        # Relative path -> (mtime_ns, size) and ids of its chunks.
+        self.files: Dict[str, Tuple[int, int]] = {}
+        self.file_chunks: Dict[str, List[int]] = {}
+        # Chunk id -> chunk, or None once tombstoned; lengths are 0 for those.
+        self.chunks: List[Optional[Chunk]] = []
+        self.lengths = array("I")
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.dead = 0
+        self.lock = threading.RLock()
+
+    @property
+    def live(self) -> int:
+        return len(self.chunks) - self.dead
+
+    def refresh(self) -> int:
+        """Re-index new, changed and removed files; returns how many."""
+        current = dict(walk_workspace(self.root))
+        with self.lock:
+            changed = [rel for rel, st in current.items() if self.files.get(rel) != st]
+            removed = [rel for rel in self.files if rel not in current]
+            for rel in removed + changed:
+                self._remove(rel)
+            for rel in changed:
+                self._add(rel, current[rel])
+            if self.dead > self.live:
+                self._compact()
+            return len(changed) + len(removed)
+
+    def _remove(self, rel: str) -> None:
+        self.files.pop(rel, None)
+        for chunk_id in self.file_chunks.pop(rel, ()):
+            self.chunks[chunk_id] = None
+            self.lengths[chunk_id] = 0
+            self.dead += 1
+
+    def _add(self, rel: str, stat: Tuple[int, int]) -> None:
+        # Unreadable and binary files are remembered, so they are not retried
+        # until they change.
+        self.files[rel] = stat
+        text = read_text(os.path.join(self.root, rel))
+        if not text:
+            return
+        lines = text.split("\n")
+        path_terms = tokenize(rel)
+        ids = []
+        for start, end in chunk_lines(text, rel.endswith(".py")):
+            counts = tokenize("\n".join(lines[start - 1 : end]))
+            if not counts:
+                continue
+            counts.update(path_terms)
+            chunk_id = len(self.chunks)
+            self.chunks.append((rel, start, end))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                posting = self.postings.get(term)
+                if posting is None:
+                    posting = self.postings[term] = (array("I"), array("I"))
+                posting[0].append(chunk_id)
+                posting[1].append(tf)
+            ids.append(chunk_id)
+        self.file_chunks[rel] = ids
+
+    def _compact(self) -> None:
+        alive = np.frombuffer(self.lengths, dtype=np.uint32) > 0
+        remap = np.cumsum(alive, dtype=np.int64) - 1
+        self.chunks = [c for c in self.chunks if c is not None]
+        self.lengths = array("I", (n for n in self.lengths if n))
+        self.file_chunks = {
+            rel: [int(remap[i]) for i in ids] for rel, ids in self.file_chunks.items()
+        }
+        postings = {}
+        for term, (ids, tfs) in self.postings.items():
+            ids_np = np.frombuffer(ids, dtype=np.uint32)
+            keep = alive[ids_np]
+            if keep.any():
+                postings[term] = (
+                    array("I", remap[ids_np[keep]].astype(np.uint32).tobytes()),
+                    array("I", np.frombuffer(tfs, dtype=np.uint32)[keep].tobytes()),
+                )
+        self.postings = postings
+        self.dead = 0
+
+    def search(
+        self, query: str, k: int = 10, path: Optional[str] = None
+    ) -> List[Tuple[float, Chunk]]:
+        """The k best chunks for query, optionally only under path."""
+        with self.lock:
+            if not self.live:
+                return []
+            lengths = np.frombuffer(self.lengths, dtype=np.uint32).astype(np.float32)
+            alive = lengths > 0
+            norm = K1 * (1 - B + B * lengths / lengths[alive].mean())
+            scores = np.zeros(len(self.chunks), dtype=np.float32)
+            for term, query_tf in tokenize(query).items():
+                posting = self.postings.get(term)
+                if posting is None:
+                    continue
+                ids = np.frombuffer(posting[0], dtype=np.uint32)
+                tfs = np.frombuffer(posting[1], dtype=np.uint32).astype(np.float32)
+                keep = alive[ids]
+                ids, tfs = ids[keep], tfs[keep]
+                if not len(ids):
+                    continue
+                idf = math.log(1 + (self.live - len(ids) + 0.5) / (len(ids) + 0.5))
+                # A chunk appears at most once per posting list, so plain
+                # fancy-index addition is safe.
+                scores[ids] += query_tf * idf * tfs * (K1 + 1) / (tfs + norm[ids])
+            if path:
+                scores *= self._path_mask(path)
+            hits = np.flatnonzero(scores > 0)
+            if len(hits) > k:
+                hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+            ranked = sorted(hits, key=lambda i: (-scores[i], i))
+            return [(float(scores[i]), self.chunks[i]) for i in ranked]
+
+    def _path_mask(self, path: str) -> np.ndarray:
+        # Chunks are keyed by paths relative to the root.
+        if os.path.isabs(path):
+            prefix = os.path.relpath(path, self.root)
+        else:
+            prefix = os.path.normpath(path)
+        mask = np.zeros(len(self.chunks), dtype=np.float32)
+        for rel, ids in self.file_chunks.items():
+            if prefix == "." or rel == prefix or rel.startswith(prefix + os.sep):
+                mask[ids] = 1
+        return mask
+
+    def save(self) -> None:
+        with self.lock:
+            terms = sorted(self.postings)
+            sizes = [len(self.postings[t][0]) for t in terms]
+            meta = {
+                "format": FORMAT,
+                "root": self.root,
+                "files": self.files,
+                "file_chunks": self.file_chunks,
+                "chunks": self.chunks,
+                "terms": terms,
+            }
+            arrays = {
+                "meta": np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+                "lengths": np.frombuffer(self.lengths, dtype=np.uint32),
+                "sizes": np.array(sizes, dtype=np.int64),
+                "ids": _concat([self.postings[t][0] for t in terms]),
+                "tfs": _concat([self.postings[t][1] for t in terms]),
+            }
+            buffer = io.BytesIO()
+            np.savez(buffer, **arrays)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        partial = self.path + ".partial"
+        with open(partial, "wb") as f:
+            f.write(buffer.getbuffer())
+        os.replace(partial, self.path)
+
+    @classmethod
+    def load(cls, root: str) -> "CodeIndex":
+        """The saved index of root, or an empty one."""
+        index = cls(root)
+        try:
+            with np.load(index.path, allow_pickle=False) as data:
+                meta = json.loads(data["meta"].tobytes())
+                if meta.get("format") != FORMAT or meta.get("root") != index.root:
+                    return index
+                lengths, sizes = data["lengths"], data["sizes"]
+                ids, tfs = data["ids"], data["tfs"]
+        except (OSError, ValueError, KeyError):
+            return index
+        index.files = {rel: tuple(st) for rel, st in meta["files"].items()}
+        index.file_chunks = meta["file_chunks"]
+        index.chunks = [tuple(c) if c else None for c in meta["chunks"]]
+        index.lengths = array("I", lengths.astype(np.uint32).tobytes())
+        index.dead = int((lengths == 0).sum())
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        for term, start, end in zip(meta["terms"], offsets[:-1], offsets[1:]):
+            index.postings[term] = (
+                array("I", ids[start:end].tobytes()),
+                array("I", tfs[start:end].tobytes()),
+            )
+        return index
+
+
+def _concat(arrays: List[array]) -> np.ndarray:
+    if not arrays:
+        return np.zeros(0, dtype=np.uint32)
+    return np.concatenate([np.frombuffer(a, dtype=np.uint32) for a in arrays])
+
+
+_indexes: Dict[str, CodeIndex] = {}
+_lock = threading.Lock()
+
+
+def index_for(root: str) -> CodeIndex:
+    """The up-to-date index of root, loading or building it as needed."""
+    root = os.path.abspath(root)
+    with _lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = CodeIndex.load(root)
+    if index.refresh():
+        try:
+            index.save()
+        except OSError:
+            pass  # A read-only workspace still gets an in-memory index.
+    return index
@@ -0,0 +1,106 @@
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from vibecoder.messages import ToolResult, ToolUse
+
+from . import code_index
+from .base import Tool
+
+PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
+
+DEFAULT_MAX_RESULTS = 8
+# Lines of each chunk shown: its first line, then the lines matching most terms.
+SNIPPET_LINES = 8
+
+
+class CodeSearchTool(Tool):
+    name = "code_search"
+    prompt_file = "code_search.md"
+    read_only = True
+
+    @property
+    def prompt_description(self) -> str:
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
+        with open(path, "r") as f:
+            return f.read().strip()
+
+    @property
+    def signature(self) -> Dict:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.prompt_description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "Words describing the code to find.",
+                        },
+                        "path": {
+                            "type": "string",
+                            "description": "File or directory to limit the search to.",
+                        },
+                        "max_results": {
+                            "type": "integer",
+                            "default": DEFAULT_MAX_RESULTS,
+                        },
+                    },
+                    "required": ["query"],
+                },
+            },
+        }
+
+    async def run_helper(self, args: Dict) -> str:
+        query = args.get("query")
+        if not query or not isinstance(query, str):
+            return "[Error in call to code_search] `query` is required"
+        try:
+            max_results = int(args.get("max_results") or DEFAULT_MAX_RESULTS)
+        except (TypeError, ValueError):
+            return "[Error in call to code_search] `max_results` must be an integer"
+        if max_results < 1:
+            return "[Error in call to code_search] `max_results` must be positive"
+        # Indexing new or changed files and scoring block.
+        return await asyncio.to_thread(
+            self._search, query, args.get("path"), max_results
+        )
+
+    @staticmethod
+    def _search(query: str, path: Optional[str], max_results: int) -> str:
+        index = code_index.index_for(os.getcwd())
+        results = index.search(query, max_results, path)
+        if not results:
+            return f"[No code matching '{query}' found]\n"
+        terms = set(code_index.tokenize(query))
+        output = []
+        for score, (rel, start, end) in results:
+            output.append(f"{rel}:{start}-{end} (score {score:.2f})")
+            for number, line in _snippet(rel, start, end, terms):
+                output.append(f"  {number}: {line}")
+        return "".join(line + "\n" for line in output)
+
+    async def run(self, tool_use: ToolUse) -> ToolResult:
+        result_str = await self.run_helper(tool_use.arguments)
+        return ToolResult(
+            content=result_str,
+            tool_name=self.name,
+            tool_call_id=tool_use.tool_call_id,
+        )
+
+
+def _snippet(rel: str, start: int, end: int, terms: set) -> List[tuple]:
+    """The first line of a chunk and its lines with the most query terms."""
+    text = code_index.read_text(rel)
+    if text is None:
+        return []
+    lines = text.split("\n")[start - 1 : end]
+    scored = []
+    for offset, line in enumerate(lines[1:], 1):
+        hits = len(terms.intersection(code_index.tokenize(line)))
+        if hits:
+            scored.append((-hits, offset))
+    chosen = sorted([0] + [offset for _, offset in sorted(scored)[: SNIPPET_LINES - 1]])
+    return [(start + offset, lines[offset].rstrip()[:200]) for offset in chosen]
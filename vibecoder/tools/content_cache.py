@@ -0,0 +1,183 @@
+"""
+Process-wide cache of file contents shared by the file tools.
+
+read_file, grep and apply_patch read the same files over and over. Their reads
+go through one LRU cache of raw bytes, bounded in total size, whose entries
+are only served while the file's inode, mtime and size are unchanged, so a
+hit costs one stat. Files the tools write are stored back as written, and
+removed files are dropped. Set VIBECODER_CONTENT_CACHE_MB to change the bound
+(default 64), or to 0 to disable the cache.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+DEFAULT_MAX_MB = 64
+# Larger files are read directly and not cached.
+MAX_ENTRY_BYTES = 4 * 1024 * 1024
+
+FileKey = Tuple[int, int, int]
+
+
+def _file_key(st: os.stat_result) -> FileKey:
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@dataclass
+class _Entry:
+    key: FileKey
+    data: bytes
+
+
+class ContentCache:
+    """LRU cache of file contents, bounded by max_bytes in total."""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int = MAX_ENTRY_BYTES):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def read(self, path: str) -> bytes:
+        """The contents of path; raises OSError like open() would."""
+        full = os.path.abspath(path)
+        key = _file_key(os.stat(full))
+        with self._lock:
+            entry = self._entries.get(full)
+            if entry is not None and entry.key == key:
+                self._entries.move_to_end(full)
+                self.hits += 1
+                return entry.data
+            self.misses += 1
+        with open(full, "rb") as f:
+            # Key the contents on the file that was actually read.
+            key = _file_key(os.fstat(f.fileno()))
+            data = f.read()
+        if len(data) == key[2]:
+            self._put(full, _Entry(key, data))
+        return data
+
+    def store(self, path: str, data: bytes) -> None:
+        """Record data as what was just written to path."""
+        full = os.path.abspath(path)
+        try:
+            key = _file_key(os.stat(full))
+        except OSError:
+            self.invalidate(path)
+            return
+        if key[2] != len(data):
+            self.invalidate(path)
+            return
+        self._put(full, _Entry(key, data))
+
+    def append(self, path: str, data: bytes) -> None:
+        """Record data as just appended to path."""
+        full = os.path.abspath(path)
+        with self._lock:
+            entry = self._entries.get(full)
+        if entry is None:
+            return
+        try:
+            key = _file_key(os.stat(full))
+        except OSError:
+            key = None
+        if key is None or key[0] != entry.key[0] or key[2] != entry.key[2] + len(data):
+            self.invalidate(path)
+            return
+        self._put(full, _Entry(key, entry.data + data))
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._drop(os.path.abspath(path))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def _put(self, full: str, entry: _Entry) -> None:
+        with self._lock:
+            self._drop(full)
+            if len(entry.data) > self.max_entry_bytes:
+                return
+            self._entries[full] = entry
+            self.size_bytes += len(entry.data)
+            while self.size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= len(evicted.data)
+                self.evictions += 1
+
+    def _drop(self, full: str) -> None:
+        entry = self._entries.pop(full, None)
+        if entry is not None:
+            self.size_bytes -= len(entry.data)
+
+
+def _max_bytes() -> int:
+    try:
+        mb = float(os.getenv("VIBECODER_CONTENT_CACHE_MB", DEFAULT_MAX_MB))
+    except ValueError:
+        mb = DEFAULT_MAX_MB
+    return max(0, int(mb * 1024 * 1024))
+
+
+_cache: Optional[ContentCache] = None
+
+
+def cache() -> ContentCache:
+    """The shared cache, created on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ContentCache(_max_bytes())
+    return _cache
+
+
+def read(path: str) -> bytes:
+    return cache().read(path)
+
+
+def read_text(path: str) -> str:
+    """
+    The contents of path decoded as UTF-8 with universal newlines, as a file
+    opened in text mode reads them.
+    """
+    text = read(path).decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def store(path: str, data: bytes) -> None:
+    cache().store(path, data)
+
+
+def append(path: str, data: bytes) -> None:
+    cache().append(path, data)
+
+
+def invalidate(path: str) -> None:
+    cache().invalidate(path)
+
+
+def stats() -> Dict[str, float]:
+    return cache().stats()
@@ -1,5 +1,5 @@
 import os
-from typing import Dict
+from typing import Dict, List, Optional
 
 import httpx
 from bs4 import BeautifulSoup
@@ -13,10 +13,12 @@ PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
 
 class FetchUrlTool(Tool):
     name = "fetch_url"
+    prompt_file = "fetch_url.md"
+    read_only = True
 
     @property
     def prompt_description(self) -> str:
-        path = os.path.join(PROMPT_DIR, "fetch_url.md")
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
         with open(path, "r") as f:
             return f.read().strip()
 
@@ -40,6 +42,9 @@ class FetchUrlTool(Tool):
             },
         }
 
+    def touched_paths(self, args: Dict) -> Optional[List[str]]:
+        return []
+
     async def run_helper(self, args: Dict) -> str:
         url = args.get("url")
         if not url:
@@ -0,0 +1,320 @@
+"""
+All-or-nothing multi-file writes for apply_patch and write_file.
+
+Writes are staged as temp files next to their targets as they are made. On
+commit, the original of every file that is replaced or removed is kept as a
+hard link (a copy where links are not supported), a journal listing the
+targets, temp files and backups is written to .vibecoder/journal, and the temp
+files are renamed over their targets. Deleting the journal is the commit
+point: an exception before then restores every target from its backup, and a
+journal left behind by a process that died is rolled back the same way by the
+next transaction started in that directory.
+
+How much is flushed to disk is set by VIBECODER_DURABILITY:
+
+- "none": nothing is fsynced; the OS writes the files back when it likes.
+- "data" (default): temp files and the journal are fsynced before any rename.
+- "full": directories are fsynced too, so the renames themselves survive a
+  power loss.
+"""
+
+import itertools
+import json
+import os
+import secrets
+import shutil
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from vibecoder.tools import content_cache
+
+DURABILITY_LEVELS = ("none", "data", "full")
+DEFAULT_DURABILITY = "data"
+JOURNAL_DIR = os.path.join(".vibecoder", "journal")
+
+_ids = itertools.count()
+
+
+def durability_level() -> str:
+    level = os.getenv("VIBECODER_DURABILITY", DEFAULT_DURABILITY)
+    return level if level in DURABILITY_LEVELS else DEFAULT_DURABILITY
+
+
+@dataclass
+class _Staged:
+    # The file written or removed; symlinks are resolved for writes only.
+    target: str
+    # The new contents, or None to remove target.
+    data: Optional[bytes]
+    temp: Optional[str] = None
+    backup: Optional[str] = None
+
+
+@dataclass
+class _Journal:
+    entries: List[_Staged] = field(default_factory=list)
+    # Directories created for new files, removed again on rollback.
+    created_dirs: List[str] = field(default_factory=list)
+
+    def dump(self) -> Dict:
+        return {
+            "pid": os.getpid(),
+            "entries": [
+                {"target": s.target, "temp": s.temp, "backup": s.backup}
+                for s in self.entries
+            ],
+            "created_dirs": self.created_dirs,
+        }
+
+
+def _fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # Not supported on every platform.
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _sibling(target: str, kind: str) -> str:
+    directory, name = os.path.split(target)
+    return os.path.join(directory, f".{name}.{secrets.token_hex(4)}.{kind}")
+
+
+def _remove_quietly(path: Optional[str]) -> None:
+    if path:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class FileTransaction:
+    """
+    Stages writes and removals, then applies all of them or none.
+
+    Use as a context manager: the staged changes are committed when the block
+    exits normally and discarded when it raises. write() and remove() may be
+    called from several threads at once.
+    """
+
+    def __init__(
+        self, durability: Optional[str] = None, journal_dir: Optional[str] = None
+    ):
+        self.durability = durability or durability_level()
+        if self.durability not in DURABILITY_LEVELS:
+            raise ValueError(f"unknown durability level '{self.durability}'")
+        self.journal_dir = os.path.abspath(journal_dir or JOURNAL_DIR)
+        # Staged changes by the path they were requested under.
+        self._staged: Dict[str, _Staged] = {}
+        self._created_dirs: List[str] = []
+        self._done = False
+        # Changes may be staged from several threads at once.
+        self._lock = threading.Lock()
+        recover(self.journal_dir)
+
+    def __enter__(self) -> "FileTransaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def write(self, path: str, content: str) -> None:
+        """Stage content as the new text of path."""
+        self.write_bytes(path, content.encode("utf-8"))
+
+    def write_bytes(self, path: str, data: bytes) -> None:
+        with self._lock:
+            self._check_open()
+            self._unstage(path)
+            target = self._target(path)
+            self._make_dirs(os.path.dirname(target))
+            temp = _sibling(target, "tmp")
+            # Created with the default mode (subject to the umask), like open().
+            fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            self._staged[path] = _Staged(target, data, temp=temp)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if os.path.exists(target):
+                shutil.copymode(target, temp)
+            if self.durability != "none":
+                f.flush()
+                os.fsync(f.fileno())
+
+    def remove(self, path: str) -> None:
+        """Stage the removal of path; removing a missing file does nothing."""
+        with self._lock:
+            self._check_open()
+            self._unstage(path)
+            # A symlink is removed itself, not the file it points to.
+            self._staged[path] = _Staged(os.path.abspath(path), None)
+
+    def commit(self) -> None:
+        """Apply every staged change, or roll all of them back and raise."""
+        self._check_open()
+        self._done = True
+        journal = _Journal(created_dirs=self._created_dirs)
+        journal_path = None
+        try:
+            for staged in self._staged.values():
+                if os.path.lexists(staged.target):
+                    staged.backup = _sibling(staged.target, "bak")
+                    try:
+                        os.link(staged.target, staged.backup)
+                    except OSError:
+                        shutil.copy2(staged.target, staged.backup)
+                journal.entries.append(staged)
+            journal_path = self._write_journal(journal)
+
+            directories = set()
+            for staged in journal.entries:
+                if staged.data is not None:
+                    os.replace(staged.temp, staged.target)
+                elif staged.backup:
+                    os.unlink(staged.target)
+                directories.add(os.path.dirname(staged.target))
+            if self.durability == "full":
+                for directory in directories:
+                    _fsync_dir(directory)
+        except BaseException:
+            _roll_back(journal)
+            _remove_quietly(journal_path)
+            raise
+
+        # Committed.
+        os.unlink(journal_path)
+        if self.durability == "full":
+            _fsync_dir(self.journal_dir)
+        for path, staged in self._staged.items():
+            _remove_quietly(staged.backup)
+            if staged.data is None:
+                content_cache.invalidate(path)
+            else:
+                content_cache.store(path, staged.data)
+
+    def discard(self) -> None:
+        """Drop every staged change; the files on disk are left untouched."""
+        if self._done:
+            return
+        self._done = True
+        _roll_back(_Journal(list(self._staged.values()), self._created_dirs))
+
+    def _check_open(self) -> None:
+        if self._done:
+            raise RuntimeError("the transaction has already finished")
+
+    def _unstage(self, path: str) -> None:
+        staged = self._staged.pop(path, None)
+        if staged is not None:
+            _remove_quietly(staged.temp)
+
+    def _target(self, path: str) -> str:
+        if os.path.lexists(path):
+            # Write through symlinks, as open() would.
+            return os.path.realpath(path)
+        return os.path.abspath(path)
+
+    def _make_dirs(self, directory: str) -> None:
+        missing = []
+        while directory and not os.path.isdir(directory):
+            missing.append(directory)
+            directory = os.path.dirname(directory)
+        for directory in reversed(missing):
+            os.mkdir(directory)
+            self._created_dirs.append(directory)
+
+    def _write_journal(self, journal: _Journal) -> str:
+        os.makedirs(self.journal_dir, exist_ok=True)
+        path = os.path.join(self.journal_dir, f"{os.getpid()}-{next(_ids)}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(journal.dump(), f)
+            if self.durability != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        if self.durability != "none":
+            # Every temp file, backup and the journal are on disk before any
+            # target is touched.
+            for directory in {os.path.dirname(s.target) for s in journal.entries}:
+                _fsync_dir(directory)
+            _fsync_dir(self.journal_dir)
+        return path
+
+
+def _same_file(a: str, b: str) -> bool:
+    try:
+        sa, sb = os.lstat(a), os.lstat(b)
+    except OSError:
+        return False
+    return (sa.st_dev, sa.st_ino) == (sb.st_dev, sb.st_ino)
+
+
+def _roll_back(journal: _Journal) -> None:
+    """Put back every target of journal as it was before it began."""
+    for staged in reversed(journal.entries):
+        if staged.backup:
+            if _same_file(staged.backup, staged.target):
+                # Never replaced; renaming one link over another of the same
+                # file would leave both in place.
+                os.unlink(staged.backup)
+            elif os.path.lexists(staged.backup):
+                os.replace(staged.backup, staged.target)
+        elif staged.data is not None and staged.temp:
+            # A new file: gone unless its temp file was already renamed.
+            if not os.path.lexists(staged.temp):
+                _remove_quietly(staged.target)
+        _remove_quietly(staged.temp)
+        content_cache.invalidate(staged.target)
+    for directory in reversed(journal.created_dirs):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+
+def _alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:  # Exists, but belongs to someone else.
+        return True
+    return True
+
+
+def recover(journal_dir: str = JOURNAL_DIR) -> List[str]:
+    """
+    Roll back the transactions whose process died before committing them;
+    returns the journals rolled back.
+    """
+    try:
+        names = sorted(os.listdir(journal_dir))
+    except OSError:
+        return []
+    recovered = []
+    for name in names:
+        path = os.path.join(journal_dir, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if _alive(data.get("pid", 0)):
+            continue
+        entries = [
+            _Staged(e["target"], b"" if e["temp"] else None, e["temp"], e["backup"])
+            for e in data.get("entries", [])
+        ]
+        _roll_back(_Journal(entries, data.get("created_dirs", [])))
+        _remove_quietly(path)
+        recovered.append(path)
+    return recovered
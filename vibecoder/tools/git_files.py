@@ -0,0 +1,130 @@
+"""
+Files tracked by git, read from the repository's index.
+
+`git ls-files` runs once per repository and its output is kept until the
+index file changes. Git rewrites the index (by renaming a new file over it)
+on every add, commit, checkout or reset, so its inode, mtime and size are
+enough to tell when the list is stale. Listing tracked files this way never
+enters untracked or ignored trees such as node_modules, build output or
+virtualenvs.
+"""
+
+import os
+import subprocess
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Mode of a submodule entry; its path is a directory, not a file.
+GITLINK_MODE = "160000"
+
+# Repository root -> (index stat, tracked paths in walk order).
+_cache: Dict[str, Tuple[Optional[Tuple[int, int, int]], List[str]]] = {}
+_lock = threading.Lock()
+
+
+def repository(path: str) -> Optional[Tuple[str, str]]:
+    """(work tree root, index file) of the repository containing path, if any."""
+    current = os.path.abspath(path)
+    while True:
+        dotgit = os.path.join(current, ".git")
+        if os.path.isdir(dotgit):
+            return current, os.path.join(dotgit, "index")
+        if os.path.isfile(dotgit):
+            # Worktrees and submodules: .git is a file naming the git dir.
+            try:
+                with open(dotgit, "r") as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if not line.startswith("gitdir:"):
+                return None
+            git_dir = os.path.join(current, line[len("gitdir:") :].strip())
+            return current, os.path.join(git_dir, "index")
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _walk_key(path: str):
+    # The order the tools walk a tree in: a directory's files by name, then
+    # its subdirectories by name.
+    parts = path.split("/")
+    return [(1, part) for part in parts[:-1]] + [(0, parts[-1])]
+
+
+def _ls_files(root: str) -> Optional[List[str]]:
+    try:
+        result = subprocess.run(
+            ["git", "-C", root, "ls-files", "--stage", "-z"],
+            capture_output=True,
+            check=True,
+            timeout=60,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    paths = set()
+    for record in result.stdout.decode("utf-8", errors="surrogateescape").split("\0"):
+        if not record:
+            continue
+        info, _, path = record.partition("\t")
+        if info.split(" ", 1)[0] != GITLINK_MODE:
+            # Unmerged files have one entry per stage.
+            paths.add(path)
+    return sorted(paths, key=_walk_key)
+
+
+def _index_stat(index: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(index)
+    except OSError:
+        # A repository with nothing staged yet has no index.
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def tracked_files(path: str) -> Optional[List[str]]:
+    """
+    The files git tracks under directory path, joined onto path, in walk
+    order; None if path is not inside a git work tree or git cannot run.
+    Files deleted from the work tree but not from the index are included.
+    """
+    repo = repository(path)
+    if repo is None:
+        return None
+    root, index = repo
+    stat = _index_stat(index)
+    with _lock:
+        cached = _cache.get(root)
+    if cached is None or cached[0] != stat:
+        files = _ls_files(root)
+        if files is None:
+            return None
+        cached = (stat, files)
+        with _lock:
+            _cache[root] = cached
+
+    rel = os.path.relpath(os.path.abspath(path), root)
+    prefix = "" if rel == "." else rel.replace(os.sep, "/") + "/"
+    return [
+        os.path.join(path, f[len(prefix) :]) for f in cached[1] if f.startswith(prefix)
+    ]
+
+
+def index_file(path: str) -> Optional[str]:
+    """The index file listing what is tracked under path, if it is in a repository."""
+    repo = repository(path)
+    return repo[1] if repo else None
+
+
+def common_dir(git_dir: str) -> str:
+    """
+    The directory holding the refs of the repository whose git dir is given.
+    A linked worktree keeps its HEAD and index in its own git dir and shares
+    the refs of the main one, named by its commondir file.
+    """
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r") as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
@@ -1,8 +1,9 @@
 import asyncio
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from vibecoder.messages import ToolResult, ToolUse
+from vibecoder.tools import git_files
 from vibecoder.tools.base import Tool
 
 PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
@@ -10,11 +11,13 @@ PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
 
 class GitTool(Tool):
     name = "git_tool"
+    prompt_file = "git_tool.md"
     supported_commands = ["status", "log", "diff", "show", "grep", "checkout"]
+    mutating_commands = ["checkout"]
 
     @property
     def prompt_description(self) -> str:
-        path = os.path.join(PROMPT_DIR, "git_tool.md")
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
         with open(path, "r") as f:
             return f.read().strip()
 
@@ -48,6 +51,37 @@ class GitTool(Tool):
             },
         }
 
+    def is_read_only(self, args: Dict) -> bool:
+        return args.get("command") not in self.mutating_commands
+
+    def touched_paths(self, args: Dict) -> Optional[List[str]]:
+        # Without explicit paths, git commands see (or reset) the whole tree.
+        return list(args["paths"]) if args.get("paths") else None
+
+    def cache_paths(self, args: Dict) -> Optional[List[str]]:
+        command = args.get("command")
+        if command not in ("log", "show", "status", "diff", "grep"):
+            return None
+        # The git dir is found the way git finds it, so that this works from
+        # subdirectories and linked worktrees; outside a repository nothing is
+        # cached.
+        repo = git_files.repository(".")
+        if repo is None:
+            return None
+        root, index = repo
+        git_dir = os.path.dirname(index)
+        common_dir = git_files.common_dir(git_dir)
+        repo_state = [
+            os.path.join(git_dir, "HEAD"),
+            os.path.join(common_dir, "packed-refs"),
+            os.path.join(common_dir, "refs"),
+        ]
+        if command in ("log", "show"):
+            return repo_state
+        # Without paths, status and diff report on the whole work tree.
+        worktree = self.touched_paths(args) or [root]
+        return worktree + [index] + repo_state
+
     async def run_helper(self, args: Dict) -> str:
         command = args.get("command")
         if command not in self.supported_commands:
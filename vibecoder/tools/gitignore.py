@@ -0,0 +1,149 @@
+"""
+Minimal .gitignore matching for the tools that walk the workspace.
+
+Supports the common syntax: comments, negation with "!", directory-only
+patterns ending in "/", patterns anchored by a leading or inner "/", and the
+wildcards "*", "?", "[...]" and "**".
+"""
+
+import os
+import re
+from typing import List, Optional, Tuple
+
+
+def _translate(pattern: str) -> str:
+    """Regex for a gitignore glob, matched against "/"-separated paths."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """The patterns of one ignore file, relative to the directory holding it."""
+
+    def __init__(self, base: str, lines: List[str]):
+        self.base = base
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            line = line.lstrip("/")
+            regex = _translate(line)
+            if not anchored:
+                regex = "(?:.*/)?" + regex
+            self.rules.append((re.compile(regex + r"\Z"), negate, dir_only))
+
+    @classmethod
+    def load(cls, path: str, base: Optional[str] = None) -> Optional["IgnoreRules"]:
+        try:
+            with open(path, "r", errors="replace") as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+        rules = cls(base or os.path.dirname(path), lines)
+        return rules if rules.rules else None
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included, None if no rule applies."""
+        relative = os.path.relpath(path, self.base)
+        if relative.startswith(".."):
+            return None
+        relative = relative.replace(os.sep, "/")
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relative):
+                result = not negate
+        return result
+
+
+class IgnoreStack:
+    """The ignore files that apply at some depth of a directory walk."""
+
+    def __init__(self, rules: Tuple[IgnoreRules, ...] = ()):
+        self.rules = rules
+
+    @classmethod
+    def for_directory(cls, directory: str) -> "IgnoreStack":
+        """Rules from directory and its ancestors up to the enclosing repository."""
+        directory = os.path.abspath(directory)
+        chain = []
+        current = directory
+        while True:
+            chain.append(current)
+            if os.path.isdir(os.path.join(current, ".git")):
+                break
+            parent = os.path.dirname(current)
+            if parent == current:
+                # Not inside a repository: only the directory's own rules apply.
+                chain = [directory]
+                break
+            current = parent
+        stack = cls()
+        root = chain[-1]
+        exclude = IgnoreRules.load(os.path.join(root, ".git", "info", "exclude"), root)
+        if exclude:
+            stack = stack.push(exclude)
+        for path in reversed(chain):
+            stack = stack.enter(path)
+        return stack
+
+    def enter(self, directory: str) -> "IgnoreStack":
+        """The stack for the contents of directory, adding its .gitignore."""
+        rules = IgnoreRules.load(os.path.join(directory, ".gitignore"))
+        return self.push(rules) if rules else self
+
+    def push(self, rules: IgnoreRules) -> "IgnoreStack":
+        return IgnoreStack(self.rules + (rules,))
+
+    def ignored(self, path: str, is_dir: bool) -> bool:
+        # Deeper files override shallower ones, later lines earlier ones.
+        for rules in reversed(self.rules):
+            result = rules.match(path, is_dir)
+            if result is not None:
+                return result
+        return False
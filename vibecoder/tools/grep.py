@@ -1,22 +1,30 @@
+import asyncio
 import os
-import shlex
-import subprocess
-from typing import Dict
+import re
+from typing import Dict, List, Optional, Tuple
 
+from vibecoder import workspace
 from vibecoder.messages import ToolResult, ToolUse
 
+from . import git_files, grep_engine, trigram_index
 from .base import Tool
 
 PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
-description_path = os.path.join(PROMPT_DIR, "grep.md")
+
+# Matching lines (or files, when counting) returned per call unless the
+# caller asks for another page size.
+DEFAULT_MAX_RESULTS = 200
 
 
 class GrepTool(Tool):
     name = "grep"
+    prompt_file = "grep.md"
+    read_only = True
 
     @property
     def prompt_description(self) -> str:
-        with open(description_path, "r") as f:
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
+        with open(path, "r") as f:
             return f.read().strip()
 
     @property
@@ -41,12 +49,32 @@ class GrepTool(Tool):
                         },
                         "include_pattern": {"type": "string", "default": None},
                         "ignore_case": {"type": "boolean", "default": False},
+                        "max_results": {
+                            "type": "integer",
+                            "default": DEFAULT_MAX_RESULTS,
+                        },
+                        "max_per_file": {"type": "integer", "default": None},
+                        "before_context": {"type": "integer", "default": 0},
+                        "after_context": {"type": "integer", "default": 0},
+                        "count": {"type": "boolean", "default": False},
+                        "cursor": {"type": "integer", "default": 0},
+                        "tracked_only": {"type": "boolean", "default": False},
                     },
                     "required": ["pattern", "paths"],
                 },
             },
         }
 
+    def touched_paths(self, args: Dict) -> Optional[List[str]]:
+        return list(args.get("paths") or [])
+
+    def cache_paths(self, args: Dict) -> Optional[List[str]]:
+        paths = self.touched_paths(args)
+        if args.get("tracked_only"):
+            # Staging a file changes what is searched without touching it.
+            paths += sorted({git_files.index_file(p) for p in paths} - {None})
+        return paths
+
     async def run_helper(self, args: Dict) -> str:
         if "pattern" not in args:
             return "[Error in call to grep] `pattern` is required"
@@ -58,6 +86,15 @@ class GrepTool(Tool):
         ignore_patterns = args.get("ignore_patterns", [])
         include_pattern = args.get("include_pattern")
         ignore_case = args.get("ignore_case", False)
+        count = bool(args.get("count", False))
+        try:
+            max_results = _int_arg(args, "max_results", DEFAULT_MAX_RESULTS, 1)
+            max_per_file = _int_arg(args, "max_per_file", None, 1)
+            before = _int_arg(args, "before_context", 0, 0)
+            after = _int_arg(args, "after_context", 0, 0)
+            cursor = _int_arg(args, "cursor", 0, 0)
+        except ValueError as e:
+            return f"[Error in call to grep] {e}"
 
         # Validate and sanitize inputs
         safe_paths = []
@@ -66,31 +103,97 @@ class GrepTool(Tool):
                 raise ValueError(f"Unsafe absolute path traversal: {p}")
             if ".." in p:
                 raise ValueError(f"Unsafe relative path traversal: {p}")
-            safe_paths.append(shlex.quote(p.rstrip("/")))
+            safe_paths.append(p.rstrip("/") or "/")
 
         if not safe_paths:
             return "[Error: No valid paths provided!]"
 
-        # Prepare the grep command
-        cmd = ["grep", "-r"]
-        if ignore_case:
-            cmd.append("-i")
-        if include_pattern:
-            cmd.extend(["--include", shlex.quote(include_pattern)])
-        if ignore_patterns:
-            for ip in ignore_patterns:
-                cmd.append(f"--exclude={shlex.quote(ip)}")
-
-        # Add the search pattern and paths
-        cmd.append(shlex.quote(pattern))
-        cmd.extend(safe_paths)
-
-        # Execute the command
-        result = subprocess.run(
-            " ".join(cmd), shell=True, capture_output=True, text=True
+        note = ""
+        try:
+            regex = grep_engine.compile_pattern(pattern, ignore_case)
+        except re.error:
+            # Usually grep's basic syntax, e.g. an unescaped "(": search for
+            # the text itself rather than failing the call.
+            regex = grep_engine.compile_pattern(re.escape(pattern), ignore_case)
+            note = "[Pattern is not a valid regex; searched for it literally]\n"
+
+        options = grep_engine.SearchOptions(
+            include_pattern=include_pattern,
+            ignore_patterns=tuple(ignore_patterns or ()),
+            max_count=max_per_file,
+            before=0 if count else before,
+            after=0 if count else after,
+            tracked_only=bool(args.get("tracked_only", False)),
+        )
+        page = Page(cursor, max_results, count)
+        # The search blocks, so keep it off the event loop.
+        return note + await asyncio.to_thread(
+            self._search, safe_paths, regex, options, page
+        )
+
+    @staticmethod
+    def _in_workspace(paths: List[str]) -> bool:
+        root = os.getcwd()
+        for p in paths:
+            rel = os.path.relpath(os.path.abspath(p), root)
+            if not rel.startswith(".."):
+                return True
+        return False
+
+    @staticmethod
+    def _index_enabled() -> bool:
+        setting = os.getenv("VIBECODER_GREP_INDEX", "").lower()
+        return setting not in {"0", "off", "false"}
+
+    def _index(self, paths: List[str]) -> Optional[trigram_index.TrigramIndex]:
+        """The workspace's trigram index, if it covers any of the paths."""
+        if self._index_enabled() and self._in_workspace(paths):
+            return trigram_index.manager.index_for(os.getcwd())
+        return None
+
+    def _search(self, paths: List[str], regex, options, page: "Page") -> str:
+        missing = [p for p in paths if not os.path.exists(p)]
+        existing = [p for p in paths if p not in missing]
+        # Like grep, a single file is reported without its name.
+        with_names = len(paths) > 1 or any(os.path.isdir(p) for p in existing)
+
+        stale = set()
+        index = self._index(existing)
+        file_filter = index.file_filter(regex, stale) if index else None
+
+        snapshot = (
+            workspace.snapshot_for(os.getcwd())
+            if self._in_workspace(existing)
+            else None
+        )
+        results = grep_engine.search(
+            existing, regex, options, file_filter=file_filter, snapshot=snapshot
         )
+        try:
+            for matches in results:
+                if not page.add(matches):
+                    break
+        finally:
+            results.close()
 
-        return result.stdout if result.returncode in (0, 1) else result.stderr
+        output = page.render(with_names, options)
+        if page.cursor == 0:
+            for p in missing:
+                output.append(f"grep: {p}: No such file or directory")
+        if page.cursor and not page.files:
+            output.append(f"[No results past cursor={page.cursor}]")
+        if page.more:
+            unit = "files" if page.count else "matches"
+            output.append(
+                f"[Showing {unit} {page.cursor + 1}-{page.cursor + page.limit}; "
+                f"call grep again with cursor={page.cursor + page.limit} for more]"
+            )
+        if stale:
+            trigram_index.manager.refresh(index.root)
+        elif index is None and self._index_enabled() and self._in_workspace(existing):
+            # Not indexed (yet): re-check whether the workspace is large enough.
+            trigram_index.manager.refresh(os.getcwd())
+        return "".join(line + "\n" for line in output)
 
     async def run(self, tool_use: ToolUse) -> ToolResult:
         result_str = await self.run_helper(tool_use.arguments)
@@ -99,3 +202,89 @@ class GrepTool(Tool):
             tool_name=self.name,
             tool_call_id=tool_use.tool_call_id,
         )
+
+
+def _int_arg(args: Dict, name: str, default: Optional[int], minimum: int):
+    value = args.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = None
+    if value is None or value < minimum:
+        raise ValueError(f"`{name}` must be an integer >= {minimum}")
+    return value
+
+
+class Page:
+    """
+    One page of grep results: the matches (or files, when counting) from
+    cursor to cursor + limit in walk order. The search runs until one result
+    past the page has been seen, which tells whether another page exists.
+    """
+
+    def __init__(self, cursor: int, limit: int, count: bool = False):
+        self.cursor = cursor
+        self.limit = limit
+        self.count = count
+        self.seen = 0
+        self.more = False
+        # (file, index of its first match on the page, end of its matches)
+        self.files: List[Tuple[grep_engine.FileMatches, int, int]] = []
+
+    def add(self, matches: grep_engine.FileMatches) -> bool:
+        """Take a file's matches; False once the page is full."""
+        units = 1 if self.count else len(matches.lines)
+        start, end = self.seen, self.seen + units
+        self.seen = end
+        lo = max(start, self.cursor) - start
+        hi = min(end, self.cursor + self.limit) - start
+        if lo < hi:
+            self.files.append((matches, lo, hi))
+        if end > self.cursor + self.limit:
+            self.more = True
+            return False
+        return True
+
+    def render(self, with_names: bool, options) -> List[str]:
+        output = []
+        for matches, lo, hi in self.files:
+            prefix = f"{matches.path}:" if with_names else ""
+            if self.count:
+                output.append(f"{prefix}{len(matches.lines)}")
+            elif not matches.numbers:
+                output.extend(prefix + line for line in matches.lines[lo:hi])
+            else:
+                if output:
+                    output.append("--")
+                output.extend(_with_context(matches, lo, hi, with_names, options))
+        return output
+
+
+def _with_context(matches, lo: int, hi: int, with_names: bool, options) -> List[str]:
+    """
+    Matches lo:hi of a file with their context lines, formatted like grep -C:
+    "path:line" for matches, "path-line" for context, "--" between groups.
+    """
+    matching = dict(zip(matches.numbers, matches.lines))
+    wanted = []
+    for number in matches.numbers[lo:hi]:
+        for n in range(number - options.before, number + options.after + 1):
+            if (n in matching or n in matches.context) and (
+                not wanted or n > wanted[-1]
+            ):
+                wanted.append(n)
+    output = []
+    previous = None
+    for n in wanted:
+        if previous is not None and n != previous + 1:
+            output.append("--")
+        if n in matching:
+            prefix = f"{matches.path}:" if with_names else ""
+            output.append(prefix + matching[n])
+        else:
+            prefix = f"{matches.path}-" if with_names else ""
+            output.append(prefix + matches.context[n])
+        previous = n
+    return output
@@ -0,0 +1,272 @@
+"""
+In-process recursive search used by the grep tool.
+
+The pattern is compiled once as a bytes regex and run over the raw bytes of
+each file (through mmap for large files), so only matching lines are ever
+decoded. Files are found with os.scandir, skipping .git, anything matched by
+.gitignore and binary files, or read from the git index when only tracked
+files are wanted. They are searched concurrently in a thread pool in small
+batches. The regex engine holds the GIL, but file I/O overlaps across
+threads. Results are streamed back per file in walk order, and a consumer that
+stops early stops the search.
+"""
+
+import fnmatch
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from vibecoder.tools import content_cache, git_files
+from vibecoder.tools.gitignore import IgnoreStack
+from vibecoder.workspace import WorkspaceSnapshot
+
+# Like grep, a NUL byte near the start of a file marks it as binary.
+BINARY_SNIFF_BYTES = 8192
+# Smaller files are cheaper to read() than to map.
+MMAP_THRESHOLD = 1024 * 1024
+# Files per thread pool task; one task per file costs more than most searches.
+BATCH_SIZE = 32
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        workers = min(32, (os.cpu_count() or 1) + 4)
+        _executor = ThreadPoolExecutor(workers, thread_name_prefix="grep")
+    return _executor
+
+
+@dataclass
+class FileMatches:
+    path: str
+    lines: List[str] = field(default_factory=list)
+    # Only filled in when context lines are requested: the 1-based number of
+    # each matching line, and the text of the lines around them by number.
+    numbers: List[int] = field(default_factory=list)
+    context: Dict[int, str] = field(default_factory=dict)
+
+
+@dataclass
+class SearchOptions:
+    include_pattern: Optional[str] = None
+    ignore_patterns: Sequence[str] = ()
+    # Stop reading a file after this many matching lines, like grep -m.
+    max_count: Optional[int] = None
+    before: int = 0
+    after: int = 0
+    # List directories from the git index instead of walking them.
+    tracked_only: bool = False
+
+
+def compile_pattern(pattern: str, ignore_case: bool = False) -> re.Pattern:
+    """Compile a search pattern; raises re.error if it is invalid."""
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    return re.compile(pattern.encode("utf-8"), flags)
+
+
+def _excluded(path: str, options: SearchOptions) -> bool:
+    name = os.path.basename(path)
+    for pattern in options.ignore_patterns:
+        if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(path, pattern):
+            return True
+    if options.include_pattern and not fnmatch.fnmatch(name, options.include_pattern):
+        return True
+    return False
+
+
+def walk_files(
+    root: str, options: SearchOptions, snapshot: Optional[WorkspaceSnapshot] = None
+) -> Iterator[str]:
+    """
+    Files under root in sorted order, honouring .gitignore and the filters.
+
+    When root lies in the workspace of snapshot, the file list comes from the
+    snapshot instead of the disk. With options.tracked_only, it comes from the
+    git index: tracked files, ignored or not, and nothing untracked.
+    """
+    if not os.path.isdir(root):
+        # Files named explicitly are searched even if ignored, like grep does.
+        if not _excluded(root, options):
+            yield root
+        return
+    tracked = git_files.tracked_files(root) if options.tracked_only else None
+    if tracked is not None:
+        for path in tracked:
+            if not _excluded(path, options):
+                yield path
+        return
+    rel = snapshot.relpath(root) if snapshot is not None else None
+    directory = snapshot.directory(rel) if rel is not None else None
+    # An ignored directory named explicitly is still searched, from disk.
+    if directory is not None:
+        for path, _ in snapshot.files(rel):
+            path = os.path.join(root, os.path.relpath(path, rel) if rel else path)
+            if not _excluded(path, options):
+                yield path
+        return
+    stack = [(root, IgnoreStack.for_directory(root))]
+    while stack:
+        directory, ignores = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            # As with grep -r, symlinks found while recursing are not followed.
+            if entry.is_symlink():
+                continue
+            if entry.is_dir():
+                if entry.name == ".git" or ignores.ignored(entry.path, True):
+                    continue
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                if ignores.ignored(entry.path, False) or _excluded(entry.path, options):
+                    continue
+                yield entry.path
+        for subdir in reversed(subdirs):
+            stack.append((subdir, ignores.enter(subdir)))
+
+
+def search_file(
+    path: str, regex: re.Pattern, options: SearchOptions = SearchOptions()
+) -> Optional[FileMatches]:
+    """Matches in one file; None for binary or unreadable files."""
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return FileMatches(path)
+        if size < MMAP_THRESHOLD:
+            return _search_buffer(path, content_cache.read(path), regex, options)
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _search_buffer(path, data, regex, options)
+    except (OSError, ValueError):
+        return None
+
+
+def _search_buffer(
+    path: str, data, regex: re.Pattern, options: SearchOptions
+) -> Optional[FileMatches]:
+    if data.find(b"\0", 0, BINARY_SNIFF_BYTES) != -1:
+        return None
+    return _matching_lines(FileMatches(path), data, regex, len(data), options)
+
+
+def _search_batch(
+    paths: List[str], regex: re.Pattern, options: SearchOptions
+) -> List[Optional[FileMatches]]:
+    return [search_file(path, regex, options) for path in paths]
+
+
+def _decode(line) -> str:
+    return line.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def _matching_lines(
+    result: FileMatches, data, regex: re.Pattern, size: int, options: SearchOptions
+) -> FileMatches:
+    with_context = options.before > 0 or options.after > 0
+    number = 1
+    counted = 0
+    pos = 0
+    while pos < size:
+        if options.max_count is not None and len(result.lines) >= options.max_count:
+            break
+        match = regex.search(data, pos)
+        if match is None:
+            break
+        if match.start() == size and data[size - 1 : size] == b"\n":
+            # The empty string after a final newline is not a line.
+            break
+        start = data.rfind(b"\n", 0, match.start()) + 1
+        end = data.find(b"\n", match.start())
+        if end == -1:
+            end = size
+        line = data[start:end]
+        # A match may run past the end of its line; grep only matches within
+        # single lines, so check the line on its own.
+        if match.end() <= end or regex.search(line):
+            result.lines.append(_decode(line))
+            if with_context:
+                number += data.count(b"\n", counted, start)
+                counted = start
+                result.numbers.append(number)
+                _add_context(result, data, start, end, number, options)
+        pos = end + 1
+    return result
+
+
+def _add_context(
+    result: FileMatches, data, start: int, end: int, number: int, options
+) -> None:
+    """Record up to options.before/after lines around the line start:end."""
+    for i in range(1, options.before + 1):
+        if start == 0:
+            break
+        prev = data.rfind(b"\n", 0, start - 1) + 1
+        result.context.setdefault(number - i, _decode(data[prev : start - 1]))
+        start = prev
+    size = len(data)
+    for i in range(1, options.after + 1):
+        if end >= size - 1:
+            break
+        nxt = data.find(b"\n", end + 1)
+        if nxt == -1:
+            nxt = size
+        result.context.setdefault(number + i, _decode(data[end + 1 : nxt]))
+        end = nxt
+
+
+def search(
+    paths: Sequence[str],
+    regex: re.Pattern,
+    options: SearchOptions = SearchOptions(),
+    window: int = 16,
+    file_filter: Optional[Callable[[str], bool]] = None,
+    snapshot: Optional[WorkspaceSnapshot] = None,
+) -> Iterator[FileMatches]:
+    """
+    Search every file under paths, yielding files with matches in walk order.
+
+    At most `window` batches are in flight at once, so results start flowing
+    before the walk finishes and memory stays bounded on huge trees. Files
+    for which file_filter returns False are skipped without being opened.
+    Closing the generator cancels the batches that have not started yet.
+    """
+    pool = executor()
+    pending = deque()
+    batch: List[str] = []
+
+    def submit():
+        pending.append(pool.submit(_search_batch, batch, regex, options))
+
+    def drain(limit: int):
+        while len(pending) > limit:
+            for matches in pending.popleft().result():
+                if matches is not None and matches.lines:
+                    yield matches
+
+    try:
+        for root in paths:
+            for path in walk_files(root, options, snapshot):
+                if file_filter is not None and not file_filter(path):
+                    continue
+                batch.append(path)
+                if len(batch) >= BATCH_SIZE:
+                    submit()
+                    batch = []
+                    yield from drain(window)
+        if batch:
+            submit()
+        yield from drain(0)
+    finally:
+        for future in pending:
+            future.cancel()
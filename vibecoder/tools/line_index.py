@@ -0,0 +1,152 @@
+"""
+Sparse line-offset index for reading line ranges of large files.
+
+Building an index maps the file and records the byte offset of every STRIDE-th
+line, one pass over the file that keeps 8 bytes per STRIDE lines. Reading lines
+start..end then jumps to the recorded line at or before start and scans at most
+STRIDE lines to reach it, so a range read costs O(STRIDE + range) however big
+the file is. Indexes are kept in memory per path and are only reused while the
+file's device, inode, mtime and size are unchanged.
+
+Lines end at "\\n", "\\r\\n" or a lone "\\r", all read back as "\\n", as a file
+opened in text mode (and content_cache.read_text) reads them, so a file splits
+into the same lines whichever way it is read. They are decoded as UTF-8, with
+undecodable bytes replaced.
+"""
+
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+import numpy as np
+
+# Every STRIDE-th line start is recorded.
+STRIDE = 1024
+# Bytes scanned for newlines at a time while building.
+CHUNK = 16 * 1024 * 1024
+# Indexes kept in memory, least recently used dropped first.
+MAX_INDEXES = 32
+
+FileKey = Tuple[int, int, int, int]
+
+_LINE_END = re.compile(rb"\r\n?|\n")
+
+_cache: "OrderedDict[str, LineIndex]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _file_key(st: os.stat_result) -> FileKey:
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class LineIndex:
+    """Line count and sparse line offsets of one version of a file."""
+
+    def __init__(
+        self, path: str, key: FileKey, offsets: np.ndarray, count: int, has_cr: bool
+    ):
+        self.path = path
+        self.key = key
+        # offsets[i] is the byte offset of line i * STRIDE.
+        self.offsets = offsets
+        self.count = count
+        # Without any "\r", lines can be found with a plain find("\n").
+        self.has_cr = has_cr
+
+    def _line_end(self, data: mmap.mmap, pos: int) -> int:
+        """Offset just past the end of the line at pos, or -1 at the end."""
+        if not self.has_cr:
+            found = data.find(b"\n", pos)
+            return -1 if found == -1 else found + 1
+        match = _LINE_END.search(data, pos)
+        return -1 if match is None else match.end()
+
+    @classmethod
+    def build(cls, path: str) -> "LineIndex":
+        with open(path, "rb") as f:
+            key = _file_key(os.fstat(f.fileno()))
+            size = key[3]
+            if size == 0:
+                return cls(path, key, np.zeros(1, dtype=np.int64), 0, False)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                offsets = [np.zeros(1, dtype=np.int64)]
+                newlines = 0
+                has_cr = False
+                view = np.frombuffer(data, dtype=np.uint8)
+                try:
+                    for base in range(0, size, CHUNK):
+                        chunk = view[base : base + CHUNK]
+                        ends = chunk == 10
+                        if data.find(b"\r", base, base + CHUNK) != -1:
+                            has_cr = True
+                            # A "\r" ends a line unless a "\n" follows it.
+                            lone_cr = chunk == 13
+                            following = view[base + 1 : base + 1 + len(chunk)] == 10
+                            lone_cr[: len(following)] &= ~following
+                            ends |= lone_cr
+                            del lone_cr, following
+                        found = np.flatnonzero(ends)
+                        # The line after line end j of this chunk is line
+                        # newlines + j + 1; keep those that are multiples of STRIDE.
+                        first = -(newlines + 1) % STRIDE
+                        offsets.append(found[first::STRIDE].astype(np.int64) + base + 1)
+                        newlines += len(found)
+                        del chunk, ends, found
+                    ends_with_newline = view[-1] in (10, 13)
+                finally:
+                    # The map cannot close while numpy still holds a view of it.
+                    del view
+        count = newlines + (0 if ends_with_newline else 1)
+        return cls(path, key, np.concatenate(offsets), count, has_cr)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def text(self, start: int, end: int) -> str:
+        """Lines start (inclusive) to end (exclusive), with their line endings."""
+        start, end = max(0, start), min(self.count, end)
+        if start >= end:
+            return ""
+        with open(self.path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            begin = int(self.offsets[start // STRIDE])
+            for _ in range(start % STRIDE):
+                begin = self._line_end(data, begin)
+                if begin == -1:
+                    return ""
+            stop = begin
+            for _ in range(end - start):
+                stop = self._line_end(data, stop)
+                if stop == -1:
+                    stop = len(data)
+                    break
+            raw = data[begin:stop]
+        text = raw.decode("utf-8", errors="replace")
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+
+    def lines(self, start: int, end: int) -> List[str]:
+        """Like text(), as a list of lines."""
+        parts = self.text(start, end).split("\n")
+        return [part + "\n" for part in parts[:-1]] + ([parts[-1]] if parts[-1] else [])
+
+
+def index_for(path: str) -> LineIndex:
+    """The line index of path, built or rebuilt if the file changed."""
+    full = os.path.abspath(path)
+    key = _file_key(os.stat(full))
+    with _lock:
+        index = _cache.get(full)
+        if index is not None and index.key == key:
+            _cache.move_to_end(full)
+            return index
+    index = LineIndex.build(full)
+    with _lock:
+        _cache[full] = index
+        _cache.move_to_end(full)
+        while len(_cache) > MAX_INDEXES:
+            _cache.popitem(last=False)
+    return index
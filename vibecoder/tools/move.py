@@ -1,4 +1,5 @@
 import os
+from typing import List, Optional
 
 from vibecoder.messages import ToolResult, ToolUse
 from vibecoder.tools.base import Tool
@@ -6,7 +7,7 @@ from vibecoder.tools.base import Tool
 
 class MoveTool(Tool):
     def __init__(self):
-        self.name = "move_tool"
+        self.name = "move"
 
     @property
     def signature(self) -> dict:
@@ -35,6 +36,9 @@ class MoveTool(Tool):
     def prompt_description(self) -> str:
         return "Use this tool to move or rename files within the workspace."
 
+    def touched_paths(self, args: dict) -> Optional[List[str]]:
+        return [p for p in (args.get("origin"), args.get("destination")) if p]
+
     async def run_helper(self, args: dict) -> str:
         origin = args.get("origin")
         destination = args.get("destination")
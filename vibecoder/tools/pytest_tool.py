@@ -14,10 +14,11 @@ PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
 
 class PytestTool(Tool):
     name = "pytest"
+    prompt_file = "pytest.md"
 
     @property
     def prompt_description(self) -> str:
-        path = os.path.join(PROMPT_DIR, "pytest.md")
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
         with open(path, "r") as f:
             return f.read().strip()
 
@@ -1,20 +1,68 @@
+import asyncio
+import io
 import os
-from typing import Dict
-
-import aiofiles
+from typing import Dict, List, Optional, Tuple, Union
 
 from vibecoder.messages import ToolResult, ToolUse
+from vibecoder.tools import content_cache, line_index
 from vibecoder.tools.base import Tool
 
 PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
 
+# Files at least this big are read through a line index instead of whole.
+LINE_INDEX_MIN_BYTES = 4 * 1024 * 1024
+
+
+async def read_lines(path: str) -> List[str]:
+    """All lines of a text file, with their line endings."""
+    text = await asyncio.to_thread(content_cache.read_text, path)
+    return io.StringIO(text).readlines()
+
+
+class LoadedLines(list):
+    """The lines of a file read whole."""
+
+    def text(self, start: int, end: int) -> str:
+        return "".join(self[start:end])
+
+    def lines(self, start: int, end: int) -> List[str]:
+        return self[start:end]
+
+
+Lines = Union[LoadedLines, line_index.LineIndex]
+
+
+async def open_lines(path: str) -> Lines:
+    """
+    The lines of a file, supporting len(), text(start, end) and
+    lines(start, end).
+    Large files are not loaded; ranges are read through their line index.
+    """
+    if os.path.getsize(path) < LINE_INDEX_MIN_BYTES:
+        return LoadedLines(await read_lines(path))
+    return await asyncio.to_thread(line_index.index_for, path)
+
+
+def line_bounds(lines: Lines, start, end) -> Tuple[int, int]:
+    """
+    read_file's start (inclusive) and end (exclusive) clamped to the file;
+    raises ValueError if they are not integers.
+    """
+    start = start or 0
+    end = end or len(lines)
+    if not isinstance(start, int) or not isinstance(end, int):
+        raise ValueError("'start' and 'end' must be integers")
+    return max(0, start), min(len(lines), end)
+
 
 class ReadFileTool(Tool):
     name = "read_file"
+    prompt_file = "read_file.md"
+    read_only = True
 
     @property
     def prompt_description(self) -> str:
-        path = os.path.join(PROMPT_DIR, "read_file.md")
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
         with open(path, "r") as f:
             return f.read().strip()
 
@@ -48,6 +96,12 @@ class ReadFileTool(Tool):
             },
         }
 
+    def touched_paths(self, args: Dict) -> Optional[List[str]]:
+        return [args["path"]] if args.get("path") else []
+
+    def cache_paths(self, args: Dict) -> Optional[List[str]]:
+        return self.touched_paths(args)
+
     async def run_helper(self, args: Dict) -> str:
         path = args.get("path")
         start = args.get("start")
@@ -57,20 +111,23 @@ class ReadFileTool(Tool):
             return "[Error: 'path' argument is required]"
 
         try:
-            async with aiofiles.open(path, "r") as f:
-                lines = await f.readlines()
-
-            start = start or 0
-            end = end or len(lines)
+            lines = await open_lines(path)
 
             # Validate and sanitize indices
-            if not isinstance(start, int) or not isinstance(end, int):
-                return "[Error: 'start' and 'end' must be integers]"
-
-            start = max(0, start)
-            end = min(len(lines), end)
-
-            return "".join(lines[start:end])
+            try:
+                start, end = line_bounds(lines, start, end)
+            except ValueError as e:
+                return f"[Error: {e}]"
+
+            text = lines.text(start, end)
+            if start == 0 and end == len(lines):
+                return text
+            # Part of the file: say how much there is to plan further reads.
+            if not text:
+                return f"[No lines in range; the file has {len(lines)} lines]"
+            if not text.endswith("\n"):
+                text += "\n"
+            return text + f"[Showing lines [{start}:{end}] of {len(lines)}]"
 
         except Exception as e:
             return f"[Error reading file '{path}': {e}]"
@@ -0,0 +1,166 @@
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from vibecoder.messages import ToolResult, ToolUse
+
+from . import read_file
+from .base import Tool
+
+PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
+
+# Total size of one result; beyond it the rest is left for another call.
+DEFAULT_MAX_CHARS = 100_000
+
+
+class ReadFilesTool(Tool):
+    name = "read_files"
+    prompt_file = "read_files.md"
+    read_only = True
+
+    @property
+    def prompt_description(self) -> str:
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
+        with open(path, "r") as f:
+            return f.read().strip()
+
+    @property
+    def signature(self) -> Dict:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.prompt_description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "files": {
+                            "type": "array",
+                            "description": "The files, or line ranges of files, to read, in order.",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "path": {"type": "string"},
+                                    "start": {
+                                        "type": "integer",
+                                        "description": "First line to read (inclusive)",
+                                        "minimum": 0,
+                                    },
+                                    "end": {
+                                        "type": "integer",
+                                        "description": "Line to stop at (exclusive)",
+                                        "minimum": 0,
+                                    },
+                                },
+                                "required": ["path"],
+                            },
+                        },
+                        "max_chars": {
+                            "type": "integer",
+                            "default": DEFAULT_MAX_CHARS,
+                        },
+                    },
+                    "required": ["files"],
+                },
+            },
+        }
+
+    def touched_paths(self, args: Dict) -> Optional[List[str]]:
+        files = args.get("files")
+        if not isinstance(files, list):
+            return []
+        return list(
+            dict.fromkeys(
+                f["path"] for f in files if isinstance(f, dict) and f.get("path")
+            )
+        )
+
+    def cache_paths(self, args: Dict) -> Optional[List[str]]:
+        return self.touched_paths(args)
+
+    async def run_helper(self, args: Dict) -> str:
+        files = args.get("files")
+        if not files or not isinstance(files, list):
+            return "[Error in call to read_files] `files` must be a non-empty list"
+        if not all(isinstance(f, dict) and f.get("path") for f in files):
+            return "[Error in call to read_files] every entry in `files` needs a `path`"
+        max_chars = args.get("max_chars") or DEFAULT_MAX_CHARS
+        if not isinstance(max_chars, int) or max_chars < 1:
+            return (
+                "[Error in call to read_files] `max_chars` must be a positive integer"
+            )
+
+        # Each file is read once, all of them at the same time.
+        paths = self.touched_paths(args)
+        results = await asyncio.gather(
+            *(read_file.open_lines(path) for path in paths), return_exceptions=True
+        )
+        contents = dict(zip(paths, results))
+
+        output = []
+        room = max_chars
+        for i, entry in enumerate(files):
+            path = entry["path"]
+            lines = contents[path]
+            start = None
+            if isinstance(lines, Exception):
+                section = [
+                    f"==> {path} <==\n",
+                    f"[Error reading file '{path}': {lines}]\n",
+                ]
+            else:
+                try:
+                    start, end = read_file.line_bounds(
+                        lines, entry.get("start"), entry.get("end")
+                    )
+                except ValueError as e:
+                    section = [f"==> {path} <==\n", f"[Error: {e}]\n"]
+                else:
+                    header = f"==> {path} [{start}:{end}] of {len(lines)} lines <==\n"
+                    # Every line takes at least one character, so no more
+                    # than room lines can fit.
+                    section = [header] + lines.lines(start, min(end, start + room))
+                    if section[-1] and not section[-1].endswith("\n"):
+                        section[-1] += "\n"
+
+            # Sections are separated by a blank line.
+            size = sum(len(part) for part in section) + bool(output)
+            if size > room:
+                output.append(
+                    _truncated(section, room - bool(output), path, start, max_chars)
+                )
+                rest = list(dict.fromkeys(f["path"] for f in files[i + 1 :]))
+                if rest:
+                    output[-1] += f"[Not read, over the limit: {', '.join(rest)}]\n"
+                break
+            output.append("".join(section))
+            room -= size
+        return "\n".join(output)
+
+    async def run(self, tool_use: ToolUse) -> ToolResult:
+        result_str = await self.run_helper(tool_use.arguments)
+        return ToolResult(
+            content=result_str,
+            tool_name=self.name,
+            tool_call_id=tool_use.tool_call_id,
+        )
+
+
+def _truncated(
+    section: List[str], room: int, path: str, start: Optional[int], max_chars: int
+) -> str:
+    """The whole lines of section that fit in room, and where to resume."""
+    kept = []
+    for part in section:
+        if len(part) > room:
+            break
+        kept.append(part)
+        room -= len(part)
+    if start is None or len(kept) < 2:
+        return f"[Not read, over the limit: {path}]\n"
+    # section[0] is the header; the lines after it begin at line start.
+    resume = start + len(kept) - 1
+    return "".join(kept) + (
+        f"[Truncated at the {max_chars}-character limit; "
+        f"read the rest with start={resume}]\n"
+    )
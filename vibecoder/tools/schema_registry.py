@@ -0,0 +1,87 @@
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from vibecoder.tools.base import Tool
+
+
+def anthropic_tool(signature: Dict) -> Dict:
+    """Convert an OpenAI-style function signature to Anthropic's tool format."""
+    sig = signature["function"]
+    params = sig.get("parameters", {})
+    return {
+        "name": sig["name"],
+        "description": sig.get("description", ""),
+        "input_schema": {
+            "type": "object",
+            "properties": params.get("properties", {}),
+            "required": params.get("required", []),
+        },
+    }
+
+
+class ToolSchemaRegistry:
+    """
+    Builds each provider's tool payload once and reuses it across requests.
+
+    A tool's signature re-reads its prompt file, so rebuilding the payload for
+    every model call costs a file read per tool. The cached payloads are
+    rebuilt only when the tool set changes (tools added, removed or replaced)
+    or one of the tools' prompt files is modified. Prompt files are stat()ed
+    at most once every check_interval seconds.
+    """
+
+    def __init__(self, tools: Dict[str, Tool], check_interval: float = 1.0):
+        self.tools = tools
+        self.check_interval = check_interval
+        self.builds = 0
+        self._tool_key: Optional[Tuple] = None
+        self._prompt_key: Optional[Tuple] = None
+        self._checked_at = 0.0
+        self._payloads: Dict[str, List[Dict]] = {}
+
+    def _prompt_mtimes(self) -> Tuple:
+        mtimes = []
+        for tool in self.tools.values():
+            path = getattr(tool, "prompt_path", None)
+            mtime = None
+            if isinstance(path, str):
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    pass
+            mtimes.append(mtime)
+        return tuple(mtimes)
+
+    def _check(self) -> None:
+        """Drop the cached payloads if the tools or their prompt files changed."""
+        tool_key = tuple((name, id(tool)) for name, tool in self.tools.items())
+        now = time.monotonic()
+        if tool_key == self._tool_key and now - self._checked_at < self.check_interval:
+            return
+        prompt_key = self._prompt_mtimes()
+        self._checked_at = now
+        if tool_key != self._tool_key or prompt_key != self._prompt_key:
+            self._payloads = {}
+            self._tool_key = tool_key
+            self._prompt_key = prompt_key
+
+    def _payload(self, provider: str) -> List[Dict]:
+        self._check()
+        if provider not in self._payloads:
+            signatures = self._payloads.get("openai")
+            if signatures is None:
+                signatures = [tool.signature for tool in self.tools.values()]
+                self._payloads["openai"] = signatures
+            if provider == "anthropic":
+                self._payloads[provider] = [anthropic_tool(s) for s in signatures]
+            self.builds += 1
+        return self._payloads[provider]
+
+    def openai(self) -> List[Dict]:
+        """Tools in OpenAI's chat completions format."""
+        return self._payload("openai")
+
+    def anthropic(self) -> List[Dict]:
+        """Tools in Anthropic's messages format."""
+        return self._payload("anthropic")
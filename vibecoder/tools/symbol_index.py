@@ -0,0 +1,314 @@
+"""
+Index of the definitions and references in a workspace's Python files.
+
+Each file is parsed with `ast` into its definitions (classes, functions,
+methods and module or class level names), the identifiers it references and
+the modules it imports. Parse results are keyed by a hash of the file's
+content and saved in .vibecoder/symbols.json, so a file is only parsed again
+when its content changes. Each refresh stats the workspace and re-reads only files whose mtime
+or size moved, which keeps updates after an edit incremental. Large batches
+of changed files (e.g. the first build) are parsed in a process pool.
+"""
+
+import ast
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from vibecoder.tools.trigram_index import INDEX_DIR, walk_workspace
+
+INDEX_FILE = "symbols.json"
+# Version of the parse result format; bump it to discard old caches.
+FORMAT = 2
+# Fewer changed files than this are parsed in-process: a pool costs more.
+POOL_THRESHOLD = 64
+# Files larger than this are not parsed.
+MAX_FILE_BYTES = 2 * 1024 * 1024
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Forking a process that runs threads is unsafe; spawn fresh workers.
+        _pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+@dataclass
+class Definition:
+    path: str
+    line: int
+    end_line: int
+    kind: str
+    qualname: str
+    signature: str
+
+    @property
+    def name(self) -> str:
+        return self.qualname.rsplit(".", 1)[-1]
+
+    @property
+    def depth(self) -> int:
+        return self.qualname.count(".")
+
+
+def _signature(node: ast.AST) -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(b) for b in node.bases + node.keywords]
+        return (
+            f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}"
+        )
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+
+class _Visitor(ast.NodeVisitor):
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+        self.defs: List[list] = []
+        self.refs: Dict[str, List[int]] = defaultdict(list)
+        self.imports: List[list] = []
+        self.scope: List[Tuple[str, str]] = []
+
+    def _define(self, node: ast.AST, name: str, kind: str, signature: str) -> None:
+        qualname = ".".join([s for s, _ in self.scope] + [name])
+        end = getattr(node, "end_lineno", None) or node.lineno
+        self.defs.append([node.lineno, end, kind, qualname, signature])
+
+    def _scoped(self, node: ast.AST, name: str, kind: str) -> None:
+        self._define(node, name, kind, _signature(node))
+        self.scope.append((name, kind))
+        self.generic_visit(node)
+        self.scope.pop()
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._scoped(node, node.name, "class")
+
+    def visit_FunctionDef(self, node: ast.AST) -> None:
+        in_class = bool(self.scope) and self.scope[-1][1] == "class"
+        self._scoped(node, node.name, "method" if in_class else "function")
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def _assigned(self, node: ast.AST, targets: List[ast.AST]) -> None:
+        # Only names bound at module or class level are definitions; locals
+        # would bury the interesting results.
+        if not self.scope or self.scope[-1][1] == "class":
+            for target in targets:
+                for name in ast.walk(target):
+                    if isinstance(name, ast.Name):
+                        signature = self.lines[node.lineno - 1].strip()[:120]
+                        self._define(node, name.id, "variable", signature)
+        self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        self._assigned(node, node.targets)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        self._assigned(node, [node.target])
+
+    def visit_Name(self, node: ast.Name) -> None:
+        self.refs[node.id].append(node.lineno)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        self.refs[node.attr].append(node.end_lineno or node.lineno)
+        self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.imports.append([alias.name, 0, []])
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        names = [alias.name for alias in node.names]
+        self.imports.append([node.module or "", node.level, names])
+        self.generic_visit(node)
+
+    def visit_alias(self, node: ast.alias) -> None:
+        for part in node.name.split("."):
+            self.refs[part].append(node.lineno)
+
+
+def parse_source(source: bytes) -> Optional[dict]:
+    """Definitions, references and imports of one file; None if it does not parse."""
+    try:
+        tree = ast.parse(source)
+        text = source.decode("utf-8", errors="replace")
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+    visitor = _Visitor(text.splitlines())
+    visitor.visit(tree)
+    refs = {name: sorted(set(lines)) for name, lines in visitor.refs.items()}
+    return {"defs": visitor.defs, "refs": refs, "imports": visitor.imports}
+
+
+def _parse_batch(sources: List[bytes]) -> List[Optional[dict]]:
+    return [parse_source(source) for source in sources]
+
+
+class SymbolIndex:
+    """The parsed Python files of one workspace root."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.path = os.path.join(self.root, INDEX_DIR, INDEX_FILE)
+        # Relative path -> (mtime_ns, size, content hash).
+        self.files: Dict[str, Tuple[int, int, str]] = {}
+        # Content hash -> parse result (None for files that do not parse).
+        self.parsed: Dict[str, Optional[dict]] = {}
+        self.lock = threading.RLock()
+        self._by_name: Optional[Dict[str, List[Definition]]] = None
+
+    def refresh(self) -> int:
+        """Bring the index in line with the workspace; returns files changed."""
+        with self.lock:
+            current = {
+                rel: st
+                for rel, st in walk_workspace(self.root)
+                if rel.endswith(".py") and st[1] <= MAX_FILE_BYTES
+            }
+            changed = [
+                rel
+                for rel, st in current.items()
+                if self.files.get(rel, (None, None))[:2] != st
+            ]
+            removed = [rel for rel in self.files if rel not in current]
+            for rel in removed:
+                del self.files[rel]
+
+            to_parse: Dict[str, bytes] = {}
+            for rel in changed:
+                try:
+                    with open(os.path.join(self.root, rel), "rb") as f:
+                        source = f.read()
+                except OSError:
+                    self.files.pop(rel, None)
+                    continue
+                digest = hashlib.blake2b(source, digest_size=16).hexdigest()
+                self.files[rel] = (*current[rel], digest)
+                if digest not in self.parsed:
+                    to_parse[digest] = source
+            self._parse(to_parse)
+
+            if changed or removed:
+                live = {entry[2] for entry in self.files.values()}
+                self.parsed = {h: r for h, r in self.parsed.items() if h in live}
+                self._by_name = None
+            return len(changed) + len(removed)
+
+    def _parse(self, sources: Dict[str, bytes]) -> None:
+        digests = list(sources)
+        if len(digests) < POOL_THRESHOLD:
+            results = _parse_batch([sources[d] for d in digests])
+        else:
+            size = max(16, len(digests) // (4 * (os.cpu_count() or 1)))
+            batches = [digests[i : i + size] for i in range(0, len(digests), size)]
+            results = []
+            for batch_results in pool().map(
+                _parse_batch, [[sources[d] for d in batch] for batch in batches]
+            ):
+                results.extend(batch_results)
+        self.parsed.update(zip(digests, results))
+
+    def _result(self, rel: str) -> Optional[dict]:
+        entry = self.files.get(rel)
+        return self.parsed.get(entry[2]) if entry else None
+
+    def imports(self, rel: str) -> List[Tuple[str, int, List[str]]]:
+        """(module, level, names) of each import in rel; level counts leading dots."""
+        result = self._result(rel) or {"imports": []}
+        return [tuple(i) for i in result["imports"]]
+
+    def definitions(self, rel: str) -> List[Definition]:
+        result = self._result(rel) or {"defs": []}
+        return [Definition(rel, *d) for d in result["defs"]]
+
+    def find_definitions(self, name: str) -> List[Definition]:
+        """Definitions named name, or whose qualified name ends with it."""
+        with self.lock:
+            if self._by_name is None:
+                by_name = defaultdict(list)
+                for rel in sorted(self.files):
+                    for definition in self.definitions(rel):
+                        by_name[definition.name].append(definition)
+                self._by_name = by_name
+            found = self._by_name.get(name.rsplit(".", 1)[-1], [])
+        if "." in name:
+            found = [
+                d
+                for d in found
+                if d.qualname == name or d.qualname.endswith("." + name)
+            ]
+        return list(found)
+
+    def find_references(self, name: str) -> List[Tuple[str, int]]:
+        """(path, line) of every line using the identifier name."""
+        name = name.rsplit(".", 1)[-1]
+        found = []
+        with self.lock:
+            for rel in sorted(self.files):
+                result = self._result(rel)
+                if result:
+                    found.extend((rel, line) for line in result["refs"].get(name, ()))
+        return found
+
+    def save(self) -> None:
+        with self.lock:
+            data = json.dumps(
+                {
+                    "format": FORMAT,
+                    "root": self.root,
+                    "files": self.files,
+                    "parsed": self.parsed,
+                }
+            )
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        partial = self.path + ".partial"
+        with open(partial, "w") as f:
+            f.write(data)
+        os.replace(partial, self.path)
+
+    @classmethod
+    def load(cls, root: str) -> "SymbolIndex":
+        """The saved index of root, or an empty one."""
+        index = cls(root)
+        try:
+            with open(index.path, "r") as f:
+                data = json.load(f)
+            if data.get("format") == FORMAT and data.get("root") == index.root:
+                index.files = {rel: tuple(v) for rel, v in data["files"].items()}
+                index.parsed = data["parsed"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            index.files, index.parsed = {}, {}
+        return index
+
+
+_indexes: Dict[str, SymbolIndex] = {}
+_lock = threading.Lock()
+
+
+def index_for(root: str) -> SymbolIndex:
+    """The up-to-date index of root, loading or building it as needed."""
+    root = os.path.abspath(root)
+    with _lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = SymbolIndex.load(root)
+    if index.refresh():
+        try:
+            index.save()
+        except OSError:
+            pass  # A read-only workspace still gets an in-memory index.
+    return index
@@ -0,0 +1,154 @@
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from vibecoder.messages import ToolResult, ToolUse
+
+from . import symbol_index
+from .base import Tool
+
+PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
+
+ACTIONS = ("definitions", "references", "outline")
+DEFAULT_MAX_RESULTS = 100
+
+
+class SymbolsTool(Tool):
+    name = "symbols"
+    prompt_file = "symbols.md"
+    read_only = True
+
+    @property
+    def prompt_description(self) -> str:
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
+        with open(path, "r") as f:
+            return f.read().strip()
+
+    @property
+    def signature(self) -> Dict:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.prompt_description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "action": {"type": "string", "enum": list(ACTIONS)},
+                        "name": {
+                            "type": "string",
+                            "description": "Symbol to look up, e.g. `run` or `GrepTool.run`.",
+                        },
+                        "path": {
+                            "type": "string",
+                            "description": "File to outline, or file/directory to limit a lookup to.",
+                        },
+                        "max_results": {
+                            "type": "integer",
+                            "default": DEFAULT_MAX_RESULTS,
+                        },
+                    },
+                    "required": ["action"],
+                },
+            },
+        }
+
+    def touched_paths(self, args: Dict) -> Optional[List[str]]:
+        if args.get("action") == "outline" and args.get("path"):
+            return [args["path"]]
+        return None
+
+    async def run_helper(self, args: Dict) -> str:
+        action = args.get("action")
+        if action not in ACTIONS:
+            return f"[Error in call to symbols] `action` must be one of {', '.join(ACTIONS)}"
+        name = args.get("name")
+        path = args.get("path")
+        try:
+            max_results = int(args.get("max_results") or DEFAULT_MAX_RESULTS)
+        except (TypeError, ValueError):
+            return "[Error in call to symbols] `max_results` must be an integer"
+
+        if action == "outline":
+            if not path:
+                return "[Error in call to symbols] `path` is required for outline"
+            return await asyncio.to_thread(self._outline, path)
+        if not name:
+            return f"[Error in call to symbols] `name` is required for {action}"
+        # Parsing (the first time) and stat-ing the workspace block.
+        return await asyncio.to_thread(self._lookup, action, name, path, max_results)
+
+    @staticmethod
+    def _outline(path: str) -> str:
+        try:
+            with open(path, "rb") as f:
+                result = symbol_index.parse_source(f.read())
+        except OSError as e:
+            return f"[Error reading file '{path}': {e}]"
+        if result is None:
+            return f"[Could not parse '{path}' as Python]"
+        lines = []
+        for line, end, kind, qualname, signature in result["defs"]:
+            indent = "  " * qualname.count(".")
+            lines.append(f"{indent}{line}-{end}: {signature}")
+        return "".join(line + "\n" for line in lines) or f"[No definitions in {path}]"
+
+    @staticmethod
+    def _lookup(action: str, name: str, path: Optional[str], max_results: int) -> str:
+        index = symbol_index.index_for(os.getcwd())
+        prefix = os.path.normpath(path) if path else None
+
+        def wanted(rel: str) -> bool:
+            return (
+                prefix in (None, ".")
+                or rel == prefix
+                or rel.startswith(prefix.rstrip(os.sep) + os.sep)
+            )
+
+        if action == "definitions":
+            found = [d for d in index.find_definitions(name) if wanted(d.path)]
+            output = []
+            for d in found[:max_results]:
+                owner = d.qualname.rsplit(".", 1)[0] if d.depth else None
+                suffix = f"  (in {owner})" if owner else ""
+                output.append(f"{d.path}:{d.line}-{d.end_line}: {d.signature}{suffix}")
+        else:
+            found = [ref for ref in index.find_references(name) if wanted(ref[0])]
+            output = [
+                f"{rel}:{line}: {text}"
+                for (rel, line), text in zip(
+                    found[:max_results], _source_lines(found[:max_results])
+                )
+            ]
+        if not found:
+            return f"[No {action} of '{name}' found]\n"
+        if len(found) > max_results:
+            output.append(
+                f"[Showing {max_results} of {len(found)} {action}; "
+                "pass `path` to narrow the search]"
+            )
+        return "".join(line + "\n" for line in output)
+
+    async def run(self, tool_use: ToolUse) -> ToolResult:
+        result_str = await self.run_helper(tool_use.arguments)
+        return ToolResult(
+            content=result_str,
+            tool_name=self.name,
+            tool_call_id=tool_use.tool_call_id,
+        )
+
+
+def _source_lines(refs: List) -> List[str]:
+    """The stripped text of each (path, line), reading each file once."""
+    files: Dict[str, List[str]] = {}
+    texts = []
+    for rel, line in refs:
+        if rel not in files:
+            try:
+                with open(rel, "r", errors="replace") as f:
+                    files[rel] = f.read().splitlines()
+            except OSError:
+                files[rel] = []
+        lines = files[rel]
+        texts.append(lines[line - 1].strip() if line <= len(lines) else "")
+    return texts
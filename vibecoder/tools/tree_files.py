@@ -1,21 +1,31 @@
 import asyncio
+import fnmatch
 import os
-import shlex
-import subprocess
-from typing import Dict, List
+import stat
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from vibecoder.messages import ToolResult, ToolUse
+from vibecoder.tools import git_files
 from vibecoder.tools.base import Tool
+from vibecoder.tools.gitignore import IgnoreStack
 
 PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
 
+DEFAULT_MAX_ENTRIES = 500
+
 
 class TreeFilesTool(Tool):
     name = "tree_files"
+    prompt_file = "tree_files.md"
+    read_only = True
 
     @property
     def prompt_description(self) -> str:
-        path = os.path.join(PROMPT_DIR, "tree_files.md")
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
         with open(path, "r") as f:
             return f.read().strip()
 
@@ -58,6 +68,20 @@ class TreeFilesTool(Tool):
                             "type": "boolean",
                             "description": "Compute size of directories based on contents.",
                         },
+                        "max_entries": {
+                            "type": "integer",
+                            "default": DEFAULT_MAX_ENTRIES,
+                            "description": "Maximum number of entries to list.",
+                        },
+                        "cursor": {
+                            "type": "integer",
+                            "default": 0,
+                            "description": "Entries to skip, from a previous call.",
+                        },
+                        "tracked_only": {
+                            "type": "boolean",
+                            "description": "List only files tracked by git.",
+                        },
                     },
                     "required": [],
                 },
@@ -67,9 +91,20 @@ class TreeFilesTool(Tool):
     def _sanitize_path(self, path: str) -> str:
         # Prevent accessing parent directories
         if ".." in path:
-            path = path.replace("..", "")
+            # Dropping ".." must not turn "../x" into the absolute "/x".
+            path = path.replace("..", "").lstrip("/" + os.sep)
         return path.strip()
 
+    def touched_paths(self, args: Dict) -> Optional[List[str]]:
+        return [self._sanitize_path(args.get("path") or ".")]
+
+    def cache_paths(self, args: Dict) -> Optional[List[str]]:
+        paths = self.touched_paths(args)
+        if args.get("tracked_only"):
+            # Staging a file changes what is listed without touching it.
+            paths += [p for p in [git_files.index_file(paths[0])] if p]
+        return paths
+
     async def run(self, tool_use: ToolUse) -> ToolResult:
         result_str = await self.run_helper(tool_use.arguments)
         return ToolResult(
@@ -79,44 +114,309 @@ class TreeFilesTool(Tool):
         )
 
     async def run_helper(self, args: Dict) -> str:
-        cmd = ["tree"]
+        path = self._sanitize_path(args.get("path") or ".") or "."
+        try:
+            max_depth = _int_arg(args, "max_depth", None, 1)
+            max_entries = _int_arg(args, "max_entries", DEFAULT_MAX_ENTRIES, 1)
+            cursor = _int_arg(args, "cursor", 0, 0)
+        except ValueError as e:
+            return f"[Error in call to tree_files] {e}"
+        if not os.path.isdir(path):
+            problem = "is not a directory" if os.path.exists(path) else "not found"
+            return f"[Error in call to tree_files] {path} {problem}"
+
+        options = TreeOptions(
+            max_depth=max_depth,
+            gitignore=bool(args.get("ignore_gitignore")),
+            ignore_patterns=tuple(args.get("ignore_patterns") or ()),
+            include_pattern=args.get("include_pattern") or None,
+            show_times=bool(args.get("show_modified_times")),
+            show_sizes=bool(args.get("show_directory_sizes")),
+            tracked_only=bool(args.get("tracked_only")),
+        )
+        # Walking the tree blocks, so keep it off the event loop.
+        return await asyncio.to_thread(render, path, options, cursor, max_entries)
+
+
+def _int_arg(args: Dict, name: str, default: Optional[int], minimum: int):
+    value = args.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = None
+    if value is None or value < minimum:
+        raise ValueError(f"`{name}` must be an integer >= {minimum}")
+    return value
+
+
+@dataclass(frozen=True)
+class TreeOptions:
+    max_depth: Optional[int] = None
+    gitignore: bool = False
+    # Shell patterns matched against names; "a|b" matches either, as in tree.
+    ignore_patterns: Tuple[str, ...] = ()
+    include_pattern: Optional[str] = None
+    show_times: bool = False
+    show_sizes: bool = False
+    # List directories from the git index instead of reading them.
+    tracked_only: bool = False
+
+
+def _matches(name: str, pattern: str) -> bool:
+    return any(fnmatch.fnmatch(name, p) for p in pattern.split("|") if p)
+
+
+class _IndexEntry:
+    """A DirEntry-like view of a file or directory listed in the git index."""
 
-        # Path
-        path = args.get("path", ".")
-        path = self._sanitize_path(path)
-        cmd.append(path)
+    def __init__(self, directory: str, name: str, is_dir: bool):
+        self.name = name
+        self.path = os.path.join(directory, name)
+        self._is_dir = is_dir
+        self._stat: Optional[os.stat_result] = None
 
-        # Options
-        if args.get("max_depth") is not None:
-            cmd += ["-L", str(args["max_depth"])]
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        if self._stat is None:
+            self._stat = os.lstat(self.path)
+        return self._stat
 
-        if args.get("ignore_gitignore"):
-            cmd.append("--gitignore")
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return self._is_dir
 
-        if args.get("ignore_patterns"):
-            for pattern in args["ignore_patterns"]:
-                safe_pattern = pattern.replace('"', '\\"')
-                cmd += ["-I", safe_pattern]
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        return not self._is_dir and stat.S_ISREG(self.stat().st_mode)
 
-        if args.get("include_pattern"):
-            safe_pattern = args["include_pattern"].replace('"', '\\"')
-            cmd += ["-P", safe_pattern]
+    def is_symlink(self) -> bool:
+        return not self._is_dir and stat.S_ISLNK(self.stat().st_mode)
 
-        if args.get("show_modified_times"):
-            cmd.append("-D")
 
-        if args.get("show_directory_sizes"):
-            cmd.append("--du")
+Tracked = Dict[str, List[Tuple[str, bool]]]
 
+
+def tracked_listing(path: str) -> Optional[Tracked]:
+    """
+    Directory -> (name, is_dir) of its contents tracked by git, sorted by
+    name, for the tree at path; None if path is not in a git work tree.
+    """
+    files = git_files.tracked_files(path)
+    if files is None:
+        return None
+    prefix = os.path.join(path, "")
+    children: Dict[str, Dict[str, bool]] = defaultdict(dict)
+    for file in files:
+        parts = file[len(prefix) :].split(os.sep)
+        directory = path
+        for i, part in enumerate(parts):
+            children[directory][part] = i < len(parts) - 1
+            directory = os.path.join(directory, part)
+    return {directory: sorted(names.items()) for directory, names in children.items()}
+
+
+def list_directory(
+    path: str,
+    ignores: Optional[IgnoreStack],
+    options: TreeOptions,
+    tracked: Optional[Tracked] = None,
+) -> List[os.DirEntry]:
+    """
+    The entries of path that are listed, sorted by name. With tracked, the
+    entries come from the git index rather than the directory itself.
+    """
+    if tracked is not None:
+        entries = []
+        for name, is_dir in tracked.get(path, ()):
+            entry = _IndexEntry(path, name, is_dir)
+            if not is_dir:
+                try:
+                    entry.stat()
+                except OSError:
+                    continue  # Deleted, but not yet from the index.
+            entries.append(entry)
+    else:
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return []
+    listed = []
+    for entry in entries:
+        # Like tree, hidden entries are left out and symlinks not followed.
+        if entry.name.startswith("."):
+            continue
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if any(_matches(entry.name, p) for p in options.ignore_patterns):
+            continue
+        if ignores is not None and ignores.ignored(entry.path, is_dir):
+            continue
+        # The include pattern selects files; every directory is still shown.
+        if options.include_pattern and not is_dir:
+            if not _matches(entry.name, options.include_pattern):
+                continue
+        listed.append(entry)
+    return listed
+
+
+def _sizes_of(
+    path: str,
+    ignores: Optional[IgnoreStack],
+    options: TreeOptions,
+    tracked: Optional[Tracked],
+) -> Tuple[str, int, List[Tuple[str, Optional[IgnoreStack]]]]:
+    """The total size of the listed files directly in path, and its subdirectories."""
+    total = 0
+    subdirs = []
+    for entry in list_directory(path, ignores, options, tracked):
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                child = ignores.enter(entry.path) if ignores is not None else None
+                subdirs.append((entry.path, child))
+            elif entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+    return path, total, subdirs
+
+
+def directory_sizes(
+    root: str,
+    ignores: Optional[IgnoreStack],
+    options: TreeOptions,
+    tracked: Optional[Tracked] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    The total size of the listed files under root and each directory below
+    it, at any depth. Directories are read by a pool of threads, each new
+    subdirectory queued as soon as its parent has been listed.
+    """
+    own: Dict[str, int] = {}
+    parents: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_sizes_of, root, ignores, options, tracked)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, size, subdirs = future.result()
+                own[path] = size
+                for subdir, child in subdirs:
+                    parents[subdir] = path
+                    pending.add(pool.submit(_sizes_of, subdir, child, options, tracked))
+    totals = dict(own)
+    # Deepest first, so each directory is complete before it is added up.
+    for path in sorted(parents, key=lambda p: p.count(os.sep), reverse=True):
+        totals[parents[path]] += totals[path]
+    return totals
+
+
+def _human(size: int) -> str:
+    """A size the way tree -h prints it: 512, 4.0K, 1.2M."""
+    if size < 1024:
+        return str(size)
+    for unit in "KMGT":
+        size /= 1024
+        if size < 1024 or unit == "T":
+            return f"{size:.1f}{unit}"
+
+
+def _label(entry: os.DirEntry, is_dir: bool, options: TreeOptions, sizes) -> str:
+    name = entry.name
+    if entry.is_symlink():
+        try:
+            name += " -> " + os.readlink(entry.path)
+        except OSError:
+            pass
+    info = []
+    if options.show_sizes or options.show_times:
         try:
-            proc = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            return name
+        if options.show_sizes:
+            size = sizes.get(entry.path, 0) if is_dir else st.st_size
+            info.append(f"{_human(size):>6}")
+        if options.show_times:
+            info.append(time.strftime("%Y-%m-%d %H:%M", time.localtime(st.st_mtime)))
+    return f"[{'  '.join(info)}]  {name}" if info else name
+
+
+def walk_tree(
+    path: str,
+    options: TreeOptions,
+    ignores: Optional[IgnoreStack] = None,
+    sizes: Optional[Dict[str, int]] = None,
+    tracked: Optional[Tracked] = None,
+    indent: str = "",
+    depth: int = 1,
+) -> Iterator[Tuple[str, bool]]:
+    """
+    (line, is_dir) for each entry below path, in tree's drawing. Directories
+    are read as the walk reaches them, so stopping early skips the rest.
+    """
+    entries = list_directory(path, ignores, options, tracked)
+    for i, entry in enumerate(entries):
+        last = i == len(entries) - 1
+        is_dir = entry.is_dir(follow_symlinks=False)
+        branch = "└── " if last else "├── "
+        yield indent + branch + _label(entry, is_dir, options, sizes), is_dir
+        if is_dir and (options.max_depth is None or depth < options.max_depth):
+            yield from walk_tree(
+                entry.path,
+                options,
+                ignores.enter(entry.path) if ignores is not None else None,
+                sizes,
+                tracked,
+                indent + ("    " if last else "│   "),
+                depth + 1,
             )
-            stdout, stderr = await proc.communicate()
 
-            if proc.returncode != 0:
-                return f"Error: {stderr.decode().strip()}"
-            return stdout.decode().strip()
 
-        except Exception as e:
-            return f"[Error executing tree command '{' '.join(cmd)}': {e}]"
+def render(path: str, options: TreeOptions, cursor: int, limit: int) -> str:
+    """Entries cursor to cursor + limit of the tree at path, tree-formatted."""
+    ignores = IgnoreStack.for_directory(path) if options.gitignore else None
+    # Outside a repository, the tracked-only listing falls back to the disk.
+    tracked = tracked_listing(path) if options.tracked_only else None
+    sizes = None
+    if options.show_sizes:
+        sizes = directory_sizes(path, ignores, options, tracked)
+
+    output = []
+    if cursor == 0:
+        root = path.rstrip("/") or path
+        output.append(f"[{_human(sizes[path]):>6}]  {root}" if sizes else root)
+    directories = files = 0
+    complete = True
+    for n, (line, is_dir) in enumerate(
+        walk_tree(path, options, ignores, sizes, tracked)
+    ):
+        if n >= cursor + limit:
+            complete = False
+            break
+        if n >= cursor:
+            output.append(line)
+        if is_dir:
+            directories += 1
+        else:
+            files += 1
+
+    if not complete:
+        output.append(
+            f"[Showing entries {cursor + 1}-{cursor + limit}; "
+            f"call tree_files again with cursor={cursor + limit} for more]"
+        )
+        return "\n".join(output)
+    if cursor and cursor >= directories + files:
+        output.append(f"[No entries past cursor={cursor}]")
+        return "\n".join(output)
+    summary = (
+        f"{directories} director{'y' if directories == 1 else 'ies'}, "
+        f"{files} file{'' if files == 1 else 's'}"
+    )
+    if sizes:
+        summary = f"{_human(sizes[path])} used in {summary}"
+    output.extend(["", summary])
+    return "\n".join(output)
@@ -0,0 +1,460 @@
+"""
+Persistent trigram index that narrows the files the grep tool has to scan.
+
+Every indexed file contributes the set of 3-byte sequences it contains
+(lowercased, so case-insensitive searches can use it too). A regex is reduced
+to literal strings that any match must contain; only files holding all the
+trigrams of those literals can match, so only they are searched. Patterns
+without a literal of three or more bytes fall back to a full scan.
+
+Posting lists are sorted array('I') of file ids. Changed or deleted files are
+tombstoned and re-added under a new id, so lists stay sorted and updates are
+incremental; the index is compacted once half of it is dead. It lives in
+.vibecoder/trigram.idx under the workspace root, is built and refreshed in a
+background thread, and is never trusted blindly: each search stats the files
+it walks and scans any file whose mtime or size no longer matches the index.
+"""
+
+import json
+import os
+import re
+import struct
+import threading
+from array import array
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from vibecoder import workspace
+from vibecoder.tools import grep_engine
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+INDEX_DIR = ".vibecoder"
+INDEX_FILE = "trigram.idx"
+MAGIC = b"VCTRIGRAM1\n"
+# Larger files are not indexed and are always scanned.
+MAX_INDEXED_BYTES = 4 * 1024 * 1024
+# Workspaces with fewer files are scanned directly; an index would not pay off.
+MIN_FILES = 2000
+# Regexes that expand to more alternatives than this are not narrowed further.
+MAX_ALTERNATIVES = 16
+
+_TRIGRAMS = re.compile(rb"(?=(...))", re.DOTALL)
+
+FileStat = Tuple[int, int]
+
+
+def file_trigrams(data: bytes) -> array:
+    """Sorted distinct trigrams of a lowercased buffer, as 24-bit integers."""
+    found = set(_TRIGRAMS.findall(data.lower()))
+    return array("I", sorted(int.from_bytes(t, "big") for t in found))
+
+
+def _literal_trigrams(literal: bytes) -> Set[int]:
+    literal = literal.lower()
+    return {int.from_bytes(literal[i : i + 3], "big") for i in range(len(literal) - 2)}
+
+
+def required_literals(pattern: str, ignore_case: bool = False):
+    """
+    Literal strings every match of pattern must contain, in disjunctive form.
+
+    Returns a list of alternatives, each a list of byte strings that must all
+    occur in a matching line; a match satisfies at least one alternative.
+    Returns None if the pattern cannot be analysed.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError):
+        return None
+    if ignore_case or parsed.state.flags & re.IGNORECASE:
+        # The index only folds ASCII case, so drop non-ASCII characters.
+        split = lambda s: [p.encode() for p in re.split(r"[^\x00-\x7f]+", s) if p]
+    else:
+        split = lambda s: [s.encode("utf-8")]
+    return [
+        [b for literal in alternative for b in split(literal)]
+        for alternative in _sequence(parsed)
+    ]
+
+
+_REPEATS = {
+    op
+    for op in (
+        sre_constants.MAX_REPEAT,
+        sre_constants.MIN_REPEAT,
+        getattr(sre_constants, "POSSESSIVE_REPEAT", None),
+    )
+    if op is not None
+}
+
+
+def _product(alternatives, others):
+    if len(alternatives) * len(others) > MAX_ALTERNATIVES:
+        return alternatives
+    return [a + b for a in alternatives for b in others]
+
+
+def _sequence(items) -> List[List[str]]:
+    alternatives: List[List[str]] = [[]]
+    run: List[str] = []
+
+    def flush():
+        nonlocal alternatives
+        if run:
+            literal = "".join(run)
+            alternatives = [a + [literal] for a in alternatives]
+            run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        if op is sre_constants.AT:
+            # Anchors are zero-width and do not split literals.
+            continue
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            alternatives = _product(alternatives, _sequence(av[-1]))
+        elif op in _REPEATS:
+            low, _, sub = av
+            if low >= 1:
+                alternatives = _product(alternatives, _sequence(sub))
+        elif op is sre_constants.BRANCH:
+            branches = [alt for branch in av[1] for alt in _sequence(branch)]
+            alternatives = _product(alternatives, branches)
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            alternatives = _product(alternatives, _sequence(av))
+        # Anything else (classes, ".", backreferences, lookarounds) requires
+        # no particular literal.
+    flush()
+    return alternatives
+
+
+def _read_text(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            data = f.read(MAX_INDEXED_BYTES + 1)
+    except OSError:
+        return None
+    if len(data) > MAX_INDEXED_BYTES:
+        return None
+    if b"\0" in data[: grep_engine.BINARY_SNIFF_BYTES]:
+        return b""
+    return data
+
+
+def walk_workspace(root: str) -> Iterator[Tuple[str, FileStat]]:
+    """(relative path, (mtime_ns, size)) of every file the grep tool can see."""
+    snapshot = workspace.snapshot_for(root)
+    return iter(snapshot.files(skip=(INDEX_DIR,)))
+
+
+class TrigramIndex:
+    """In-memory trigram index of one workspace, saved to and loaded from disk."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        # File id -> relative path and stat; None once the file is gone.
+        self.paths: List[Optional[str]] = []
+        self.stats: List[Optional[FileStat]] = []
+        self.ids: Dict[str, int] = {}
+        # Files that are too large to index: always candidates.
+        self.unindexed: Dict[str, FileStat] = {}
+        self.postings: Dict[int, array] = {}
+        self.dead = 0
+        # Reentrant: update() checks is_current() while holding it.
+        self.lock = threading.RLock()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.root, INDEX_DIR, INDEX_FILE)
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self.unindexed)
+
+    def is_current(self, rel: str, st: FileStat) -> bool:
+        with self.lock:
+            file_id = self.ids.get(rel)
+            if file_id is not None:
+                return self.stats[file_id] == st
+            return self.unindexed.get(rel) == st
+
+    def update(self, files: Dict[str, FileStat]) -> int:
+        """Bring the index in line with files; returns how many files changed."""
+        with self.lock:
+            stale = [rel for rel, st in files.items() if not self.is_current(rel, st)]
+            gone = [rel for rel in self.ids if rel not in files]
+            gone += [rel for rel in self.unindexed if rel not in files]
+        # Reading and tokenizing is the slow part; do it without the lock.
+        added = []
+        for rel in stale:
+            data = _read_text(os.path.join(self.root, rel))
+            added.append((rel, files[rel], data))
+        with self.lock:
+            for rel in gone + stale:
+                self._remove(rel)
+            for rel, st, data in added:
+                if data is None:
+                    self.unindexed[rel] = st
+                else:
+                    self._add(rel, st, file_trigrams(data))
+            if self.dead > len(self.ids):
+                self._compact()
+        return len(stale) + len(gone)
+
+    def _add(self, rel: str, st: FileStat, trigrams: array) -> None:
+        file_id = len(self.paths)
+        self.paths.append(rel)
+        self.stats.append(st)
+        self.ids[rel] = file_id
+        for trigram in trigrams:
+            posting = self.postings.get(trigram)
+            if posting is None:
+                posting = self.postings[trigram] = array("I")
+            posting.append(file_id)
+
+    def _remove(self, rel: str) -> None:
+        self.unindexed.pop(rel, None)
+        file_id = self.ids.pop(rel, None)
+        if file_id is not None:
+            self.paths[file_id] = None
+            self.stats[file_id] = None
+            self.dead += 1
+
+    def _compact(self) -> None:
+        remap = array("i", [-1]) * len(self.paths)
+        paths, stats = [], []
+        for old_id, rel in enumerate(self.paths):
+            if rel is not None:
+                remap[old_id] = len(paths)
+                paths.append(rel)
+                stats.append(self.stats[old_id])
+        postings = {}
+        for trigram, posting in self.postings.items():
+            live = array("I", (remap[i] for i in posting if remap[i] >= 0))
+            if live:
+                postings[trigram] = live
+        self.paths, self.stats, self.postings = paths, stats, postings
+        self.ids = {rel: i for i, rel in enumerate(paths)}
+        self.dead = 0
+
+    def candidates(self, alternatives) -> Optional[Set[str]]:
+        """Relative paths that may match, or None if every file may match."""
+        with self.lock:
+            result: Set[int] = set()
+            for literals in alternatives:
+                trigrams = set()
+                for literal in literals:
+                    trigrams |= _literal_trigrams(literal)
+                if not trigrams:
+                    return None
+                lists = sorted(
+                    (self.postings.get(t, array("I")) for t in trigrams), key=len
+                )
+                ids = set(lists[0])
+                for posting in lists[1:]:
+                    if not ids:
+                        break
+                    ids.intersection_update(posting)
+                result |= ids
+            paths = {self.paths[i] for i in result}
+            paths.discard(None)
+            return paths | set(self.unindexed)
+
+    def file_filter(
+        self, regex: re.Pattern, stale: Set[str]
+    ) -> Optional[Callable[[str], bool]]:
+        """
+        Predicate telling grep_engine.search which files to open for regex.
+
+        Files the index does not know, or whose mtime or size changed, are
+        always searched and added to stale so the caller can refresh them.
+        Returns None when the pattern cannot narrow the search.
+        """
+        pattern = regex.pattern
+        if isinstance(pattern, bytes):
+            pattern = pattern.decode("utf-8")
+        alternatives = required_literals(pattern, bool(regex.flags & re.IGNORECASE))
+        if not alternatives:
+            return None
+        candidates = self.candidates(alternatives)
+        if candidates is None:
+            return None
+        root = self.root
+
+        def should_search(path: str) -> bool:
+            rel = os.path.relpath(os.path.abspath(path), root)
+            if rel.startswith(INDEX_DIR + os.sep + INDEX_FILE):
+                return False
+            if rel.startswith("..") or rel.startswith(INDEX_DIR + os.sep):
+                # Outside the index, or in the directory it never indexes.
+                return True
+            if rel in candidates:
+                return True
+            try:
+                st = os.stat(path)
+            except OSError:
+                return True
+            if self.is_current(rel, (st.st_mtime_ns, st.st_size)):
+                return False
+            stale.add(rel)
+            return True
+
+        return should_search
+
+    def save(self) -> None:
+        """Atomically write the index to .vibecoder/trigram.idx."""
+        with self.lock:
+            meta = json.dumps(
+                {
+                    "root": self.root,
+                    "files": [
+                        [rel, *st] if rel is not None else None
+                        for rel, st in zip(self.paths, self.stats)
+                    ],
+                    "unindexed": [[rel, *st] for rel, st in self.unindexed.items()],
+                }
+            ).encode()
+            chunks = [MAGIC, struct.pack("<I", len(meta)), meta]
+            for trigram in sorted(self.postings):
+                posting = self.postings[trigram]
+                chunks.append(struct.pack("<II", trigram, len(posting)))
+                chunks.append(_little_endian(posting).tobytes())
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        partial = self.path + ".partial"
+        with open(partial, "wb") as f:
+            f.writelines(chunks)
+        os.replace(partial, self.path)
+
+    @classmethod
+    def load(cls, root: str) -> Optional["TrigramIndex"]:
+        index = cls(root)
+        try:
+            with open(index.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if not data.startswith(MAGIC):
+            return None
+        try:
+            offset = len(MAGIC)
+            (meta_len,) = struct.unpack_from("<I", data, offset)
+            offset += 4
+            meta = json.loads(data[offset : offset + meta_len])
+            offset += meta_len
+            if meta.get("root") != index.root:
+                return None
+            for file_id, entry in enumerate(meta["files"]):
+                if entry is None:
+                    index.paths.append(None)
+                    index.stats.append(None)
+                    index.dead += 1
+                    continue
+                rel, mtime_ns, size = entry
+                index.paths.append(rel)
+                index.stats.append((mtime_ns, size))
+                index.ids[rel] = file_id
+            for rel, mtime_ns, size in meta["unindexed"]:
+                index.unindexed[rel] = (mtime_ns, size)
+            while offset < len(data):
+                trigram, count = struct.unpack_from("<II", data, offset)
+                offset += 8
+                posting = array("I")
+                posting.frombytes(data[offset : offset + 4 * count])
+                offset += 4 * count
+                index.postings[trigram] = _little_endian(posting)
+        except (ValueError, KeyError, TypeError, struct.error):
+            return None
+        return index
+
+
+def _little_endian(posting: array) -> array:
+    """The on-disk format is little-endian uint32 whatever the platform."""
+    assert posting.itemsize == 4
+    if struct.pack("=I", 1) == struct.pack("<I", 1):
+        return posting
+    swapped = array("I", posting)
+    swapped.byteswap()
+    return swapped
+
+
+class IndexManager:
+    """
+    Owns the index of each workspace root and keeps it fresh in the background.
+
+    index_for() never blocks on a build: until the first build has finished it
+    returns None and the caller scans every file.
+    """
+
+    def __init__(self, min_files: int = MIN_FILES):
+        self.min_files = min_files
+        self.indexes: Dict[str, TrigramIndex] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+        self._small: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def index_for(self, root: str) -> Optional[TrigramIndex]:
+        root = os.path.abspath(root)
+        with self._lock:
+            if root in self._small:
+                return None
+            index = self.indexes.get(root)
+            if index is None and root not in self._threads:
+                index = TrigramIndex.load(root)
+                if index is not None:
+                    self.indexes[root] = index
+                else:
+                    self._start(root)
+            return index
+
+    def refresh(self, root: str) -> None:
+        """
+        Re-sync the index of root with the workspace in the background. A root
+        found too small to index is counted again, so it gets an index once
+        it has grown.
+        """
+        root = os.path.abspath(root)
+        with self._lock:
+            self._small.discard(root)
+            self._start(root)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        for thread in list(self._threads.values()):
+            thread.join(timeout)
+
+    def _start(self, root: str) -> None:
+        if root in self._threads:
+            return
+        thread = threading.Thread(
+            target=self._build, args=(root,), name="trigram-index", daemon=True
+        )
+        self._threads[root] = thread
+        thread.start()
+
+    def _build(self, root: str) -> None:
+        try:
+            files = dict(walk_workspace(root))
+            index = self.indexes.get(root)
+            if index is None:
+                if len(files) < self.min_files:
+                    with self._lock:
+                        self._small.add(root)
+                    return
+                index = TrigramIndex.load(root) or TrigramIndex(root)
+            if index.update(files) or not os.path.exists(index.path):
+                index.save()
+            with self._lock:
+                self.indexes[root] = index
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._threads.pop(root, None)
+
+
+manager = IndexManager()
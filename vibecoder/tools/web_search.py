@@ -1,6 +1,6 @@
 import json
 import os
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 import httpx
 import requests
@@ -10,20 +10,22 @@ from vibecoder.messages import ToolResult, ToolUse
 from vibecoder.tools.base import Tool
 
 PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
-description_path = os.path.join(PROMPT_DIR, "web_search.md")
 
 load_dotenv()
 
 
 class SearchTool(Tool):
     name = "web_search"
+    prompt_file = "web_search.md"
+    read_only = True
     _SUPPORTED_ENGINES = ["brave"]
     _BRAVE_API_URL = "https://api.search.brave.com/res/v1/web/search"
     _MAX_RESULTS = 20
 
     @property
     def prompt_description(self) -> str:
-        with open(description_path, "r") as f:
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
+        with open(path, "r") as f:
             return f.read().strip()
 
     @property
@@ -100,6 +102,9 @@ class SearchTool(Tool):
         else:
             raise Exception(f"Unexpected engine {engine}")
 
+    def touched_paths(self, args: Dict[str, Any]) -> Optional[List[str]]:
+        return []
+
     async def run_helper(self, args: Dict[str, Any]) -> str:
         try:
             query = args.get("query")
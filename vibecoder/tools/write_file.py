@@ -1,9 +1,11 @@
+import asyncio
 import os
-from typing import Dict
+from typing import Dict, List, Optional
 
 import aiofiles
 
 from vibecoder.messages import ToolResult, ToolUse
+from vibecoder.tools import content_cache, file_transaction
 from vibecoder.tools.base import Tool
 
 PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
@@ -11,10 +13,11 @@ PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts/tools")
 
 class WriteFileTool(Tool):
     name = "write_file"
+    prompt_file = "write_file.md"
 
     @property
     def prompt_description(self) -> str:
-        path = os.path.join(PROMPT_DIR, "write_file.md")
+        path = os.path.join(PROMPT_DIR, self.prompt_file)
         with open(path, "r") as f:
             return f.read().strip()
 
@@ -46,6 +49,9 @@ class WriteFileTool(Tool):
             },
         }
 
+    def touched_paths(self, args: Dict) -> Optional[List[str]]:
+        return [args["path"]] if args.get("path") else []
+
     async def run_helper(self, args: Dict) -> str:
         path = args.get("path")
         content = args.get("content")
@@ -60,9 +66,14 @@ class WriteFileTool(Tool):
                 # Run blocking mkdir in thread pool
                 await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
 
-            mode = "a" if append else "w"
-            async with aiofiles.open(path, mode) as f:
-                await f.write(content)
+            if append:
+                # Exactly the bytes recorded below, as FileTransaction writes.
+                async with aiofiles.open(path, "a", encoding="utf-8", newline="") as f:
+                    await f.write(content)
+                content_cache.append(path, content.encode("utf-8"))
+            else:
+                # Readers never see a partly written file.
+                await asyncio.to_thread(_replace, path, content)
 
             return f"[Successfully wrote to '{path}']"
 
@@ -76,3 +87,8 @@ class WriteFileTool(Tool):
             tool_name=self.name,
             tool_call_id=tool_use.tool_call_id,
         )
+
+
+def _replace(path: str, content: str) -> None:
+    with file_transaction.FileTransaction() as transaction:
+        transaction.write(path, content)
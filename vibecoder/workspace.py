@@ -0,0 +1,432 @@
+"""
+In-memory snapshot of the working directory shared by the tools.
+
+The snapshot holds the files and directories under a root with their stat
+data and whether .gitignore excludes them. Like the search tools, it does not
+descend into .git or ignored directories (node_modules, virtualenvs, build
+output), so its size follows what the tools actually look at; ignored files
+and directories are listed by name only. On Linux it is kept current with
+inotify, so a refresh only rescans the directories the kernel reported;
+elsewhere, or when inotify runs out of watches, a refresh rescans the tree
+and diffs it against the previous state. Each refresh publishes the changes
+it found to subscribers, which is how caches built on top of the workspace
+are invalidated.
+
+Consumers call snapshot_for(root), which returns the refreshed snapshot of
+that root.
+"""
+
+import ctypes
+import ctypes.util
+import inspect
+import os
+import struct
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from vibecoder.tools.gitignore import IgnoreStack
+
+# Number of roots whose snapshots (and inotify descriptors) are kept open.
+MAX_SNAPSHOTS = 8
+
+FileStat = Tuple[int, int]  # mtime_ns, size
+
+
+@dataclass(frozen=True)
+class Change:
+    root: str
+    path: str  # relative to root
+    kind: str  # "added", "modified" or "removed"
+    is_dir: bool = False
+
+    @property
+    def abspath(self) -> str:
+        return os.path.join(self.root, self.path)
+
+
+@dataclass
+class Directory:
+    mtime_ns: int
+    # Name -> (mtime_ns, size, ignored).
+    files: Dict[str, Tuple[int, int, bool]] = field(default_factory=dict)
+    # Name -> ignored. Only directories that are not ignored are scanned.
+    dirs: Dict[str, bool] = field(default_factory=dict)
+
+
+class _Inotify:
+    """The few inotify calls the snapshot needs, through ctypes."""
+
+    MASK = (
+        0x2  # IN_MODIFY
+        | 0x4  # IN_ATTRIB
+        | 0x8  # IN_CLOSE_WRITE
+        | 0x40  # IN_MOVED_FROM
+        | 0x80  # IN_MOVED_TO
+        | 0x100  # IN_CREATE
+        | 0x200  # IN_DELETE
+        | 0x400  # IN_DELETE_SELF
+        | 0x800  # IN_MOVE_SELF
+        | 0x01000000  # IN_ONLYDIR
+        | 0x02000000  # IN_DONT_FOLLOW
+    )
+    Q_OVERFLOW = 0x4000
+    IGNORED = 0x8000
+    _HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        name = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._libc = libc
+        # IN_NONBLOCK | IN_CLOEXEC
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | 0o2000000)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add(self, path: str) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def remove(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self) -> Iterator[Tuple[int, int, str]]:
+        """Pending (watch, mask, name) events, without blocking."""
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self._HEADER.unpack_from(data, offset)
+                offset += self._HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                yield wd, mask, os.fsdecode(name)
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class WorkspaceSnapshot:
+    """The files under one root, kept in sync with the disk."""
+
+    def __init__(self, root: str, watch: str = "auto"):
+        self.root = os.path.abspath(root)
+        self.version = 0
+        self.lock = threading.RLock()
+        self._dirs: Dict[str, Directory] = {}
+        self._stacks: Dict[str, IgnoreStack] = {}
+        self._subscribers: List = []
+        self._inotify: Optional[_Inotify] = None
+        self._watches: Dict[int, str] = {}
+        self._watch_ids: Dict[str, int] = {}
+        if watch == "auto":
+            watch = os.getenv("VIBECODER_WATCH", "inotify")
+        if watch == "inotify":
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError, TypeError):
+                self._inotify = None
+        self._scan("", IgnoreStack.for_directory(self.root), [])
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify is not None else "poll"
+
+    # Change notification.
+
+    def subscribe(self, callback: Callable[[List[Change]], None]) -> None:
+        """Call callback with each batch of changes; bound methods are held weakly."""
+        if inspect.ismethod(callback):
+            self._subscribers.append(weakref.WeakMethod(callback))
+        else:
+            self._subscribers.append(lambda: callback)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        self._subscribers = [
+            s for s in self._subscribers if s() not in (None, callback)
+        ]
+
+    def _publish(self, changes: List[Change]) -> None:
+        self.version += 1
+        live = []
+        for ref in self._subscribers:
+            callback = ref()
+            if callback is not None:
+                live.append(ref)
+                callback(changes)
+        self._subscribers = live
+
+    # Keeping the snapshot current.
+
+    def refresh(self) -> List[Change]:
+        """Bring the snapshot up to date and publish what changed."""
+        with self.lock:
+            changes: List[Change] = []
+            if self._inotify is None:
+                self._scan("", self._stacks[""], changes)
+            else:
+                self._apply_events(changes)
+            if changes:
+                self._publish(changes)
+            return changes
+
+    def _apply_events(self, changes: List[Change]) -> None:
+        dirty: Set[str] = set()
+        rescan_all = False
+        for wd, mask, name in self._inotify.read():
+            if mask & _Inotify.Q_OVERFLOW:
+                rescan_all = True
+                continue
+            rel = self._watches.get(wd)
+            if rel is None:
+                continue
+            if mask & _Inotify.IGNORED:
+                # The kernel dropped the watch: the directory is gone.
+                self._watches.pop(wd, None)
+                if self._watch_ids.get(rel) == wd:
+                    del self._watch_ids[rel]
+                dirty.add(os.path.dirname(rel) if rel else "")
+                continue
+            dirty.add(rel)
+        if rescan_all:
+            dirty = {""}
+        # Parents first, so a rescan that drops a directory also drops its
+        # children before they are looked at.
+        for rel in sorted(dirty, key=lambda d: (d.count(os.sep), d)):
+            if rel in self._dirs:
+                self._scan(rel, self._stacks[rel], changes, recursive=rescan_all)
+
+    def _watch(self, rel: str) -> None:
+        if self._inotify is None or rel in self._watch_ids:
+            return
+        try:
+            wd = self._inotify.add(os.path.join(self.root, rel))
+        except OSError:
+            # Most likely out of watches: fall back to polling for good.
+            self._stop_watching()
+            return
+        self._watches[wd] = rel
+        self._watch_ids[rel] = wd
+
+    def _unwatch(self, rel: str) -> None:
+        wd = self._watch_ids.pop(rel, None)
+        if wd is not None:
+            self._watches.pop(wd, None)
+            if self._inotify is not None:
+                self._inotify.remove(wd)
+
+    def _stop_watching(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+        self._inotify = None
+        self._watches.clear()
+        self._watch_ids.clear()
+
+    def _scan(
+        self,
+        rel: str,
+        stack: IgnoreStack,
+        changes: List[Change],
+        recursive: bool = True,
+    ) -> None:
+        """
+        Re-read directory rel and diff it against the snapshot. New
+        subdirectories are always scanned; existing ones only if recursive.
+        """
+        path = os.path.join(self.root, rel) if rel else self.root
+        # Watch before listing, so nothing created in between is missed.
+        self._watch(rel)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            self._drop(rel, changes)
+            return
+
+        old = self._dirs.get(rel)
+        ignore_changed = old is None or (
+            ".gitignore" in old.files or any(e.name == ".gitignore" for e in entries)
+        )
+        # stack holds the rules in force here, unless this directory's own
+        # .gitignore may have changed; then rebuild it from the parent's.
+        if ignore_changed:
+            if rel:
+                stack = self._stacks[os.path.dirname(rel)].enter(path)
+            else:
+                stack = IgnoreStack.for_directory(self.root)
+        self._stacks[rel] = stack
+
+        current = Directory(mtime_ns)
+        for entry in entries:
+            # Like the search tools, do not follow symlinks.
+            if entry.is_symlink():
+                continue
+            try:
+                if entry.is_dir():
+                    if entry.name != ".git":
+                        current.dirs[entry.name] = stack.ignored(entry.path, True)
+                elif entry.is_file():
+                    st = entry.stat()
+                    current.files[entry.name] = (
+                        st.st_mtime_ns,
+                        st.st_size,
+                        stack.ignored(entry.path, False),
+                    )
+            except OSError:
+                continue
+        self._dirs[rel] = current
+
+        previous = old or Directory(0)
+        if old is None and rel:
+            changes.append(Change(self.root, rel, "added", True))
+        for name, stat in current.files.items():
+            before = previous.files.get(name)
+            if before is None:
+                changes.append(Change(self.root, os.path.join(rel, name), "added"))
+            elif before != stat:
+                changes.append(Change(self.root, os.path.join(rel, name), "modified"))
+        for name in previous.files:
+            if name not in current.files:
+                changes.append(Change(self.root, os.path.join(rel, name), "removed"))
+        for name in previous.dirs:
+            if name not in current.dirs:
+                self._drop(os.path.join(rel, name), changes)
+
+        # A changed .gitignore can flip what is ignored anywhere below.
+        gitignore_moved = old is not None and (
+            old.files.get(".gitignore") != current.files.get(".gitignore")
+        )
+        for name, ignored in current.dirs.items():
+            child = os.path.join(rel, name)
+            if ignored:
+                if name not in previous.dirs:
+                    changes.append(Change(self.root, child, "added", True))
+                elif child in self._dirs:
+                    # Newly ignored: stop tracking what is inside.
+                    self._drop(child, changes)
+            elif recursive or child not in self._dirs or gitignore_moved:
+                self._scan(child, stack, changes, recursive=True)
+
+    def _drop(self, rel: str, changes: List[Change]) -> None:
+        """Forget directory rel and everything below it."""
+        prefix = rel + os.sep
+        gone = [d for d in self._dirs if d == rel or d.startswith(prefix)]
+        if rel:
+            changes.append(Change(self.root, rel, "removed", True))
+        for d in gone:
+            for name in self._dirs.pop(d).files:
+                changes.append(Change(self.root, os.path.join(d, name), "removed"))
+            self._stacks.pop(d, None)
+            self._unwatch(d)
+
+    # Queries.
+
+    def relpath(self, path: str) -> Optional[str]:
+        """path relative to the root ("" for the root), or None if outside it."""
+        rel = os.path.relpath(os.path.abspath(path), self.root)
+        if rel == ".":
+            return ""
+        if rel == ".." or rel.startswith(".." + os.sep):
+            return None
+        if rel == ".git" or rel.startswith(".git" + os.sep):
+            return None
+        return rel
+
+    def directory(self, rel: str) -> Optional[Directory]:
+        """The listing of a tracked directory; None if ignored or missing."""
+        return self._dirs.get(rel)
+
+    def uncovered(self, path: str) -> List[str]:
+        """
+        The parts of path whose contents the snapshot does not track: path
+        itself if it is outside the root or inside an ignored directory, or
+        the ignored directories below it. Changes there produce no events.
+        """
+        rel = self.relpath(path)
+        if rel is None:
+            return [path]
+        with self.lock:
+            if rel in self._dirs:
+                prefix = rel + os.sep if rel else ""
+                return [
+                    os.path.join(self.root, d, name)
+                    for d, directory in self._dirs.items()
+                    if d == rel or d.startswith(prefix)
+                    for name, ignored in directory.dirs.items()
+                    if ignored
+                ]
+            parent = self._dirs.get(os.path.dirname(rel))
+            if parent is None or parent.dirs.get(os.path.basename(rel)):
+                return [path]
+            if os.path.basename(rel) in parent.files or not os.path.lexists(path):
+                # A regular file, or a name that does not exist yet: its
+                # creation, change or removal is seen by the snapshot.
+                return []
+            # Symlinks and anything else the scan skips.
+            return [path]
+
+    def files(
+        self, rel: str = "", include_ignored: bool = False, skip: Tuple[str, ...] = ()
+    ) -> List[Tuple[str, FileStat]]:
+        """
+        (relative path, (mtime_ns, size)) of the files under directory rel, in
+        the order the search tools walk them: each directory's files sorted
+        by name, then its subdirectories. Top-level names in skip are left out.
+        include_ignored adds ignored files, but not the contents of ignored
+        directories, which are not tracked.
+        """
+        found = []
+        with self.lock:
+            stack = [rel]
+            while stack:
+                current = stack.pop()
+                directory = self._dirs.get(current)
+                if directory is None:
+                    continue
+                for name in sorted(directory.files):
+                    mtime_ns, size, ignored = directory.files[name]
+                    if include_ignored or not ignored:
+                        found.append((os.path.join(current, name), (mtime_ns, size)))
+                subdirs = []
+                for name in sorted(directory.dirs):
+                    if not current and name in skip:
+                        continue
+                    if not directory.dirs[name]:
+                        subdirs.append(os.path.join(current, name))
+                stack.extend(reversed(subdirs))
+        return found
+
+    def close(self) -> None:
+        with self.lock:
+            self._stop_watching()
+
+
+_snapshots: "OrderedDict[str, WorkspaceSnapshot]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def snapshot_for(root: str) -> WorkspaceSnapshot:
+    """The snapshot of root, created on first use and refreshed on every call."""
+    root = os.path.abspath(root)
+    with _lock:
+        snapshot = _snapshots.get(root)
+        if snapshot is None:
+            snapshot = _snapshots[root] = WorkspaceSnapshot(root)
+            while len(_snapshots) > MAX_SNAPSHOTS:
+                _, evicted = _snapshots.popitem(last=False)
+                evicted.close()
+            return snapshot
+        _snapshots.move_to_end(root)
+    snapshot.refresh()
+    return snapshot